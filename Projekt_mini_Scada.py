@@ -1,55 +1,51 @@
+import argparse
+import math
+import os
 import sys
-from dataclasses import dataclass
-from PyQt5.QtCore import Qt, QTimer, QPointF
-from PyQt5.QtGui import QPainter, QColor, QPen, QPainterPath, QFont
-from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QSlider, QLabel, QStackedWidget, QTextEdit, QFrame
-
-
-#MODEL
-
-@dataclass
-class TankModel:
-    name: str
-    capacity_l: float
-    volume_l: float
-    temp_c: float  #średnia temperatura w zbiorniku
-
-    def level(self) -> float:
-        if self.capacity_l <= 0:
-            return 0.0
-        return max(0.0, min(1.0, self.volume_l / self.capacity_l))
-
-    def add(self, dV: float, Tin: float) -> float:
-        if dV <= 0:
-            return 0.0
-        free = self.capacity_l - self.volume_l
-        added = min(dV, max(0.0, free))
-        if added <= 0:
-            return 0.0
-
-        if self.volume_l <= 1e-9:
-            self.temp_c = Tin
-        else:
-            self.temp_c = (self.volume_l * self.temp_c + added * Tin) / (self.volume_l + added)
+import time
 
-        self.volume_l += added
-        return added
+import numpy as np
+from PyQt5.QtCore import Qt, QTimer, QPointF, QRect, QLineF, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QPainter, QColor, QPen, QPainterPath, QFont, QFontMetrics, QPixmap, QStaticText, QTextCursor
+from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QSlider, QLabel, QStackedWidget, QTextEdit, QFrame, QComboBox, QTableView, QHeaderView, QFileDialog, QCheckBox, QDoubleSpinBox
 
-    def remove(self, dV: float) -> float:
-        if dV <= 0:
-            return 0.0
-        removed = min(dV, max(0.0, self.volume_l))
-        self.volume_l -= removed
-        return removed
+from engine import TankModel, Inputs, MixingEngine, TICK_S
+from clock import SPEED_PAUSE, SPEED_MAX
+from sim_worker import SimWorker, Snapshot
+from historian import Historian, sample_engine, ENGINE_TAGS
+from tags import TagDB, register_engine, write_engine, write_inputs
+from plant import load_plant, layout, engine_mismatches
+from profiler import Profiler
+import checkpoint
+from planner import MixPlanner, AutoMix
+from alarms import AlarmEngine, load_rules, RAISE
 
-    def is_empty(self) -> bool:
-        return self.volume_l <= 0.1
 
-    def is_full(self) -> bool:
-        return self.volume_l >= self.capacity_l - 0.1
+#WIDOK
+
+#gotowe bitmapy ikon (pompa, grzałka, śnieżynka) – rysowane raz na stan i skalę DPI
+_SPRITES = {}
+
+
+def cached_sprite(key, w, h, render, dpr: float = 1.0) -> QPixmap:
+    full_key = key + (dpr,)
+    pm = _SPRITES.get(full_key)
+    if pm is None:
+        pm = QPixmap(int(w * dpr), int(h * dpr))
+        pm.setDevicePixelRatio(dpr)
+        pm.fill(Qt.transparent)
+        sp = QPainter(pm)
+        sp.setRenderHint(QPainter.Antialiasing)
+        render(sp)
+        sp.end()
+        _SPRITES[full_key] = pm
+    return pm
+
+
+def _dpr(p: QPainter) -> float:
+    return p.device().devicePixelRatioF()
 
 
-#WIDOK
 class SnowflakeIcon:
     def __init__(self, x, y, size=18):
         self.x, self.y, self.size = x, y, size
@@ -61,15 +57,14 @@ class SnowflakeIcon:
     def set_active(self, on: bool):
         self.active = on
 
-    def draw(self, p: QPainter):
-        if not self.active:
-            return
+    def state_key(self):
+        return self.active
 
+    def render(self, p: QPainter, cx, cy):
         col = QColor(200, 230, 255)
         p.setPen(QPen(col, 3, Qt.SolidLine, Qt.RoundCap))
 
         s = self.size
-        cx, cy = self.x, self.y
 
         #6 ramion (co 30°): poziome, pionowe i dwie przekątne
         lines = [
@@ -83,6 +78,14 @@ class SnowflakeIcon:
         for x1, y1, x2, y2 in lines:
             p.drawLine(int(cx + x1), int(cy + y1), int(cx + x2), int(cy + y2))
 
+    def draw(self, p: QPainter):
+        if not self.active:
+            return
+        half = self.size + 3
+        pm = cached_sprite(("snow", self.size), 2 * half, 2 * half,
+                           lambda sp: self.render(sp, half, half), _dpr(p))
+        p.drawPixmap(int(self.x - half), int(self.y - half), pm)
+
 class Pipe:
     def __init__(self, points, thickness=10, color=Qt.gray):
         self.points = [QPointF(float(x), float(y)) for x, y in points]
@@ -91,25 +94,43 @@ class Pipe:
         self.fluid_color = QColor(0, 180, 255)
         self.flowing = False
 
+        #geometria rury się nie zmienia – ścieżka i pióra liczone raz
+        self.path = QPainterPath()
+        if self.points:
+            self.path.moveTo(self.points[0])
+            for pt in self.points[1:]:
+                self.path.lineTo(pt)
+        self.body_pen = QPen(self.pipe_color, self.thickness, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        self.fluid_pen = QPen(self.fluid_color, max(1, self.thickness - 4),
+                              Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+
     def set_flow(self, flowing: bool):
         self.flowing = flowing
 
-    def draw(self, p: QPainter):
+    def state_key(self):
+        return self.flowing
+
+    def bounds(self) -> QRect:
+        m = self.thickness
+        return self.path.boundingRect().toAlignedRect().adjusted(-m, -m, m, m)
+
+    def draw_body(self, p: QPainter):
         if len(self.points) < 2:
             return
-        path = QPainterPath()
-        path.moveTo(self.points[0])
-        for pt in self.points[1:]:
-            path.lineTo(pt)
+        p.setPen(self.body_pen)
+        p.setBrush(Qt.NoBrush)
+        p.drawPath(self.path)
 
-        p.setPen(QPen(self.pipe_color, self.thickness, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+    def draw_fluid(self, p: QPainter):
+        if len(self.points) < 2 or not self.flowing:
+            return
+        p.setPen(self.fluid_pen)
         p.setBrush(Qt.NoBrush)
-        p.drawPath(path)
+        p.drawPath(self.path)
 
-        if self.flowing:
-            p.setPen(QPen(self.fluid_color, max(1, self.thickness - 4),
-                          Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-            p.drawPath(path)
+    def draw(self, p: QPainter):
+        self.draw_body(p)
+        self.draw_fluid(p)
 
 
 class HeaterIcon:
@@ -123,17 +144,29 @@ class HeaterIcon:
     def set_pos(self, x, y):
         self.x, self.y = x, y
 
-    def draw(self, p: QPainter):
-        col = QColor(255, 220, 0) if self.power > 0.05 else QColor(160, 160, 160)
-        glow = QColor(255, 255, 200, int(40 + 170 * self.power))
+    def state_key(self):
+        #32 poziomy poświaty wystarczają – różnice alfa są niewidoczne
+        return (self.power > 0.05, int(round(self.power * 32)))
+
+    def render(self, p: QPainter, cx, cy, on: bool, level: int):
+        power = level / 32.0
+        col = QColor(255, 220, 0) if on else QColor(160, 160, 160)
+        glow = QColor(255, 255, 200, int(40 + 170 * power))
 
         p.setPen(QPen(glow, 7))
         for dx in (-8, 0, 8):
-            p.drawLine(int(self.x + dx), int(self.y - self.h/2), int(self.x + dx), int(self.y + self.h/2))
+            p.drawLine(int(cx + dx), int(cy - self.h/2), int(cx + dx), int(cy + self.h/2))
 
         p.setPen(QPen(col, 3))
         for dx in (-8, 0, 8):
-            p.drawLine(int(self.x + dx), int(self.y - self.h/2), int(self.x + dx), int(self.y + self.h/2))
+            p.drawLine(int(cx + dx), int(cy - self.h/2), int(cx + dx), int(cy + self.h/2))
+
+    def draw(self, p: QPainter):
+        on, level = self.state_key()
+        hw, hh = 16, int(self.h / 2) + 6
+        pm = cached_sprite(("heater", self.h, on, level), 2 * hw, 2 * hh,
+                           lambda sp: self.render(sp, hw, hh, on, level), _dpr(p))
+        p.drawPixmap(int(self.x - hw), int(self.y - hh), pm)
 
 
 class TankView:
@@ -143,6 +176,20 @@ class TankView:
         self.heater = heater
         self.cooler = cooler
 
+        #ikony są w środku zbiornika – pozycja stała
+        cx, cy = self.center()
+        if self.heater is not None:
+            self.heater.set_pos(cx, cy)
+        if self.cooler is not None:
+            self.cooler.set_pos(cx, cy)
+
+        self.frame_pen = QPen(Qt.white, 3)
+        self.font = QFont("Arial", 10)
+        self.ascent = QFontMetrics(self.font).ascent()
+        self.label = QStaticText()
+        self.label.setTextFormat(Qt.PlainText)
+        self.label_text = None
+
     def left_center(self):
         return (self.x, self.y + self.h / 2)
 
@@ -152,50 +199,72 @@ class TankView:
     def center(self):
         return (self.x + self.w / 2, self.y + self.h / 2)
 
+    def label_str(self) -> str:
+        return f"{self.model.volume_l:.0f}/{self.model.capacity_l:.0f} L  |  {self.model.temp_c:.1f}°C"
+
+    def fill_color(self) -> tuple:
+        # kolor zaczyna się zmieniać od 70°C, a mocno czerwony przy 90°C
+        if self.model.temp_c < 70.0:
+            t = 0.0
+        elif self.model.temp_c > 90.0:
+            t = 1.0
+        else:
+            t = (self.model.temp_c - 70.0) / 20.0  # 70→0, 90→1
+
+        return (
+            int(255 * t),  # czerwony
+            int(80 * (1 - t)),  # zielony
+            int(255 * (1 - t)),  # niebieski
+        )
+
+    def fill_px(self) -> int:
+        return int(self.h * self.model.level())
+
+    def state_key(self):
+        return (
+            self.fill_px(), self.fill_color(), self.label_str(),
+            self.heater.state_key() if self.heater is not None else None,
+            self.cooler.state_key() if self.cooler is not None else None,
+        )
+
+    def bounds(self) -> QRect:
+        #zbiornik + dwa wiersze podpisu nad nim
+        width = max(self.w, 260)
+        return QRect(int(self.x) - 3, int(self.y) - 40, int(width) + 6, int(self.h) + 44)
+
+    def draw_static(self, p: QPainter):
+        p.setPen(self.frame_pen)
+        p.setBrush(Qt.NoBrush)
+        p.drawRect(int(self.x), int(self.y), int(self.w), int(self.h))
+
+        p.setPen(Qt.white)
+        p.setFont(self.font)
+        p.drawText(int(self.x), int(self.y - 22), f"{self.model.name}")
+
     def draw(self, p: QPainter):
         lvl = self.model.level()
         if lvl > 0:
             hfill = self.h * lvl
-            y0 = self.y + self.h - hfill
-            # kolor zaczyna się zmieniać od 70°C, a mocno czerwony przy 90°C
-            if self.model.temp_c < 70.0:
-                t = 0.0
-            elif self.model.temp_c > 90.0:
-                t = 1.0
-            else:
-                t = (self.model.temp_c - 70.0) / 20.0  # 70→0, 90→1
-
-            col = QColor(
-                int(255 * t),  # czerwony
-                int(80 * (1 - t)),  # zielony
-                int(255 * (1 - t)),  # niebieski
-                220
-            )
+            y0 = max(self.y + self.h - hfill, self.y + 2)  # nie zamaluj ramki z tła
+            r, g, b = self.fill_color()
 
             p.setPen(Qt.NoPen)
-            p.setBrush(col)
-            p.drawRect(int(self.x + 3), int(y0), int(self.w - 6), int(hfill - 2))
-
-        p.setPen(QPen(Qt.white, 3))
-        p.setBrush(Qt.NoBrush)
-        p.drawRect(int(self.x), int(self.y), int(self.w), int(self.h))
+            p.setBrush(QColor(r, g, b, 220))
+            p.drawRect(int(self.x + 3), int(y0), int(self.w - 6), int(self.y + self.h - 2 - y0))
 
         if self.heater is not None:
-            cx, cy = self.center()
-            self.heater.set_pos(cx, cy)
             self.heater.draw(p)
 
         if self.cooler is not None:
-            cx, cy = self.center()
-            self.cooler.set_pos(cx, cy)
             self.cooler.draw(p)
 
-
+        text = self.label_str()
+        if text != self.label_text:
+            self.label_text = text
+            self.label.setText(text)
         p.setPen(Qt.white)
-        p.setFont(QFont("Arial", 10))
-        p.drawText(int(self.x), int(self.y - 22), f"{self.model.name}")
-        p.drawText(int(self.x), int(self.y - 6),
-                   f"{self.model.volume_l:.0f}/{self.model.capacity_l:.0f} L  |  {self.model.temp_c:.1f}°C")
+        p.setFont(self.font)
+        p.drawStaticText(int(self.x), int(self.y - 6) - self.ascent, self.label)
 
 
 class PumpIcon:
@@ -206,46 +275,224 @@ class PumpIcon:
     def set_active(self, on: bool):
         self.active = on
 
-    def draw(self, p: QPainter):
-        col = QColor(0, 220, 0) if self.active else QColor(120, 120, 120)
+    def state_key(self):
+        return self.active
+
+    def bounds(self) -> QRect:
+        m = self.r + 2
+        return QRect(int(self.x - m), int(self.y - m), 2 * m + 1, 2 * m + 1)
+
+    def render(self, p: QPainter, cx, cy, active: bool):
+        col = QColor(0, 220, 0) if active else QColor(120, 120, 120)
         p.setPen(QPen(Qt.white, 2))
         p.setBrush(col)
-        p.drawEllipse(QPointF(self.x, self.y), self.r, self.r)
+        p.drawEllipse(QPointF(cx, cy), self.r, self.r)
         p.setBrush(QColor(255, 255, 255, 200))
         tri = [
-            QPointF(self.x - 4, self.y - 7),
-            QPointF(self.x - 4, self.y + 7),
-            QPointF(self.x + 8, self.y),
+            QPointF(cx - 4, cy - 7),
+            QPointF(cx - 4, cy + 7),
+            QPointF(cx + 8, cy),
         ]
         p.drawPolygon(*tri)
 
+    def draw(self, p: QPainter):
+        half = self.r + 2
+        active = self.active
+        pm = cached_sprite(("pump", self.r, active), 2 * half, 2 * half,
+                           lambda sp: self.render(sp, half, half, active), _dpr(p))
+        p.drawPixmap(int(self.x - half), int(self.y - half), pm)
+
 class InstallationPage(QWidget):
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent  #dostajemy dostęp do modeli i rysowania
 
+        #warstwa statyczna (korpusy rur, ramki i nazwy zbiorników) – odświeżana tylko po zmianie rozmiaru/DPI
+        self._bg = None
+        self._bg_key = None
+        self._last_keys = {}
+
+        self.title_font = QFont("Arial", 14, QFont.Bold)
+        self.title = QStaticText()
+        self.title.setTextFormat(Qt.PlainText)
+        self.title_text = None
+        self.title_rect = QRect(15, 5, 600, 35)
+
+        #nakładka z czasami faz (profiler) – odświeżana najwyżej 2× na sekundę
+        self.overlay_rect = QRect(610, 42, 380, 118)
+        self.overlay_font = QFont("Courier New", 9)
+        self.overlay_lines = []
+        self.overlay_t = 0.0
+
+    def title_str(self) -> str:
+        err = self.parent.worker.error
+        if err is not None:
+            return f"SYMULACJA ZATRZYMANA: {type(err).__name__}: {err}"[:70]
+        return ("FAZA: NAPEŁNIANIE 2 ZBIORNIKÓW" if self.parent.tags.value("phase") == "FILL"
+                else "FAZA: MIESZANIE (STERUJ SUWAKIEM)")
+
+    def items(self):
+        #(klucz, obiekt) wszystkiego, co może się zmienić między tickami
+        par = self.parent
+        out = [(f"pipe.{k}", v) for k, v in par.pipe_views.items()]
+        out += [(f"pump.{k}", v) for k, v in par.pump_views.items()]
+        out += [(f"tank.{k}", v) for k, v in par.tank_views.items()]
+        return out
+
+    def sync(self):
+        #zamiast pełnego update(): przerysuj tylko prostokąty elementów, których stan się zmienił
+        if not self.isVisible():
+            return
+
+        key = self.title_str()
+        if self._last_keys.get("title") != key:
+            self._last_keys["title"] = key
+            self.update(self.title_rect)
+
+        for name, item in self.items():
+            key = item.state_key()
+            if self._last_keys.get(name) != key:
+                self._last_keys[name] = key
+                self.update(item.bounds())
+
+        if self.parent.profiler.enabled and time.monotonic() - self.overlay_t >= 0.5:
+            self.overlay_t = time.monotonic()
+            self.overlay_lines = self.parent.profiler.report_lines()
+            self.update(self.overlay_rect)
+
+    def show_overlay(self, on: bool):
+        self.overlay_lines = self.parent.profiler.report_lines() if on else []
+        self.overlay_t = time.monotonic()
+        self.update(self.overlay_rect)
+
+    def invalidate_background(self):
+        self._bg = None
+        self.update()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        #po pokazaniu i tak rysujemy całość – zapomnij stare stany
+        self._last_keys.clear()
+
+    def resizeEvent(self, e):
+        self.invalidate_background()
+        super().resizeEvent(e)
+
+    def _background(self) -> QPixmap:
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), dpr)
+        if self._bg is None or self._bg_key != key:
+            pm = QPixmap(int(self.width() * dpr), int(self.height() * dpr))
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.transparent)
+            bp = QPainter(pm)
+            bp.setRenderHint(QPainter.Antialiasing)
+            for pp in self.parent.pipe_views.values():
+                pp.draw_body(bp)
+            for v in self.parent.tank_views.values():
+                v.draw_static(bp)
+            bp.end()
+            self._bg, self._bg_key = pm, key
+        return self._bg
+
     def paintEvent(self, e):
         p = QPainter(self)
         p.setRenderHint(QPainter.Antialiasing)
+        dirty = e.rect()
 
-        #informacja o fazie
-        p.setPen(Qt.white)
-        p.setFont(QFont("Arial", 14, QFont.Bold))
-        p.drawText(20, 30,
-                   "FAZA: NAPEŁNIANIE 2 ZBIORNIKÓW" if self.parent.phase == "FILL"
-                   else "FAZA: MIESZANIE (STERUJ SUWAKIEM)")
-
-        for pp in self.parent.pipes:
-            pp.draw(p)
+        p.drawPixmap(0, 0, self._background())
 
-        self.parent.pump_split.draw(p)
-        self.parent.pump_cold_out.draw(p)
-        self.parent.pump_hot_out.draw(p)
+        #informacja o fazie
+        if dirty.intersects(self.title_rect):
+            text = self.title_str()
+            if text != self.title_text:
+                self.title_text = text
+                self.title.setText(text)
+            p.setPen(Qt.white)
+            p.setFont(self.title_font)
+            p.drawStaticText(20, 30 - QFontMetrics(self.title_font).ascent(), self.title)
+
+        for pp in self.parent.pipe_views.values():
+            if pp.flowing and dirty.intersects(pp.bounds()):
+                pp.draw_fluid(p)
+
+        for pump in self.parent.pump_views.values():
+            if dirty.intersects(pump.bounds()):
+                pump.draw(p)
+
+        for v in self.parent.tank_views.values():
+            if dirty.intersects(v.bounds()):
+                v.draw(p)
+
+        if self.overlay_lines and dirty.intersects(self.overlay_rect):
+            self.draw_overlay(p)
+
+    def draw_overlay(self, p: QPainter):
+        r = self.overlay_rect
+        p.fillRect(r, QColor(0, 0, 0, 190))
+        p.setPen(QColor(120, 255, 120))
+        p.setFont(self.overlay_font)
+        step = QFontMetrics(self.overlay_font).lineSpacing()
+        for i, line in enumerate(self.overlay_lines):
+            p.drawText(r.left() + 6, r.top() + 4 + step * (i + 1) - 3, line)
+
+def update_lines(edit: QTextEdit, old: list[str], new: list[str]) -> list[str]:
+    #podmień tylko zmienione linie zamiast setPlainText (pełny relayout dokumentu)
+    if new == old:
+        return old
+    if len(new) != len(old):
+        edit.setPlainText("\n".join(new))
+        return list(new)
+
+    doc = edit.document()
+    cur = QTextCursor(doc)
+    cur.beginEditBlock()
+    for i, (a, b) in enumerate(zip(old, new)):
+        if a != b:
+            block = doc.findBlockByNumber(i)
+            cur.setPosition(block.position())
+            cur.setPosition(block.position() + block.length() - 1, QTextCursor.KeepAnchor)
+            cur.insertText(b)
+    cur.endEditBlock()
+    return list(new)
+
+
+class AlarmJournalModel(QAbstractListModel):
+    #widok na AlarmJournal bez kopiowania – tekst wiersza formatowany dopiero przy rysowaniu
+    #Wątek symulacji dopisuje kolumny po kolei (t, reguła, rodzaj, wartość), więc liczbę wierszy
+    #bierzemy pod worker.lock – wiersze poniżej niej są kompletne i już się nie zmienią.
+    def __init__(self, alarms: AlarmEngine, worker: SimWorker):
+        super().__init__()
+        self.alarms = alarms
+        self.worker = worker
+        self.rows = self.journal_len()
+
+    def journal_len(self) -> int:
+        with self.worker.lock:
+            return len(self.alarms.journal)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        i = self.rows - 1 - index.row()  # najnowsze u góry
+        if role == Qt.DisplayRole:
+            return self.alarms.format_entry(i)
+        if role == Qt.ForegroundRole:
+            kind = self.alarms.journal.kind[i]
+            return QColor(255, 120, 80) if kind == RAISE else QColor(200, 200, 200)
+        return None
+
+    def sync(self):
+        #nowe wpisy wstawiamy paczką na górę listy
+        n = self.journal_len()
+        if n > self.rows:
+            self.beginInsertRows(QModelIndex(), 0, n - self.rows - 1)
+            self.rows = n
+            self.endInsertRows()
 
-        self.parent.v_big.draw(p)
-        self.parent.v_cold.draw(p)
-        self.parent.v_hot.draw(p)
-        self.parent.v_mix.draw(p)
 
 class ReportsAlarmsPage(QWidget):
     def __init__(self, parent):
@@ -261,7 +508,7 @@ class ReportsAlarmsPage(QWidget):
 
         #Ramka raporty
         self.frame_reports = QFrame(self)
-        self.frame_reports.setGeometry(25, 70, 950, 260)
+        self.frame_reports.setGeometry(25, 50, 950, 200)
 
         self.lbl_reports_title = QLabel("Raporty", self.frame_reports)
         self.lbl_reports_title.move(10, 8)
@@ -269,11 +516,11 @@ class ReportsAlarmsPage(QWidget):
 
         self.txt_reports = QTextEdit(self.frame_reports)
         self.txt_reports.setReadOnly(True)
-        self.txt_reports.setGeometry(10, 35, 930, 215)
+        self.txt_reports.setGeometry(10, 35, 930, 155)
 
         #Ramka alarmy
         self.frame_alarms = QFrame(self)
-        self.frame_alarms.setGeometry(25, 350, 950, 230)
+        self.frame_alarms.setGeometry(25, 265, 950, 340)
 
         self.lbl_alarms_title = QLabel("Alarmy", self.frame_alarms)
         self.lbl_alarms_title.move(10, 8)
@@ -281,127 +528,393 @@ class ReportsAlarmsPage(QWidget):
 
         self.txt_alarms = QTextEdit(self.frame_alarms)
         self.txt_alarms.setReadOnly(True)
-        self.txt_alarms.setGeometry(10, 35, 930, 185)
+        self.txt_alarms.setGeometry(10, 35, 930, 95)
+
+        self.btn_ack = QPushButton("Potwierdź alarmy", self.frame_alarms)
+        self.btn_ack.setGeometry(780, 6, 160, 24)
+        self.btn_ack.setStyleSheet("background-color:#444; color:white;")
+        self.btn_ack.clicked.connect(self.parent.acknowledge_alarms)
+
+        #dziennik: lista wirtualna – rysowane są tylko widoczne wiersze
+        self.lbl_journal = QLabel("Dziennik alarmów (najnowsze u góry)", self.frame_alarms)
+        self.lbl_journal.move(10, 138)
+        self.journal_model = AlarmJournalModel(self.parent.alarms, self.parent.worker)
+        self.lst_journal = QTableView(self.frame_alarms)
+        self.lst_journal.setGeometry(10, 160, 930, 170)
+        self.lst_journal.setShowGrid(False)
+        self.lst_journal.horizontalHeader().hide()
+        self.lst_journal.horizontalHeader().setStretchLastSection(True)
+        #stała wysokość wierszy – widok nie pyta modelu o każdy z 100k wierszy
+        self.lst_journal.verticalHeader().hide()
+        self.lst_journal.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.lst_journal.verticalHeader().setDefaultSectionSize(20)
+        self.lst_journal.setModel(self.journal_model)
+        self.lst_journal.setStyleSheet("background: #1b1b1b; color: white; border: none;")
+        self.lst_journal.setFont(QFont("Courier New", 10))
 
         #czcionka obu Alarmow i Raportow
         font = QFont("Arial", 11)
         self.txt_reports.setFont(font)
         self.txt_alarms.setFont(font)
 
+        #edycje linia po linii nie mogą rosnąć w historii undo
+        self.txt_reports.setUndoRedoEnabled(False)
+        self.txt_alarms.setUndoRedoEnabled(False)
+        self.rep_lines = []
+        self.alarm_lines = []
+        self.dirty = True
+
+    def mark_dirty(self, *_):
+        self.dirty = True
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        #strona ukryta nie była odświeżana – nadrabiamy przy pokazaniu
+        self.refresh()
+
     def refresh(self):
+        #przeliczamy tylko po zmianie tagów raportu albo stanu alarmów
+        if not self.isVisible() or not self.dirty:
+            return
+        self.dirty = False
+
         #RAPORTY
-        big = self.parent.big
-        cold = self.parent.cold
-        hot = self.parent.hot
-        mix = self.parent.mix
-
-        rep = []
-        rep.append(f"Zbiornik główny: {big.volume_l:.0f}/{big.capacity_l:.0f} L, {big.temp_c:.1f}°C")
-        rep.append(f"Zimny (0°C): {cold.volume_l:.0f}/{cold.capacity_l:.0f} L, {cold.temp_c:.1f}°C")
-        rep.append(f"Gorący (100°C): {hot.volume_l:.0f}/{hot.capacity_l:.0f} L, {hot.temp_c:.1f}°C")
-        rep.append(f"Mieszalnik: {mix.volume_l:.0f}/{mix.capacity_l:.0f} L, {mix.temp_c:.1f}°C")
-        rep.append(f"Faza: {self.parent.phase}")
-        rep.append(f"Kondycjonowanie: {self.parent.cold_heat_t:.1f}/10.0 s (zimny), {self.parent.hot_heat_t:.1f}/10.0 s (gorący)")
-
-        self.txt_reports.setPlainText("\n".join(rep))
-
-        #ALARMY
-        alarms = []
-
-        #alarmy temperatury mieszalnika
-        if mix.volume_l > 0.1:  #dopiero jak coś tam jest
-            if mix.temp_c < 10.0:
-                alarms.append("⚠ Uwaga: lodowata woda w mieszalniku (T < 10°C).")
-            if mix.temp_c > 70.0:
-                alarms.append("⚠ Uwaga: grozi poparzenie w mieszalniku (T > 70°C).")
+        snap = self.parent.snapshot
+        rep = list(snap.report) + self.parent.archive_report()
+        self.rep_lines = update_lines(self.txt_reports, self.rep_lines, rep)
+
+        #ALARMY (aktywne wg reguł z alarms.json)
+        alarms = [r.message if acked else f"{r.message} [niepotwierdzony]"
+                  for r, since, acked in snap.alarms]
 
         #komunikat końcowy po napełnieniu
-        if self.parent.mix_full_msg:
-            alarms.append(self.parent.mix_full_msg)
+        mix_full_msg = self.parent.tags.value("mix_full_msg")
+        if mix_full_msg:
+            alarms.append(mix_full_msg)
 
         if not alarms:
-            alarms_text = "• Brak alarmów."
+            alarm_lines = ["• Brak alarmów."]
+        else:
+            alarm_lines = [f"• {a}" for a in alarms]
+
+        self.alarm_lines = update_lines(self.txt_alarms, self.alarm_lines, alarm_lines)
+        self.journal_model.sync()
+
+
+
+class TrendPage(QWidget):
+    #(tag, kolor, podpis) – górny wykres objętości, dolny temperatury
+    VOLUME_SERIES = [
+        ("big.volume_l", QColor(200, 200, 200), "główny"),
+        ("cold.volume_l", QColor(80, 160, 255), "zimny"),
+        ("hot.volume_l", QColor(255, 90, 60), "gorący"),
+        ("mix.volume_l", QColor(0, 220, 120), "mieszalnik"),
+    ]
+    TEMP_SERIES = [(tag.replace("volume_l", "temp_c"), col, name) for tag, col, name in VOLUME_SERIES]
+
+    MIN_SPAN_S = 5.0
+    MAX_SPAN_S = 7 * 24 * 3600.0
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+
+        self.span_s = 60.0
+        self.t_end = None  # None = podgląd na żywo (prawa krawędź = ostatnia próbka)
+        self.drag = None
+
+        #narysowane przebiegi (bez osi) – przy podglądzie na żywo przewijane o całe piksele,
+        #dorysowywane są tylko nowe kolumny
+        self._cache = None
+        self._cache_key = None
+        self._cache_t1 = None
+        self._cols = {}
+
+        self.font = QFont("Arial", 9)
+        self.title_font = QFont("Arial", 12, QFont.Bold)
+
+    #GEOMETRIA
+
+    def plot_rect(self) -> QRect:
+        return QRect(60, 70, self.width() - 90, self.height() - 130)
+
+    def sub_rects(self):
+        r = self.plot_rect()
+        h = r.height() // 2 - 12
+        return QRect(0, 0, r.width(), h), QRect(0, h + 24, r.width(), h)
+
+    def view(self, span=None):
+        #span: zakres historii odczytany już pod blokadą (None = odczyt tutaj)
+        w = max(1, self.plot_rect().width())
+        px_s = self.span_s / w
+        if span is None:
+            with self.parent.worker.lock:
+                span = self.parent.historian.time_span()
+        t_end = self.t_end if self.t_end is not None else (span[1] if span else 0.0)
+        #prawa krawędź na stałej siatce kolumn, żeby przewijać o całe piksele
+        t1 = math.ceil(t_end / px_s) * px_s
+        return t1 - self.span_s, t1, px_s
+
+    #ODŚWIEŻANIE
+
+    def sync(self):
+        if not self.isVisible() or self.t_end is not None:
+            return
+        t0, t1, px_s = self.view()
+        if self._cache_t1 != t1 or self._cache_key is None:
+            self.update(self.plot_rect().adjusted(-60, -5, 5, 40))
+
+    def _render(self):
+        #przebiegi do bufora; zwraca widok (t0, t1, px_s), w którym je narysowano
+        r = self.plot_rect()
+        w, h = r.width(), r.height()
+        if w <= 0 or h <= 0:
+            return self.view()
+        key = (self.span_s, w, h)
+
+        if self._cache is None or self._cache_key != key:
+            self._cache = QPixmap(w, h)
+            self._cache_key = key
+            self._cache_t1 = None
+
+        hist = self.parent.historian
+        series = ((self.VOLUME_SERIES, 200.0), (self.TEMP_SERIES, 100.0))
+        #jedna blokada na klatkę: zakres i wszystkie serie z tego samego stanu symulacji
+        with self.parent.worker.lock:  #historian zapisywany w wątku symulacji
+            t0, t1, px_s = self.view(hist.time_span())
+            if self._cache_t1 is None:
+                k = w
+            else:
+                k = int(round((t1 - self._cache_t1) / px_s))
+            if k < 0 or k >= w:
+                k = w
+            #przedostatnia kolumna mogła być niepełna – liczymy ją jeszcze raz
+            c0 = 0 if k == w else max(0, w - k - 1)
+            ct0 = t0 + c0 * px_s
+            env = {tag: hist.envelope(tag, ct0, t1, w - c0) for tags, _ in series for tag, _, _ in tags}
+        self._cache_t1 = t1
+
+        if k == w:
+            self._cache.fill(Qt.transparent)
+        elif k:
+            self._cache.scroll(-k, 0, self._cache.rect())
+            for cols in self._cols.values():
+                for arr in cols:
+                    arr[:-k] = arr[k:].copy()
+
+        p = QPainter(self._cache)
+        p.setRenderHint(QPainter.Antialiasing)
+        if c0:
+            p.setCompositionMode(QPainter.CompositionMode_Source)
+            p.fillRect(QRect(c0, 0, w - c0, h), Qt.transparent)
+            p.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        top, bottom = self.sub_rects()
+        for (tags, ymax), rect in zip(series, (top, bottom)):
+            for tag, color, _ in tags:
+                lo, hi = env[tag]
+                cols = self._cols.get(tag)
+                if cols is None or len(cols[0]) != w:
+                    cols = self._cols[tag] = (np.full(w, np.nan), np.full(w, np.nan))
+                cols[0][c0:] = lo
+                cols[1][c0:] = hi
+                self._draw_columns(p, rect, cols, c0, ymax, color)
+        p.end()
+        return t0, t1, px_s
+
+    def _draw_columns(self, p: QPainter, rect: QRect, cols, c0: int, ymax: float, color: QColor):
+        lo, hi = cols[0][c0:], cols[1][c0:]
+        if c0 > 0:
+            prev_lo, prev_hi = cols[0][c0 - 1], cols[1][c0 - 1]
         else:
-            alarms_text = "\n".join(f"• {a}" for a in alarms)
+            prev_lo = prev_hi = np.nan
+        #odcinek kolumny sięga do wartości sąsiada – linia bez przerw
+        plo = np.concatenate(([prev_lo], lo[:-1]))
+        phi = np.concatenate(([prev_hi], hi[:-1]))
+        a = np.fmin(lo, phi)
+        b = np.fmax(hi, plo)
+
+        scale = rect.height() / ymax
+        ya = rect.bottom() - np.clip(a, 0.0, ymax) * scale
+        yb = rect.bottom() - np.clip(b, 0.0, ymax) * scale
+        ok = ~np.isnan(lo)
+        xs = np.arange(c0, c0 + lo.size)[ok] + 0.5
+        lines = [QLineF(x, y1, x, y2) for x, y1, y2 in zip(xs.tolist(), ya[ok].tolist(), yb[ok].tolist())]
+        if lines:
+            p.setPen(QPen(color, 1.5))
+            p.drawLines(lines)
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        r = self.plot_rect()
+        top, bottom = self.sub_rects()
+        t0, t1, px_s = self._render()   #przebiegi i osie w tym samym widoku
+
+        p.setPen(Qt.white)
+        p.setFont(self.title_font)
+        mode = "na żywo" if self.t_end is None else "historia"
+        p.drawText(20, 30, f"TRENDY – okno {self.span_s:.0f} s ({mode})")
+        p.setFont(self.font)
+        p.drawText(20, 50, "kółko: zoom, przeciągnij: przesuń w czasie, 2× klik: powrót na żywo")
+
+        #siatka i osie
+        p.setPen(QPen(QColor(70, 70, 70), 1))
+        for sub, ymax, unit in ((top, 200.0, "L"), (bottom, 100.0, "°C")):
+            sub = sub.translated(r.topLeft())
+            for k in range(5):
+                y = sub.bottom() - sub.height() * k / 4
+                p.setPen(QPen(QColor(70, 70, 70), 1))
+                p.drawLine(sub.left(), int(y), sub.right(), int(y))
+                p.setPen(Qt.lightGray)
+                p.drawText(sub.left() - 55, int(y) + 4, f"{ymax * k / 4:.0f} {unit}")
+
+        #pionowa siatka czasu w "ładnych" odstępach
+        step = next((s for s in (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600,
+                                 7200, 14400, 21600, 43200, 86400) if s >= self.span_s / 8), 86400)
+        t = max(0.0, math.ceil(t0 / step) * step)
+        while t <= t1:
+            x = r.left() + (t - t0) / px_s
+            p.setPen(QPen(QColor(70, 70, 70), 1))
+            p.drawLine(int(x), r.top(), int(x), r.bottom())
+            p.setPen(Qt.lightGray)
+            p.drawText(int(x) - 25, r.bottom() + 18, time.strftime("%H:%M:%S", time.gmtime(t)))
+            t += step
+
+        if self._cache is not None:
+            p.drawPixmap(r.topLeft(), self._cache)
+
+        #legenda
+        x = r.left()
+        for tag, color, name in self.VOLUME_SERIES:
+            p.setPen(color)
+            p.drawText(x, r.bottom() + 36, name)
+            x += 90
+        p.setPen(Qt.white)
+        p.drawText(r.right() - 200, r.bottom() + 36, "góra: objętość, dół: temperatura")
+
+    #ZOOM I PRZESUWANIE
+
+    def wheelEvent(self, e):
+        steps = e.angleDelta().y() / 120.0
+        self.span_s = max(self.MIN_SPAN_S, min(self.MAX_SPAN_S, self.span_s / (1.25 ** steps)))
+        self.update()
+
+    def mousePressEvent(self, e):
+        t0, t1, px_s = self.view()
+        self.drag = (e.x(), t1, px_s)
+
+    def mouseMoveEvent(self, e):
+        if self.drag is None:
+            return
+        x0, t1, px_s = self.drag
+        t_end = t1 - (e.x() - x0) * px_s
+        with self.parent.worker.lock:
+            span = self.parent.historian.time_span()
+        latest = span[1] if span else 0.0
+        self.t_end = None if t_end >= latest else t_end
+        self.update()
 
-        self.txt_alarms.setPlainText(alarms_text)
+    def mouseReleaseEvent(self, e):
+        self.drag = None
 
+    def mouseDoubleClickEvent(self, e):
+        self.t_end = None
+        self.update()
 
 
 #APLIKACJA
 
+ALARMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alarms.json")
+PLANT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plant.json")
+
 class SymulacjaMieszania(QWidget):
-    def __init__(self):
+    def __init__(self, plant_path=PLANT_PATH):
         super().__init__()
         self.setWindowTitle("SCADA: napełnij 2 zbiorniki, potem steruj miksowaniem")
         self.setFixedSize(1000, 620)
         self.setStyleSheet("background-color:#222;")
 
+        #MODELE (cała logika procesu siedzi w silniku bez Qt)
+        #silnik należy do wątku symulacji – GUI czyta tylko jego migawki (self.snapshot)
+        self.engine = MixingEngine()
+
+        #BAZY TAGÓW – widoki, alarmy i interfejsy subskrybują tylko potrzebne tagi.
+        #proc_tags: zapisywane w wątku symulacji co tick (alarmy, Modbus),
+        #tags: po stronie GUI, zasilane migawkami raz na klatkę (widoki, raport)
+        self.proc_tags = register_engine(TagDB(), self.engine)
+        self.tags = register_engine(TagDB(), self.engine)
+
+        #ALARMY (reguły w konfiguracji, liczone tylko przy zmianach tagów)
+        self.alarms = AlarmEngine(load_rules(ALARMS_PATH))
+        self.proc_tags.subscribe([n for n in self.alarms.by_tag if n in self.proc_tags], self.alarms.update,
+                                 every_tick=True)
+
         #STRONY (stack)
         self.stack = QStackedWidget(self)
         self.stack.setGeometry(0, 0, 1000, 620)
 
         self.page_install = InstallationPage(self)
-        self.page_reports = ReportsAlarmsPage(self)
-
         self.stack.addWidget(self.page_install)  # index 0
-        self.stack.addWidget(self.page_reports)  # index 1
+
+        #raporty (1) i trendy (2) budowane dopiero przy pierwszym pokazaniu – do tego czasu puste miejsce
+        self._page_factories = {1: ReportsAlarmsPage, 2: TrendPage}
+        self._pages = {0: self.page_install}
+        for _ in self._page_factories:
+            self.stack.addWidget(QWidget())
 
         #MINI MENU (prawy górny róg)
         self.btn_install = QPushButton("Instalacja", self)
         self.btn_reports = QPushButton("Raporty/Alarmy", self)
+        self.btn_trends = QPushButton("Trendy", self)
 
         #małe ikonki
+        self.btn_trends.setGeometry(665, 10, 90, 26)
         self.btn_install.setGeometry(760, 10, 110, 26)
         self.btn_reports.setGeometry(875, 10, 115, 26)
 
-        self.btn_install.setStyleSheet("background-color:#444; color:white; font-size:13px;")
-        self.btn_reports.setStyleSheet("background-color:#444; color:white; font-size:13px;")
-
-        self.btn_install.clicked.connect(lambda: self.switch_page(0))
-        self.btn_reports.clicked.connect(lambda: self.switch_page(1))
-
-        #komunikat końcowy (po napełnieniu mieszalnika)
-        self.mix_full_msg = ""
-
-        #MODELE
-        self.big = TankModel("Zbiornik główny", 200.0, 200.0, 20.0)
-        self.cold = TankModel("Zimny (0°C)", 100.0, 0.0, 20.0)
-        self.hot = TankModel("Gorący (100°C)", 100.0, 0.0, 20.0)
-        self.mix = TankModel("Mieszalnik", 100.0, 0.0, 0.0)
-
-        self.heater = HeaterIcon(0, 0, h=38)
-        self.snowflake = SnowflakeIcon(0, 0, size=18)
-
-        #WIDOKI
-        self.v_big = TankView(70, 180, 120, 220, self.big)
-        self.v_cold = TankView(420, 80, 100, 170, self.cold, cooler=self.snowflake)
-        self.v_hot = TankView(420, 320, 100, 170, self.hot, heater=self.heater)
-        self.v_mix = TankView(760, 200, 120, 220, self.mix)
-
-        #POMPY
-        self.pump_split = PumpIcon(300, 290, r=18)
-        self.pump_cold_out = PumpIcon(660, 160, r=14)
-        self.pump_hot_out = PumpIcon(660, 405, r=14)
-
-        #RURY
-        bx, by = self.v_big.right_center()
-        cx_left, _ = self.v_cold.left_center()
-        hx_left, _ = self.v_hot.left_center()
-        mx, my = self.v_mix.left_center()
-
-        self.pipe_big_to_pump = Pipe([(bx, by), (260, by), (280, 290)], thickness=10)
-
-        self.pipe_pump_to_cold = Pipe([(320, 290), (360, 290), (360, 160), (cx_left, 160)], thickness=10)
-        self.pipe_pump_to_hot = Pipe([(320, 290), (360, 290), (360, 405), (hx_left, 405)], thickness=10)
-
-        self.pipe_cold_to_mix = Pipe([(self.v_cold.right_center()[0], 160), (660, 160), (700, 160), (700, my), (mx, my)], thickness=10)
-        self.pipe_hot_to_mix = Pipe([(self.v_hot.right_center()[0], 405), (660, 405), (700, 405), (700, my), (mx, my)], thickness=10)
-
-        self.pipes = [
-            self.pipe_big_to_pump, self.pipe_pump_to_cold, self.pipe_pump_to_hot,
-            self.pipe_cold_to_mix, self.pipe_hot_to_mix
-        ]
+        self.nav_buttons = [self.btn_install, self.btn_reports, self.btn_trends]
+        for i, b in enumerate(self.nav_buttons):
+            b.setStyleSheet("background-color:#444; color:white; font-size:13px;")
+            b.clicked.connect(lambda _, i=i: self.switch_page(i))
+
+        #historia zmiany: czas instalacji ciągły także po RESET (t_sim startuje od 0);
+        #zapisywana w wątku symulacji, czytana pod blokadą wątku (worker.lock)
+        self.historian = Historian.for_shift()
+        #archiwum na dysku (--archive): czas ścienny = archive_t0 + czas instalacji
+        self.archive = None
+        self.archive_t0 = 0.0
+        self.shm = None  #stan w pamięci współdzielonej dla lokalnych narzędzi (start_shm)
+
+        #WIDOKI: zbiorniki, pompy i rury z konfiguracji instalacji, układ liczony automatycznie
+        self.plant_cfg = load_plant(plant_path)
+        #widoki są z konfiguracji, ale symuluje silnik o stałej topologii – muszą się zgadzać
+        problems = engine_mismatches(self.plant_cfg, self.engine)
+        if problems:
+            raise ValueError(f"{plant_path}: konfiguracja niezgodna z silnikiem symulacji: " + "; ".join(problems))
+        lay = layout(self.plant_cfg, self.width(), self.height())
+        self.tank_views = {}
+        #widoki rysują kopie zbiorników przepisywane z migawek
+        self.display_tanks = {spec.id: TankModel(spec.name, spec.capacity_l, spec.volume_l, spec.temp_c)
+                              for spec in self.plant_cfg.tanks}
+        for spec in self.plant_cfg.tanks:
+            self.tank_views[spec.id] = TankView(
+                *lay.tanks[spec.id], self.display_tanks[spec.id],
+                heater=HeaterIcon(0, 0, h=38) if spec.heater else None,
+                cooler=SnowflakeIcon(0, 0, size=18) if spec.cooler else None)
+        self.pump_views = {pid: PumpIcon(x, y, r=r) for pid, (x, y, r) in lay.pumps.items()}
+        self.pipe_views = {pid: Pipe(points, thickness=10) for pid, points in lay.pipes.items()}
+
+        #ikony i rury zmieniają stan tylko przy zmianie swojego tagu
+        self.view_bindings = {f"pump_{pid}": v.set_active for pid, v in self.pump_views.items()}
+        self.view_bindings.update({f"flow_{pid}": v.set_flow for pid, v in self.pipe_views.items()})
+        self.view_bindings.update({f"{tid}.heater_power": v.heater.set_power
+                                   for tid, v in self.tank_views.items() if v.heater is not None})
+        self.tags.subscribe([n for n in self.view_bindings if n in self.tags], self.on_view_tags)
+
+        #raport: temperatury z dokładnością do wyświetlanej 0.1
+        report_tags = [n for n in self.tags.tags if n.endswith((".volume_l", ".temp_c", "_heat_t"))]
+        self.tags.subscribe(report_tags, self.mark_reports_dirty, deadband=0.05)
+        self.tags.subscribe(["phase", "mix_full_msg"], self.mark_reports_dirty)
 
         #STEROWANIE
         self.lbl_speed = QLabel("Szybkość pompy: 1.0 L/tick", self.page_install)
@@ -443,204 +956,405 @@ class SymulacjaMieszania(QWidget):
         self.btn_reset.setStyleSheet("background-color:#444; color:white;")
         self.btn_reset.clicked.connect(self.reset_all)
 
-        self.t_sim = 0.0
-        self.cold_heat_t = 0.0
-        self.hot_heat_t = 0.0
-        self.cold_ready = False
-        self.hot_ready = False
-
-        #TRYB: najpierw FILL, potem MIX
-        self.phase = "FILL"   # "FILL" albo "MIX"
+        #PRĘDKOŚĆ SYMULACJI (czas instalacji względem rzeczywistego)
+        self.cb_speed = QComboBox(self.page_install)
+        self.cb_speed.setGeometry(880, 465, 100, 30)
+        self.cb_speed.setStyleSheet("background-color:#444; color:white;")
+        for label, speed in (("1x", 1.0), ("10x", 10.0), ("MAX", SPEED_MAX), ("Pauza", SPEED_PAUSE)):
+            self.cb_speed.addItem(label, speed)
+        self.cb_speed.currentIndexChanged.connect(lambda i: self.worker.set_speed(self.cb_speed.itemData(i)))
+
+        #PROFILER (czasy faz ticka i rysowania; wyłączony = zero narzutu)
+        self.btn_profile = QPushButton("Profil", self.page_install)
+        self.btn_profile.setGeometry(880, 425, 100, 30)
+        self.btn_profile.setStyleSheet("background-color:#444; color:white;")
+        self.btn_profile.setCheckable(True)
+        self.btn_profile.toggled.connect(self.set_profiling)
+
+        #AUTOMATYKA MIESZANIA: szybkości zimnej/ciepłej z planera pod zadaną temperaturę
+        self.planner = MixPlanner()
+        self.cb_auto = QCheckBox("Auto: cel", self.page_install)
+        self.cb_auto.setGeometry(40, 502, 100, 26)
+        self.cb_auto.setStyleSheet("color:white;")
+        self.sp_target = QDoubleSpinBox(self.page_install)
+        self.sp_target.setGeometry(140, 500, 100, 30)
+        self.sp_target.setStyleSheet("background-color:#444; color:white;")
+        self.sp_target.setRange(0.0, 100.0)
+        self.sp_target.setDecimals(1)
+        self.sp_target.setSuffix(" °C")
+        self.sp_target.setValue(40.0)
+        self.cb_auto.toggled.connect(self.set_auto_mix)
+        self.sp_target.valueChanged.connect(lambda _: self.set_auto_mix(self.cb_auto.isChecked()))
+
+        #PUNKTY KONTROLNE (zapis/wczytanie stanu w trakcie partii)
+        self.btn_save_state = QPushButton("Zapisz", self.page_install)
+        self.btn_save_state.setGeometry(880, 345, 100, 30)
+        self.btn_save_state.setStyleSheet("background-color:#444; color:white;")
+        self.btn_save_state.clicked.connect(lambda: self.save_state())
+
+        self.btn_load_state = QPushButton("Wczytaj", self.page_install)
+        self.btn_load_state.setGeometry(880, 385, 100, 30)
+        self.btn_load_state.setStyleSheet("background-color:#444; color:white;")
+        self.btn_load_state.clicked.connect(lambda: self.load_state())
 
         self.running = True
+        self.modbus = None  #serwer Modbus-TCP (start_modbus)
+        self.hmi = None     #zdalny podgląd HTTP/WebSocket (start_hmi)
+
+        #etykiety i nastawy silnika zmieniają się tylko razem z suwakami
+        for sl in (self.sl_speed, self.sl_cold, self.sl_hot):
+            sl.valueChanged.connect(self.update_rate_labels)
+            sl.valueChanged.connect(self.send_inputs)
+        self.update_rate_labels()
+
+        #odświeżanie GUI zbierane do jednej klatki ekranu (niezależnie od liczby kroków symulacji)
+        self.ui_timer = QTimer(self)
+        self.ui_timer.setSingleShot(True)
+        self.ui_timer.timeout.connect(self.flush_ui)
+        self.last_flush = 0.0
+        self.render_hz = None  # None = częstotliwość ekranu
+
+        #stały krok fizyki (TICK_S) w osobnym wątku – nie zależy od rysowania ani okien dialogowych;
+        #timer GUI tylko odbiera najnowszą migawkę
+        self.worker = SimWorker(self.engine, on_tick=self.record_history, alarms=self.alarms)
+        self.worker.set_inputs(self.read_inputs())
+        self.snapshot = self.worker.latest()
+
+        #punkty pomiarowe: cały tick i jego fazy (wątek symulacji), migawka, raport i rysowanie (GUI)
+        self.profiler = Profiler()
+        self.profiler.hook(self.worker.clock, "step_fn", "sim.tick", deadline_s=TICK_S)
+        self.profiler.hook(self.engine, "step", "sim.physics")
+        self.profiler.hook(self.worker, "on_tick", "sim.record")
+        self.profiler.hook(self.worker, "_publish", "sim.publish")
+        self.profiler.hook(self, "apply_snapshot", "gui.snapshot")
+        self.profiler.hook(self.page_install, "paintEvent", "gui.paint", deadline_s=self.frame_interval_s())
+        self.worker.start()
         self.timer = QTimer()
-        self.timer.timeout.connect(self.step)
-        self.timer.start(30)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.on_timer)
+        self.timer.start(10)
 
     def toggle(self):
         self.running = not self.running
+        self.send_inputs()
 
     def reset_all(self):
-        #stany
-        self.phase = "FILL"
-        self.t_sim = 0.0
-        self.cold_heat_t = 0.0
-        self.hot_heat_t = 0.0
-        self.cold_ready = False
-        self.hot_ready = False
-
-        #zbiorniki
-        self.big.volume_l = 200.0
-        self.big.temp_c = 20.0
-
-        self.cold.volume_l = 0.0
-        self.cold.temp_c = 20.0
-
-        self.hot.volume_l = 0.0
-        self.hot.temp_c = 20.0
-
-        self.mix.volume_l = 0.0
-        self.mix.temp_c = 0.0
+        #stany i zbiorniki (wykona wątek symulacji przed kolejnym krokiem)
+        self.worker.reset()
+        if self.worker.initial_state is not None:
+            #RESET do wczytanego stanu początkowego – razem z jego nastawami
+            self.show_inputs(checkpoint.restore(self.worker.initial_state).inputs)
+            self.page_install.update()
+            return
 
         #suwaki (startowo mało)
         self.sl_speed.setValue(3)  # np. 0.3 L/tick
         self.sl_cold.setValue(0)
         self.sl_hot.setValue(0)
-
-        self.mix_full_msg = ""
-        self.page_reports.refresh()
         self.page_install.update()
 
+    def save_state(self, path: str | None = None):
+        if path is None:
+            path, _ = QFileDialog.getSaveFileName(self, "Zapisz stan", "stan.msck", "Stan instalacji (*.msck)")
+            if not path:
+                return
+        with open(path, "wb") as f:
+            f.write(self.worker.save())
+
+    def load_state(self, path: str | None = None, as_initial: bool = False):
+        #as_initial: RESET wraca później do tego stanu zamiast do domyślnego
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, "Wczytaj stan", "", "Stan instalacji (*.msck)")
+            if not path:
+                return
+        with open(path, "rb") as f:
+            data = f.read()
+        inputs = checkpoint.restore(data).inputs  #sprawdza format, zanim stan trafi do wątku
+        if as_initial:
+            self.worker.initial_state = data
+        self.worker.restore(data)
+        self.show_inputs(inputs)
+
+    def show_inputs(self, inputs: Inputs):
+        #suwaki wg nastaw z punktu kontrolnego – bez odsyłania ich z powrotem (zaokrąglenie do 0.1)
+        self.running = inputs.running
+        for sl, value in ((self.sl_speed, inputs.pump_rate), (self.sl_cold, inputs.cold_rate),
+                          (self.sl_hot, inputs.hot_rate)):
+            sl.blockSignals(True)
+            sl.setValue(int(round(value * 10)))
+            sl.blockSignals(False)
+        self.update_rate_labels()
+
+    def set_auto_mix(self, on: bool):
+        #w fazie MIX regulator w wątku symulacji sam ustawia zimną i ciepłą; suwaki tylko pokazują
+        self.sl_cold.setEnabled(not on)
+        self.sl_hot.setEnabled(not on)
+        if on:
+            self.worker.set_controller(AutoMix(self.planner, self.sp_target.value(), background=True))
+        else:
+            self.worker.set_controller(None)
+            self.send_inputs()  #z powrotem nastawy z suwaków
+
+    def send_inputs(self, *_):
+        self.worker.set_inputs(self.read_inputs())
+
+    def page(self, idx: int) -> QWidget:
+        #strona stosu; przy pierwszym użyciu budowana i wstawiana w miejsce zaślepki
+        page = self._pages.get(idx)
+        if page is None:
+            page = self._page_factories[idx](self)
+            placeholder = self.stack.widget(idx)
+            self.stack.insertWidget(idx, page)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self._pages[idx] = page
+            if idx == 1:
+                self.profiler.hook(page, "refresh", "gui.reports")
+        return page
+
+    @property
+    def page_reports(self) -> "ReportsAlarmsPage":
+        return self.page(1)
+
+    @property
+    def page_trends(self) -> "TrendPage":
+        return self.page(2)
+
+    def mark_reports_dirty(self, *_):
+        #strona jeszcze nie zbudowana i tak odświeży się przy pierwszym pokazaniu
+        page = self._pages.get(1)
+        if page is not None:
+            page.mark_dirty()
+
     def switch_page(self, idx: int):
+        self.page(idx)
         self.stack.setCurrentIndex(idx)
 
         #"podświetlenie” aktywnej zakładki
-        if idx == 0:
-            self.btn_install.setStyleSheet("background-color:#666; color:white; font-size:13px;")
-            self.btn_reports.setStyleSheet("background-color:#444; color:white; font-size:13px;")
+        for i, b in enumerate(self.nav_buttons):
+            bg = "#666" if i == idx else "#444"
+            b.setStyleSheet(f"background-color:{bg}; color:white; font-size:13px;")
+
+    def read_inputs(self) -> Inputs:
+        return Inputs(
+            pump_rate=self.sl_speed.value() / 10.0,
+            cold_rate=self.sl_cold.value() / 10.0,  # L/tick
+            hot_rate=self.sl_hot.value() / 10.0,  # L/tick
+            running=self.running,
+        )
+
+    def on_view_tags(self, t, changed: dict):
+        #przepisz zmienione wyjścia silnika na ikony i rury
+        for name, value in changed.items():
+            self.view_bindings[name](value)
+
+    def update_rate_labels(self, *_):
+        inputs = self.read_inputs()
+        self.lbl_cold.setText(f"Zimna → mix: {inputs.cold_rate:.1f} L/tick")
+        self.lbl_hot.setText(f"Ciepła → mix: {inputs.hot_rate:.1f} L/tick")
+        self.lbl_speed.setText(f"Szybkość pompy: {inputs.pump_rate:.1f} L/tick")
+
+    def frame_interval_s(self) -> float:
+        screen = self.screen() if self.isVisible() else QApplication.primaryScreen()
+        hz = screen.refreshRate() if screen is not None else 60.0
+        if self.render_hz:
+            hz = min(hz, self.render_hz)
+        return 1.0 / max(1.0, hz)
+
+    def request_ui(self):
+        #najwyżej jedno odświeżenie na klatkę ekranu
+        if self.ui_timer.isActive():
+            return
+        wait = self.last_flush + self.frame_interval_s() - time.monotonic()
+        if wait <= 0:
+            self.flush_ui()
         else:
-            self.btn_install.setStyleSheet("background-color:#444; color:white; font-size:13px;")
-            self.btn_reports.setStyleSheet("background-color:#666; color:white; font-size:13px;")
-
-    def cool_process(self, dt):
-        target = 0.0
-        #liniowo: w 10 s dochodzi do target (z grubsza)
-        rate = (target - self.cold.temp_c) / 10.0
-        self.cold.temp_c += rate * dt
-
-    def heat_process(self, dt):
-        target = 100.0
-        rate = (target - self.hot.temp_c) / 10.0
-        self.hot.temp_c += rate * dt
-
-        #świecenie grzałki: moc ~ im dalej od 100
-        self.heater.set_power(max(0.0, min(1.0, abs(target - self.hot.temp_c) / 60.0)))
+            self.ui_timer.start(int(wait * 1000) + 1)
+
+    def flush_ui(self):
+        self.last_flush = time.monotonic()
+        #ukryte strony same się odświeżą przy pokazaniu
+        self.page_install.sync()
+        if 1 in self._pages:
+            self._pages[1].refresh()
+        if 2 in self._pages:
+            self._pages[2].sync()
+
+    def record_history(self, t: float):
+        #wątek symulacji, po każdym kroku: historia + tagi procesu (alarmy, Modbus)
+        eng = self.engine
+        values = sample_engine(eng)
+        self.historian.record(t, values)
+        if self.archive is not None:
+            self.archive.append(self.archive_t0 + t, values)  #tylko kopia do bufora bloku
+        if self.shm is not None:
+            self.shm.publish(eng, t)
+        write_inputs(self.proc_tags, eng.inputs, t)
+        write_engine(self.proc_tags, eng, t)
+        self.proc_tags.publish(t)
+
+    def apply_snapshot(self, snap: Snapshot):
+        #wątek GUI: najnowsza migawka -> kopie zbiorników i tagi widoków (raz na klatkę)
+        if snap.seq == self.snapshot.seq:
+            return False
+        if snap.alarms != self.snapshot.alarms:
+            self.mark_reports_dirty()
+        if self.cb_auto.isChecked() and (snap.value("sp.cold_rate"), snap.value("sp.hot_rate")) != (
+                self.snapshot.value("sp.cold_rate"), self.snapshot.value("sp.hot_rate")):
+            self.show_inputs(Inputs(snap.value("sp.pump_rate"), snap.value("sp.cold_rate"),
+                                    snap.value("sp.hot_rate"), snap.value("sp.running")))
+        self.snapshot = snap
+        for tid, tank in self.display_tanks.items():
+            tank.volume_l = snap.value(f"{tid}.volume_l")
+            tank.temp_c = snap.value(f"{tid}.temp_c")
+        self.tags.write_many(snap.t, snap.items())
+        self.tags.publish(snap.t)
+        return True
+
+    def set_profiling(self, on: bool):
+        #podmiana punktów pomiarowych pod blokadą – nie w środku porcji kroków symulacji
+        with self.worker.lock:
+            if on:
+                self.profiler.reset()
+            self.profiler.set_enabled(on)
+        if self.btn_profile.isChecked() != on:
+            self.btn_profile.setChecked(on)
+        self.page_install.show_overlay(on)
+
+    def acknowledge_alarms(self):
+        self.worker.acknowledge()
+
+    def start_modbus(self, port: int = 5020, host: str = "127.0.0.1") -> "ModbusServer":
+        from modbus_server import ModbusServer  #asyncio tylko, gdy serwer faktycznie potrzebny
+
+        #serwer działa we własnym wątku; tu tylko odbieramy zapisane nastawy
+        with self.worker.lock:  #subskrypcja tagów procesu – nie w trakcie ich publikacji
+            self.modbus = ModbusServer(self.proc_tags, host, port)
+        self.modbus.start()
+        return self.modbus
+
+    def start_hmi(self, port: int = 8080, host: str = "127.0.0.1") -> "RemoteHMI":
+        from remote_hmi import RemoteHMI  #asyncio tylko, gdy podgląd faktycznie potrzebny
+
+        worker = self.worker
+
+        def extras():
+            #wątek serwera: raport i alarmy z ostatniej migawki (niezmiennej – bez blokady)
+            snap = worker.latest()
+            return {"report": list(snap.report) + self.archive_report(),
+                    "alarms": [r.message if acked else f"{r.message} [niepotwierdzony]"
+                               for r, since, acked in snap.alarms]}
+
+        with worker.lock:  #subskrypcja tagów procesu – nie w trakcie ich publikacji
+            self.hmi = RemoteHMI(self.proc_tags, host, port, extras=extras)
+        self.hmi.start()
+        return self.hmi
+
+    def start_archive(self, root) -> "ArchiveWriter":
+        from archive import Archive, ArchiveWriter  #moduł tylko, gdy archiwum włączone
+
+        #czas archiwum rośnie także między sesjami (symulacja bywa szybsza niż zegar)
+        old = Archive(root)
+        span = old.time_span()
+        old.close()
+        t_wall = time.time()
+        if span is not None and span[1] >= t_wall:
+            t_wall = span[1] + 1.0
+        with self.worker.lock:  #record_history czyta archive w wątku symulacji
+            self.archive_t0 = t_wall - self.worker.t
+            self.archive = ArchiveWriter(root, ENGINE_TAGS)
+        return self.archive
+
+    def start_shm(self, name: str) -> "ShmPublisher":
+        from shm_state import ShmPublisher  #moduł tylko, gdy publikacja włączona
+
+        with self.worker.lock:  #record_history publikuje w wątku symulacji
+            self.shm = ShmPublisher(name)
+        return self.shm
+
+    def archive_report(self) -> list[str]:
+        arch = self.archive
+        if arch is None:
+            return []
+        raw = arch.rows * (8 + 4 * len(arch.tags))
+        ratio = f", {raw / arch.bytes:.0f}× mniej niż surowe" if arch.bytes else ""
+        return [f"Archiwum ({arch.root}): {arch.rows} próbek, {arch.bytes / 1e6:.2f} MB na dysku{ratio}"]
+
+    def apply_remote_setpoints(self, writes: dict):
+        #nastawy z sieci przechodzą przez suwaki (ta sama rozdzielczość 0.1 L/tick)
+        sliders = {"sp.pump_rate": self.sl_speed, "sp.cold_rate": self.sl_cold, "sp.hot_rate": self.sl_hot}
+        for name, value in writes.items():
+            if name == "sp.running":
+                self.running = bool(value)
+                self.send_inputs()
+            elif name in sliders:
+                sliders[name].setValue(int(round(value * 10)))
+
+    def on_timer(self):
+        #nastawy z sieci idą do wątku symulacji, stamtąd wraca najnowsza migawka
+        if self.modbus is not None:
+            self.apply_remote_setpoints(self.modbus.drain_writes())
+        if self.apply_snapshot(self.worker.latest()):
+            self.request_ui()
+        if self.worker.error is not None:
+            #wątek symulacji stanął – zostaje ostatnia migawka, a tytuł strony pokazuje błąd
+            self.timer.stop()
+            self.request_ui()
 
     def step(self):
-        pump_rate = self.sl_speed.value() / 10.0
-        cold_rate = self.sl_cold.value() / 10.0  # L/tick
-        hot_rate = self.sl_hot.value() / 10.0  # L/tick
-        dt = 0.03  # bo timer masz 30 ms
-        self.t_sim += dt
-
-        self.lbl_cold.setText(f"Zimna → mix: {cold_rate:.1f} L/tick")
-        self.lbl_hot.setText(f"Ciepła → mix: {hot_rate:.1f} L/tick")
-
-        self.lbl_speed.setText(f"Szybkość pompy: {pump_rate:.1f} L/tick")
-
-        if self.cold.volume_l > 0.1:
-            self.cool_process(dt)
-
-        if self.hot.volume_l > 0.1:
-            self.heat_process(dt)
-        else:
-            self.heater.set_power(0.0)
-
-        if not self.running:
-            for pp in self.pipes:
-                pp.set_flow(False)
-            self.pump_split.set_active(False)
-            self.pump_cold_out.set_active(False)
-            self.pump_hot_out.set_active(False)
-            self.heater.set_power(0.0)
-            self.page_reports.refresh()
-            self.page_install.update()
-
-            return
-
-        for pp in self.pipes:
-            pp.set_flow(False)
-
-        #PHASE 1: NAJPIERW NAPEŁNIJ COLD I HOT
-        if self.phase == "FILL":
-            self.pump_split.set_active(True)
-            self.pump_cold_out.set_active(False)
-            self.pump_hot_out.set_active(False)
+        #jeden krok fizyki z odświeżeniem GUI (bez zegara)
+        self.worker.step_now()
+        self.apply_snapshot(self.worker.latest())
+        self.request_ui()
 
-            #Pompuj tylko do momentu, aż oba pełne
-            if not (self.cold.is_full() and self.hot.is_full()) and not self.big.is_empty():
-                take = self.big.remove(pump_rate)
-
-                #rozdział 50/50, ale dociśnij do pełna
-                to_cold = take * 0.5
-                to_hot = take * 0.5
-
-                added_c = self.cold.add(to_cold, self.big.temp_c)
-                rest = to_cold - added_c
-                if rest > 0:
-                    self.hot.add(rest, self.big.temp_c)
-
-                added_h = self.hot.add(to_hot, self.big.temp_c)
-                rest2 = to_hot - added_h
-                if rest2 > 0:
-                    self.cold.add(rest2, self.big.temp_c)
-
-                self.pipe_big_to_pump.set_flow(True)
-                self.pipe_pump_to_cold.set_flow(True)
-                self.pipe_pump_to_hot.set_flow(True)
-
-            #gdy oba pełne -> przejdź do sterowania miksowaniem
-            if self.cold.is_full() and self.hot.is_full():
-                self.phase = "MIX"
-
-            self.page_reports.refresh()
-            self.page_install.update()
-
-            return
-
-        #liczymy tylko jeśli w zbiorniku jest woda i jeszcze nie jest gotowy
-        if self.cold.volume_l > 0.1 and not self.cold_ready:
-            self.cold_heat_t += dt
-            if self.cold_heat_t >= 10.0:
-                self.cold_ready = True
-
-        if self.hot.volume_l > 0.1 and not self.hot_ready:
-            self.hot_heat_t += dt
-            if self.hot_heat_t >= 10.0:
-                self.hot_ready = True
-
-        #PHASE 2: Teraz sami sterujemy do mieszalnika
-        self.pump_split.set_active(False)  #rozdział już nie pracuje
-        self.pump_cold_out.set_active(False)
-        self.pump_hot_out.set_active(False)
-
-        if not self.mix.is_full():
-            #tu zostaje Twoje nalewanie jak było
-            cold_out = 0.0
-            if not self.cold_ready:
-                cold_out = 0.0
-            else:
-                cold_out = min(cold_rate, self.cold.volume_l)
-
-            hot_out = 0.0
-            if not self.hot_ready:
-                hot_out = 0.0
-            else:
-                hot_out = min(hot_rate, self.hot.volume_l)
-
-            removed_c = self.cold.remove(cold_out)
-            if removed_c > 0:
-                self.mix.add(removed_c, self.cold.temp_c)
-                self.pipe_cold_to_mix.set_flow(True)
-                self.pump_cold_out.set_active(True)
-
-            removed_h = self.hot.remove(hot_out)
-            if removed_h > 0:
-                self.mix.add(removed_h, self.hot.temp_c)
-                self.pipe_hot_to_mix.set_flow(True)
-                self.pump_hot_out.set_active(True)
-
-        else:
-            #MIX pełny – ustaw komunikat raz
-            if self.mix_full_msg == "":
-                self.mix_full_msg = f"Otrzymano wyregulowaną temperaturę: {self.mix.temp_c:.1f}°C (mieszalnik pełny)."
-
-        self.page_reports.refresh()
-        self.page_install.update()
+    def closeEvent(self, e):
+        self.worker.stop()
+        if self.archive is not None:
+            self.archive.close()
+        if self.shm is not None:
+            self.shm.close()
+        super().closeEvent(e)
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    w = SymulacjaMieszania()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--plant", default=PLANT_PATH, help="konfiguracja instalacji (zbiorniki i pompy silnika)")
+    ap.add_argument("--modbus-port", type=int, default=None, help="udostępnij tagi przez Modbus-TCP na tym porcie")
+    ap.add_argument("--hmi-port", type=int, default=None,
+                    help="zdalny podgląd instalacji w przeglądarce (http://127.0.0.1:PORT/)")
+    ap.add_argument("--profile-trace", default=None,
+                    help="profiluj od startu i przy wyjściu zapisz ślad (chrome://tracing, Perfetto)")
+    ap.add_argument("--state", default=None, help="start (i RESET) z punktu kontrolnego zapisanego przyciskiem")
+    ap.add_argument("--record", default=None,
+                    help="zapisuj nastawy operatora do pliku (odtwarzanie: python replay.py PLIK)")
+    ap.add_argument("--archive", default=None,
+                    help="zapisuj historię do archiwum na dysku (odczyt i eksport: python archive.py KATALOG)")
+    ap.add_argument("--shm", default=None, metavar="NAZWA",
+                    help="publikuj stan w pamięci współdzielonej (odczyt: python shm_state.py NAZWA)")
+    args, qt_args = ap.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    try:
+        w = SymulacjaMieszania(args.plant)
+    except (OSError, ValueError) as e:   #plik, JSON albo topologia niezgodna z silnikiem
+        sys.exit(f"Błąd konfiguracji instalacji: {e}")
+    if args.modbus_port is not None:
+        app.aboutToQuit.connect(w.start_modbus(args.modbus_port).stop)
+    if args.hmi_port is not None:
+        app.aboutToQuit.connect(w.start_hmi(args.hmi_port).stop)
+    if args.profile_trace:
+        w.set_profiling(True)
+        app.aboutToQuit.connect(lambda: w.profiler.dump_trace(args.profile_trace))
+    if args.state:
+        w.load_state(args.state, as_initial=True)
+    if args.record:
+        w.worker.record(args.record)  #plik zamyka worker.stop() przy zamknięciu okna
+    if args.archive:
+        w.start_archive(args.archive)
+    if args.shm:
+        try:
+            w.start_shm(args.shm)
+        except (RuntimeError, ValueError) as e:   #architektura bez gwarancji seqlocka albo obcy blok
+            sys.exit(f"Pamięć współdzielona: {e}")
     w.show()
     sys.exit(app.exec_())
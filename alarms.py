@@ -0,0 +1,233 @@
+import heapq
+import json
+from array import array
+from dataclasses import dataclass
+
+
+#SILNIK ALARMÓW
+#Reguły są deklarowane w konfiguracji (alarms.json). Reguła jest liczona tylko wtedy,
+#gdy zmieni się jeden z jej tagów (albo minie jej opóźnienie) – koszt ticka zależy od
+#liczby zmienionych tagów, a nie od liczby reguł.
+
+RAISE, CLEAR, ACK = 1, 2, 3
+EVENT_NAMES = {RAISE: "ALARM", CLEAR: "KONIEC", ACK: "POTW."}
+
+
+@dataclass
+class AlarmRule:
+    id: str
+    tag: str
+    type: str                      # "hi", "lo" albo "roc" (szybkość zmian na sekundę)
+    limit: float
+    message: str
+    deadband: float = 0.0          #histereza: alarm gaśnie dopiero po cofnięciu się o deadband
+    delay_on: float = 0.0          #warunek musi trwać tyle sekund, zanim alarm się zapali
+    window: float = 1.0            #roc: po tylu sekundach bez zmian szybkość uznajemy za 0
+    enable_tag: str | None = None  #alarm aktywny tylko gdy enable_tag > enable_above
+    enable_above: float = 0.0
+    priority: int = 1
+
+    def __post_init__(self):
+        if self.type not in ("hi", "lo", "roc"):
+            raise ValueError(f"nieznany typ reguły {self.type!r} ({self.id})")
+
+
+def load_rules(path) -> list[AlarmRule]:
+    with open(path, encoding="utf-8") as f:
+        return [AlarmRule(**d) for d in json.load(f)]
+
+
+class AlarmJournal:
+    #dziennik w zwartych tablicach (bez obiektu na wpis) – 100k wpisów to ~2 MB
+    def __init__(self):
+        self.t = array("d")
+        self.rule = array("i")
+        self.kind = array("b")
+        self.value = array("f")
+
+    def __len__(self):
+        return len(self.t)
+
+    def append(self, t: float, rule: int, kind: int, value: float):
+        self.t.append(t)
+        self.rule.append(rule)
+        self.kind.append(kind)
+        self.value.append(value)
+
+    def entry(self, i: int) -> tuple[float, int, int, float]:
+        return self.t[i], self.rule[i], self.kind[i], self.value[i]
+
+
+class _State:
+    __slots__ = ("active", "acked", "since", "pending", "token", "last_v", "last_t", "rate")
+
+    def __init__(self):
+        self.active = False
+        self.acked = True
+        self.since = 0.0
+        self.pending = False
+        self.token = 0
+        self.last_v = None
+        self.last_t = None
+        self.rate = 0.0
+
+
+class AlarmEngine:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.index = {r.id: i for i, r in enumerate(self.rules)}
+        self.states = [_State() for _ in self.rules]
+        self.values = {}
+        self.journal = AlarmJournal()
+        self._active = set()
+        self.listeners = []  #fn(t, rule_index, kind)
+        self._timers = []    #kopiec (czas, nr reguły, token)
+
+        self.by_tag = {}
+        for i, r in enumerate(self.rules):
+            self.by_tag.setdefault(r.tag, []).append(i)
+            if r.enable_tag:
+                self.by_tag.setdefault(r.enable_tag, []).append(i)
+
+    #WEJŚCIE
+
+    def update(self, t: float, changed: dict):
+        #changed: tylko tagi, które się zmieniły od ostatniego wywołania
+        self._run_timers(t)
+        if not changed:
+            return
+        self.values.update(changed)
+        todo = set()
+        for tag in changed:
+            todo.update(self.by_tag.get(tag, ()))
+        for i in sorted(todo):
+            self._on_change(i, t)
+
+    def feed_sample(self, t: float, tags, values):
+        #wygodne wejście dla pełnej próbki – przekazuje dalej tylko różnice
+        vals = self.values
+        changed = {tag: v for tag, v in zip(tags, values) if vals.get(tag) != v}
+        self.update(t, changed)
+
+    #LOGIKA REGUŁ
+
+    def _on_change(self, i: int, t: float):
+        r, st = self.rules[i], self.states[i]
+        if r.type == "roc":
+            v = self.values.get(r.tag)
+            if v is not None and v != st.last_v:
+                if st.last_t is not None and t > st.last_t:
+                    st.rate = abs(v - st.last_v) / (t - st.last_t)
+                st.last_v, st.last_t = v, t
+                if st.rate > r.limit:
+                    #bez kolejnych zmian szybkość spada do zera – sprawdź ponownie po oknie
+                    self._schedule(t + r.window, i, -1)
+        self._evaluate(i, t)
+
+    def _condition(self, i: int) -> bool | None:
+        #True = warunek alarmu, False = warunek wygaszenia, None = strefa histerezy
+        r, st = self.rules[i], self.states[i]
+        if r.enable_tag and self.values.get(r.enable_tag, 0.0) <= r.enable_above:
+            return False
+        v = self.values.get(r.tag)
+        if v is None:
+            return False
+
+        if r.type == "hi":
+            on, off = v > r.limit, v < r.limit - r.deadband
+        elif r.type == "lo":
+            on, off = v < r.limit, v > r.limit + r.deadband
+        else:
+            on, off = st.rate > r.limit, st.rate < r.limit - r.deadband
+        if on:
+            return True
+        if off:
+            return False
+        return None
+
+    def _evaluate(self, i: int, t: float):
+        st = self.states[i]
+        cond = self._condition(i)
+        if cond is None:
+            return
+        if cond and not st.active:
+            delay = self.rules[i].delay_on
+            if delay <= 0:
+                self._raise(i, t)
+            elif not st.pending:
+                st.pending = True
+                st.token += 1
+                self._schedule(t + delay, i, st.token)
+        elif not cond:
+            if st.pending:
+                st.pending = False
+                st.token += 1
+            if st.active:
+                self._emit(i, t, CLEAR)
+                st.active = False
+                self._active.discard(i)
+
+    def _schedule(self, when: float, i: int, token: int):
+        heapq.heappush(self._timers, (when, i, token))
+
+    def _run_timers(self, t: float):
+        timers = self._timers
+        while timers and timers[0][0] <= t:
+            when, i, token = heapq.heappop(timers)
+            st = self.states[i]
+            if token == -1:
+                #roc: upłynęło okno bez zmian wartości – szybkość 0
+                if st.last_t is not None and when - st.last_t >= self.rules[i].window - 1e-9:
+                    st.rate = 0.0
+                    self._evaluate(i, when)
+            elif token == st.token and st.pending:
+                st.pending = False
+                if self._condition(i):
+                    self._raise(i, when)
+
+    def _raise(self, i: int, t: float):
+        st = self.states[i]
+        st.active = True
+        st.acked = False
+        st.since = t
+        self._active.add(i)
+        self._emit(i, t, RAISE)
+
+    def _emit(self, i: int, t: float, kind: int):
+        v = self.values.get(self.rules[i].tag, 0.0)
+        self.journal.append(t, i, kind, v)
+        for fn in self.listeners:
+            fn(t, i, kind)
+
+    #OPERATOR
+
+    def acknowledge(self, t: float, rule_id: str | None = None):
+        ids = [self.index[rule_id]] if rule_id is not None else sorted(self._active)
+        for i in ids:
+            st = self.states[i]
+            if st.active and not st.acked:
+                st.acked = True
+                self._emit(i, t, ACK)
+
+    def active(self) -> list[tuple[AlarmRule, float, bool]]:
+        #(reguła, od kiedy, potwierdzony) – najstarsze najpierw
+        out = [(self.rules[i], self.states[i].since, self.states[i].acked) for i in self._active]
+        out.sort(key=lambda a: (a[1], -a[0].priority))
+        return out
+
+    def reset(self, t: float):
+        #aktywne alarmy gasną z wpisem KONIEC – dziennik nie zostaje z alarmem bez końca
+        for i in sorted(self._active):
+            self._emit(i, t, CLEAR)
+        for st in self.states:
+            st.__init__()
+        self.values.clear()
+        self._timers.clear()
+        self._active.clear()
+
+    def format_entry(self, i: int) -> str:
+        t, rule, kind, value = self.journal.entry(i)
+        r = self.rules[rule]
+        h, rem = divmod(t, 3600)
+        m, s = divmod(rem, 60)
+        return f"{int(h):02d}:{int(m):02d}:{s:06.3f}  {EVENT_NAMES[kind]:<6} {r.id:<12} {value:8.2f}  {r.message}"
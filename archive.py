@@ -0,0 +1,430 @@
+import argparse
+import math
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+
+import numpy as np
+
+
+#ARCHIWUM HISTORII NA DYSKU
+#Próbki (czas + wartości tagów) trafiają do plików partycji czasowych – jeden plik na
+#PARTITION_S sekund – dopisywanych tylko na końcu, w blokach po BLOCK_ROWS wierszy.
+#Wątek wywołujący append() tylko kopiuje wiersz do bufora bloku; kompresja i zapis
+#pełnego bloku idą w osobnym wątku zapisu (ani GUI, ani pętla symulacji nie czekają na dysk).
+#
+#Kompresja bloku (wektorowo, NumPy + zlib):
+#  czas    – wzorce bitowe float64 jako int64, delta z deltą (regularny tick = same zera)
+#  wartości – float32 każdej kolumny XOR z poprzednią próbką (wolno zmienne tagi = zera w
+#            starszych bajtach), potem przestawienie bajtów (najpierw wszystkie bajty 0, potem 1…)
+#Obie transformacje są bezstratne; zlib ściska powstałe ciągi zer.
+#
+#Obok każdej partycji leży rzadki indeks czasu: jeden rekord (t pierwsze, t ostatnie, offset,
+#wiersze) na blok. Zapytanie o zakres wyszukuje bloki binarnie w indeksie, a z pliku
+#mapowanego w pamięć (mmap) dekoduje tylko te bloki – koszt zależy od długości zakresu,
+#nie od wielkości archiwum. Blok bez rekordu indeksu (przerwany zapis) jest odzyskiwany
+#przy odczycie, blok urwany w połowie – pomijany.
+#
+#Format partycji (little-endian): MAGIC, wersja u8, liczba tagów u16, długość u16 + nazwy tagów
+#(UTF-8, rozdzielone "\n"), potem bloki: BLOCK_MAGIC, wiersze u32, t pierwsze f64,
+#t ostatnie f64, długość czasu u32, długość wartości u32, dane czasu, dane wartości.
+
+MAGIC = b"MSAR"
+VERSION = 1
+BLOCK_MAGIC = b"BLK1"
+PARTITION_S = 3600.0
+BLOCK_ROWS = 4096
+DATA_EXT = ".msar"
+INDEX_EXT = ".msidx"
+
+_HEADER = struct.Struct("<4sBH")
+_U16 = struct.Struct("<H")
+_BLOCK = struct.Struct("<4sIddII")
+INDEX_DTYPE = np.dtype([("t_first", "<f8"), ("t_last", "<f8"), ("offset", "<u8"), ("rows", "<u4"),
+                        ("pad", "<u4")])
+
+
+#KOMPRESJA BLOKU
+
+def _shuffle(words: np.ndarray) -> bytes:
+    return words.view(np.uint8).reshape(-1, words.itemsize).T.tobytes()
+
+
+def _unshuffle(data: bytes, dtype, n: int) -> np.ndarray:
+    size = np.dtype(dtype).itemsize
+    return np.frombuffer(data, np.uint8).reshape(size, n).T.copy().view(dtype).ravel()
+
+
+def encode_block(t: np.ndarray, values: np.ndarray, level: int = 6) -> tuple[bytes, bytes]:
+    #t: (n,) float64 rosnący, values: (n, tagi) float32
+    bits = np.ascontiguousarray(t, np.float64).view(np.int64)
+    dd = np.diff(bits, n=1, prepend=np.int64(0))
+    dd[1:] = np.diff(dd)
+    cols = np.ascontiguousarray(np.asarray(values, np.float32).T).view(np.uint32)
+    x = cols.copy()
+    x[:, 1:] ^= cols[:, :-1]
+    return zlib.compress(_shuffle(dd), level), zlib.compress(_shuffle(x.ravel()), level)
+
+
+def decode_block(t_data: bytes, v_data: bytes, n: int, ntags: int) -> tuple[np.ndarray, np.ndarray]:
+    dd = _unshuffle(zlib.decompress(t_data), np.int64, n)
+    t = np.cumsum(np.cumsum(dd)).view(np.float64)
+    x = _unshuffle(zlib.decompress(v_data), np.uint32, n * ntags).reshape(ntags, n)
+    values = np.bitwise_xor.accumulate(x, axis=1).view(np.float32).T
+    return t, values
+
+
+def _header(tags) -> bytes:
+    names = "\n".join(tags).encode("utf-8")
+    return _HEADER.pack(MAGIC, VERSION, len(tags)) + _U16.pack(len(names)) + names
+
+
+def _read_header(buf, path) -> tuple[list[str], int]:
+    #(tagi, offset pierwszego bloku)
+    if len(buf) < _HEADER.size + _U16.size:
+        raise ValueError(f"{path}: plik archiwum za krótki")
+    magic, version, ntags = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: to nie jest plik archiwum")
+    if version != VERSION:
+        raise ValueError(f"{path}: nieobsługiwana wersja archiwum {version}")
+    (n,) = _U16.unpack_from(buf, _HEADER.size)
+    pos = _HEADER.size + _U16.size
+    tags = bytes(buf[pos:pos + n]).decode("utf-8").split("\n") if ntags else []
+    return tags, pos + n
+
+
+def partition_of(t: float, partition_s: float = PARTITION_S) -> int:
+    return int(math.floor(t / partition_s))
+
+
+def _partition_name(part: int) -> str:
+    return f"{part:+011d}"
+
+
+#ZAPIS
+
+class ArchiveWriter:
+    def __init__(self, root, tags, partition_s: float = PARTITION_S, block_rows: int = BLOCK_ROWS,
+                 level: int = 6, max_pending: int = 64):
+        self.root = os.fspath(root)
+        self.tags = list(tags)
+        self.partition_s = partition_s
+        self.block_rows = block_rows
+        self.level = level
+        os.makedirs(self.root, exist_ok=True)
+
+        self._t = np.empty(block_rows)
+        self._v = np.empty((block_rows, len(self.tags)), np.float32)
+        self._n = 0
+        self._part = None
+        self._last_t = -math.inf
+        self.rows = 0          #wiersze przekazane do zapisu
+        self.bytes = 0         #bajty zapisane na dysk (dane + indeks), aktualizuje wątek zapisu
+
+        #wątek zapisu: kolejka ograniczona – przy zbyt wolnym dysku append() w końcu poczeka,
+        #zamiast zjadać pamięć
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._files = None     #(partycja, plik danych, plik indeksu) – tylko wątek zapisu
+        self._thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    #wątek wywołujący
+
+    def append(self, t: float, values):
+        if self._error is not None:
+            raise self._error
+        if t < self._last_t:
+            raise ValueError(f"czas archiwum musi rosnąć ({t} < {self._last_t})")
+        part = partition_of(t, self.partition_s)
+        if self._n and (part != self._part or self._n == self.block_rows):
+            self._submit()
+        self._part = part
+        self._t[self._n] = t
+        self._v[self._n] = values
+        self._n += 1
+        self._last_t = t
+
+    def flush(self):
+        #niepełny blok na dysk i czekanie, aż wątek zapisu skończy wszystko z kolejki
+        if self._n:
+            self._submit()
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+
+    def _submit(self):
+        n = self._n
+        self._queue.put((self._part, self._t[:n].copy(), self._v[:n].copy()))
+        self.rows += n
+        self._n = 0
+
+    #wątek zapisu
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._close_files()
+                    return
+                if self._error is None:
+                    self._write(*item)
+            except Exception as e:   #zgłaszane w wątku wywołującym przy następnym append/flush
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _open(self, part: int):
+        if self._files is not None and self._files[0] == part:
+            return self._files
+        self._close_files()
+        base = os.path.join(self.root, _partition_name(part))
+        data = open(base + DATA_EXT, "ab")
+        if data.tell() == 0:
+            data.write(_header(self.tags))
+        else:
+            with open(base + DATA_EXT, "rb") as f:
+                tags, _ = _read_header(f.read(_HEADER.size + _U16.size + 65535), base + DATA_EXT)
+            if tags != self.tags:
+                data.close()
+                raise ValueError(f"{base + DATA_EXT}: inne tagi niż w archiwum")
+        self._files = (part, data, open(base + INDEX_EXT, "ab"))
+        return self._files
+
+    def _close_files(self):
+        if self._files is not None:
+            self._files[1].close()
+            self._files[2].close()
+            self._files = None
+
+    def _write(self, part: int, t: np.ndarray, values: np.ndarray):
+        _, data, index = self._open(part)
+        t_data, v_data = encode_block(t, values, self.level)
+        offset = data.tell()
+        data.write(_BLOCK.pack(BLOCK_MAGIC, t.size, t[0], t[-1], len(t_data), len(v_data)) + t_data + v_data)
+        data.flush()
+        #indeks dopiero po danych – rekord indeksu zawsze wskazuje kompletny blok
+        rec = np.array([(t[0], t[-1], offset, t.size, 0)], INDEX_DTYPE)
+        index.write(rec.tobytes())
+        index.flush()
+        self.bytes += _BLOCK.size + len(t_data) + len(v_data) + INDEX_DTYPE.itemsize
+
+
+#ODCZYT
+
+class _Partition:
+    def __init__(self, base: str):
+        self.base = base
+        self.path = base + DATA_EXT
+        self.tags = None
+        self._start = 0
+        self._mm = None
+        self._f = None
+        self.index = np.empty(0, INDEX_DTYPE)
+        self._index_size = -1
+
+    def refresh(self):
+        #dociąga nowe bloki dopisane od poprzedniego odczytu (archiwum czytane w trakcie zapisu)
+        size = os.path.getsize(self.path)
+        if self._mm is None or size > len(self._mm):
+            self._map(size)
+        if self._mm is None:
+            return
+        try:
+            index_size = os.path.getsize(self.base + INDEX_EXT)
+        except OSError:
+            index_size = 0
+        if index_size != self._index_size:
+            with open(self.base + INDEX_EXT, "rb") as f:
+                raw = f.read(index_size - index_size % INDEX_DTYPE.itemsize) if index_size else b""
+            index = np.frombuffer(raw, INDEX_DTYPE)
+            #rekordy wskazujące poza dane (plik danych ucięty) – koniec użytecznego indeksu
+            n = index.size
+            while n and self._block_end(int(index["offset"][n - 1])) > len(self._mm):
+                n -= 1
+            self.index = index[:n]
+            self._index_size = index_size
+        self._scan_tail()
+
+    def _map(self, size: int):
+        self.close()
+        if size == 0:
+            return
+        self._f = open(self.path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.tags, self._start = _read_header(self._mm, self.path)
+
+    def _scan_tail(self):
+        #bloki bez rekordu indeksu (przerwa między zapisem danych a indeksu)
+        mm = self._mm
+        if self.index.size:
+            last = self.index[-1]
+            pos = self._block_end(int(last["offset"]))
+        else:
+            pos = self._start
+        extra = []
+        while pos + _BLOCK.size <= len(mm):
+            magic, rows, t0, t1, nt, nv = _BLOCK.unpack_from(mm, pos)
+            end = pos + _BLOCK.size + nt + nv
+            if magic != BLOCK_MAGIC or end > len(mm):
+                break   #blok urwany w połowie – pomijamy
+            extra.append((t0, t1, pos, rows, 0))
+            pos = end
+        if extra:
+            self.index = np.concatenate([self.index, np.array(extra, INDEX_DTYPE)])
+
+    def _block_end(self, offset: int) -> int:
+        if offset + _BLOCK.size > len(self._mm):
+            return math.inf
+        _, _, _, _, nt, nv = _BLOCK.unpack_from(self._mm, offset)
+        return offset + _BLOCK.size + nt + nv
+
+    def block(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        off = int(self.index["offset"][i])
+        _, rows, _, _, nt, nv = _BLOCK.unpack_from(self._mm, off)
+        pos = off + _BLOCK.size
+        return decode_block(self._mm[pos:pos + nt], self._mm[pos + nt:pos + nt + nv], rows, len(self.tags))
+
+    def blocks_in(self, t0: float, t1: float) -> range:
+        #indeksy bloków nachodzących na [t0, t1] – wyszukiwanie binarne po rzadkim indeksie
+        lo = int(np.searchsorted(self.index["t_last"], t0, side="left"))
+        hi = int(np.searchsorted(self.index["t_first"], t1, side="right"))
+        return range(lo, max(lo, hi))
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._f.close()
+        self._mm = self._f = None
+
+
+class Archive:
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        self._parts = {}
+        self.blocks_read = 0   #licznik dekodowanych bloków (diagnostyka zapytań)
+        self.refresh()
+
+    def refresh(self):
+        names = sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext == DATA_EXT and int(stem) not in self._parts:
+                self._parts[int(stem)] = _Partition(os.path.join(self.root, stem))
+        self._parts = dict(sorted(self._parts.items()))
+        for p in self._parts.values():
+            p.refresh()
+
+    @property
+    def tags(self) -> list[str]:
+        for p in self._parts.values():
+            if p.tags is not None:
+                return p.tags
+        return []
+
+    def __len__(self):
+        return int(sum(int(p.index["rows"].sum()) for p in self._parts.values()))
+
+    def nbytes(self) -> int:
+        return sum(os.path.getsize(p.path) + os.path.getsize(p.base + INDEX_EXT)
+                   for p in self._parts.values() if os.path.exists(p.base + INDEX_EXT))
+
+    def time_span(self) -> tuple[float, float] | None:
+        parts = [p for p in self._parts.values() if p.index.size]
+        if not parts:
+            return None
+        return float(parts[0].index["t_first"][0]), float(parts[-1].index["t_last"][-1])
+
+    def _columns(self, tags) -> list[int]:
+        if tags is None:
+            return list(range(len(self.tags)))
+        if isinstance(tags, str):
+            tags = [tags]
+        index = {name: i for i, name in enumerate(self.tags)}
+        return [index[name] for name in tags]
+
+    def iter_blocks(self, t0: float = -math.inf, t1: float = math.inf, tags=None):
+        #generator (czas, wartości[wiersze, tagi]) kolejnymi blokami z [t0, t1] – stała pamięć
+        cols = self._columns(tags)
+        for part in self._parts.values():
+            #partycje w kolejności czasu; zakres partycji z jej indeksu
+            if not part.index.size or part.index["t_last"][-1] < t0 or part.index["t_first"][0] > t1:
+                continue
+            for i in part.blocks_in(t0, t1):
+                t, v = part.block(i)
+                self.blocks_read += 1
+                a = int(np.searchsorted(t, t0, side="left"))
+                b = int(np.searchsorted(t, t1, side="right"))
+                if b > a:
+                    yield t[a:b], v[a:b][:, cols]
+
+    def query(self, tags, t0: float, t1: float) -> tuple[np.ndarray, np.ndarray]:
+        #(czas, wartości) z [t0, t1]; tags: nazwa -> wektor, lista/None -> tablica (wiersze, tagi)
+        chunks = list(self.iter_blocks(t0, t1, tags))
+        ncols = len(self._columns(tags))
+        t = np.concatenate([c[0] for c in chunks]) if chunks else np.empty(0)
+        v = np.concatenate([c[1] for c in chunks]) if chunks else np.empty((0, ncols), np.float32)
+        return t, (v[:, 0] if isinstance(tags, str) else v)
+
+    def export_csv(self, out, t0: float = -math.inf, t1: float = math.inf, tags=None) -> int:
+        #strumieniowo blok po bloku; zwraca liczbę wierszy
+        names = [self.tags[i] for i in self._columns(tags)]
+        out.write(",".join(["t", *names]) + "\n")
+        rows = 0
+        for t, v in self.iter_blocks(t0, t1, tags):
+            np.savetxt(out, np.column_stack([t, v.astype(np.float64)]), delimiter=",",
+                       fmt=["%.3f"] + ["%.7g"] * len(names))
+            rows += t.size
+        return rows
+
+    def close(self):
+        for p in self._parts.values():
+            p.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Archiwum historii: podsumowanie i eksport CSV zakresu czasu.")
+    ap.add_argument("root", help="katalog archiwum (Projekt_mini_Scada.py --archive KATALOG)")
+    ap.add_argument("--from", dest="t0", type=float, default=-math.inf, help="początek zakresu [s]")
+    ap.add_argument("--to", dest="t1", type=float, default=math.inf, help="koniec zakresu [s]")
+    ap.add_argument("--tags", default=None, help="tagi rozdzielone przecinkami (domyślnie wszystkie)")
+    ap.add_argument("--csv", default=None, help="eksport do pliku CSV ('-' = stdout)")
+    args = ap.parse_args(argv)
+
+    arch = Archive(args.root)
+    tags = args.tags.split(",") if args.tags else None
+    try:
+        if args.csv is None:
+            span = arch.time_span()
+            print(f"{len(arch)} próbek, {len(arch.tags)} tagów, {arch.nbytes() / 1e6:.2f} MB na dysku")
+            if span:
+                print(f"zakres czasu: {span[0]:.3f} – {span[1]:.3f} s")
+            return 0
+        out = sys.stdout if args.csv == "-" else open(args.csv, "w", newline="", encoding="utf-8")
+        try:
+            arch.export_csv(out, args.t0, args.t1, tags)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    finally:
+        arch.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
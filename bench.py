@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+from engine import MixingEngine, Inputs, TankModel
+
+
+#BENCHMARKI Z ZAPISANYM PUNKTEM ODNIESIENIA
+#Każdy przypadek przygotowuje stan i zwraca funkcję wykonującą n operacji. Mierzymy kilka
+#powtórzeń i bierzemy najlepszy czas na operację (najmniej szumu od systemu). Wynik porównujemy
+#z bench_baseline.json – wolniej o więcej niż próg (%) = regresja i kod wyjścia 1.
+#Punkt odniesienia zależy od maszyny: po zmianie sprzętu zapisujemy go od nowa (--save).
+
+BASELINE_PATH = Path(__file__).with_name("bench_baseline.json")
+THRESHOLD_PCT = 25.0
+
+CASES = {}
+
+
+def case(name: str, n: int, qt: bool = False):
+    #rejestracja przypadku: setup(n) -> run(); n = liczba operacji w jednym pomiarze
+    def deco(setup):
+        CASES[name] = (setup, n, qt)
+        return setup
+    return deco
+
+
+#MODEL
+
+@case("tank.add_remove", n=200_000)
+def bench_tank_add_remove(n):
+    tank = TankModel("T", 100.0, 50.0, 20.0)
+
+    def run():
+        add, remove = tank.add, tank.remove
+        for _ in range(n):
+            add(0.3, 60.0)
+            remove(0.3)
+    return run
+
+
+@case("engine.fill_mix", n=1)
+def bench_engine_fill_mix(n):
+    #pełny scenariusz bez GUI: napełnianie, kondycjonowanie i mieszanie do pełna
+    inputs = Inputs(pump_rate=1.0, cold_rate=0.3, hot_rate=0.2)
+
+    def run():
+        for _ in range(n):
+            eng = MixingEngine()
+            eng.run_until(condition=lambda e: e.mix.is_full(), inputs=inputs, max_steps=100_000)
+    return run
+
+
+@case("engine.step", n=20_000)
+def bench_engine_step(n):
+    eng = MixingEngine()
+    eng.inputs = Inputs(pump_rate=0.01, cold_rate=0.01, hot_rate=0.01)
+
+    def run():
+        step = eng.step
+        for _ in range(n):
+            step()
+    return run
+
+
+#GUI (platforma offscreen)
+
+_app = None
+_window = None
+
+
+def window():
+    #jedno okno na wszystkie przypadki Qt; wątek symulacji zatrzymany – kroki wykonujemy sami
+    global _app, _window
+    if _window is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        from Projekt_mini_Scada import SymulacjaMieszania
+
+        _app = QApplication.instance() or QApplication(sys.argv[:1])
+        _window = SymulacjaMieszania()
+        _window.worker.stop()
+        _window.sl_speed.setValue(10)
+        _window.sl_cold.setValue(3)
+        _window.sl_hot.setValue(2)
+        _window.show()
+        _window.worker.step_now(500)  #przepływy i grzałka w ruchu
+        _window.apply_snapshot(_window.worker.latest())
+        _app.processEvents()
+    return _window
+
+
+@case("gui.installation_paint", n=50, qt=True)
+def bench_installation_paint(n):
+    from PyQt5.QtCore import QPoint
+    from PyQt5.QtGui import QPixmap, QRegion
+    from PyQt5.QtWidgets import QWidget
+
+    w = window()
+    page = w.page_install
+    pm = QPixmap(page.size())
+    only_page = QWidget.RenderFlags(QWidget.DrawWindowBackground)  #bez przycisków i suwaków
+
+    def run():
+        for _ in range(n):
+            page.render(pm, QPoint(), QRegion(), only_page)  #pełne paintEvent do bufora
+    return run
+
+
+@case("gui.reports_refresh", n=500, qt=True)
+def bench_reports_refresh(n):
+    w = window()
+    w.switch_page(1)
+    page = w.page_reports
+    #dwie różne migawki na przemian – każde odświeżenie ma co przepisać
+    w.worker.step_now(1)
+    snaps = [w.worker.latest()]
+    w.worker.step_now(1)
+    snaps.append(w.worker.latest())
+
+    def run():
+        for i in range(n):
+            w.snapshot = snaps[i & 1]
+            page.dirty = True
+            page.refresh()
+    return run
+
+
+#POMIAR I PORÓWNANIE
+
+def measure(names, rounds: int = 10, min_time_s: float = 1.0) -> dict:
+    #najlepszy czas jednej operacji [s] dla każdego przypadku. Przypadki mierzymy na przemian
+    #(runda = po jednym pomiarze każdego) – chwilowe spowolnienie maszyny trafia w pojedyncze
+    #pomiary wszystkich przypadków, a nie we wszystkie pomiary jednego.
+    runs = {}
+    for name in names:
+        setup, n, _ = CASES[name]
+        runs[name] = (setup(n), n)
+        runs[name][0]()  #rozgrzewka
+    best = dict.fromkeys(names, float("inf"))
+    total = 0.0
+    done = 0
+    while done < rounds or total < min_time_s:
+        for name, (run, n) in runs.items():
+            t0 = time.perf_counter()
+            run()
+            dt = time.perf_counter() - t0
+            best[name] = min(best[name], dt / n)
+            total += dt
+        done += 1
+    return best
+
+
+def compare(results: dict, baseline: dict, threshold_pct: float = THRESHOLD_PCT) -> list[tuple]:
+    #(nazwa, teraz, odniesienie, zmiana %, regresja) – przypadki bez odniesienia: odniesienie None
+    rows = []
+    for name, now in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, now, None, None, False))
+            continue
+        change = (now / base - 1.0) * 100.0
+        rows.append((name, now, base, change, change > threshold_pct))
+    return rows
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["cases"]
+
+
+def save_baseline(results: dict, path: Path = BASELINE_PATH):
+    data = {
+        "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+        "cases": {name: results[name] for name in sorted(results)},
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def fmt_time(s: float) -> str:
+    for unit, k in (("s", 1.0), ("ms", 1e3), ("µs", 1e6)):
+        if s * k >= 1.0:
+            return f"{s * k:8.2f} {unit}"
+    return f"{s * 1e9:8.1f} ns"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarki modelu, silnika i rysowania offscreen z progiem regresji.")
+    ap.add_argument("cases", nargs="*", help=f"przypadki (domyślnie wszystkie): {', '.join(CASES)}")
+    ap.add_argument("--save", action="store_true", help="zapisz wyniki jako nowy punkt odniesienia")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD_PCT, help="dopuszczalne spowolnienie w %%")
+    ap.add_argument("--rounds", type=int, default=10, help="minimalna liczba rund pomiarów")
+    ap.add_argument("--min-time", type=float, default=1.0, help="minimalny łączny czas pomiarów [s]")
+    ap.add_argument("--no-gui", action="store_true", help="pomiń przypadki wymagające Qt")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = ap.parse_args(argv)
+
+    names = args.cases or [n for n, (_, _, qt) in CASES.items() if not (qt and args.no_gui)]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        ap.error(f"nieznane przypadki: {', '.join(unknown)}")
+
+    results = measure(names, args.rounds, args.min_time)
+
+    if args.save:
+        #zapis częściowy nie kasuje pozostałych przypadków
+        merged = {**load_baseline(args.baseline), **results}
+        save_baseline(merged, args.baseline)
+        for name, now in results.items():
+            print(f"{name:28s} {fmt_time(now)}/op  (zapisano)")
+        return 0
+
+    regressions = 0
+    for name, now, base, change, bad in compare(results, load_baseline(args.baseline), args.threshold):
+        if base is None:
+            print(f"{name:28s} {fmt_time(now)}/op  (brak odniesienia)")
+            continue
+        mark = "  REGRESJA" if bad else ""
+        print(f"{name:28s} {fmt_time(now)}/op  odniesienie {fmt_time(base)}  {change:+6.1f}%{mark}")
+        regressions += bad
+    if regressions:
+        print(f"{regressions} przypadk(i) wolniejsze o więcej niż {args.threshold:.0f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import struct
+
+from engine import MixingEngine, Inputs
+
+
+#PUNKTY KONTROLNE STANU SYMULACJI
+#Pełny stan silnika (zbiorniki, faza, czasy kondycjonowania, gotowość, nastawy, czas symulacji)
+#w jednym rekordzie binarnym o stałym układzie – zapis i odczyt to jedno pack/unpack (kilka µs).
+#Wyjścia dla wizualizacji (pompy, przepływy) nie są stanem: silnik liczy je od nowa w każdym kroku.
+#
+#Zbiorniki zapisujemy tak, jak je trzyma TankModel (objętość, energia, temperatura pustego) –
+#odczyt odtwarza stan co do bitu, więc dalszy przebieg jest identyczny jak bez zapisu.
+#
+#Format (little-endian): MAGIC, wersja u16, 19 × f64 stanu, 3 × f64 nastaw, running u8,
+#długość u16 + UTF-8 komunikatu mix_full_msg. Wersja 1 (15 × f64, zbiorniki jako objętość
+#i temperatura) jest nadal czytana.
+
+MAGIC = b"MSCK"
+VERSION = 2
+
+_PHASES = ("FILL", "MIX")
+_RECORD = struct.Struct("<4sH19d3dBH")
+_RECORD_V1 = struct.Struct("<4sH15d3dBH")
+_STATE_LEN = {1: 15, VERSION: 19}
+
+
+def engine_state(eng: MixingEngine) -> tuple:
+    #wszystko, od czego zależy następny krok (poza nastawami) – jako liczby
+    return (
+        eng.t_sim, float(_PHASES.index(eng.phase)), eng.cold_heat_t, eng.hot_heat_t,
+        float(eng.cold_ready), float(eng.hot_ready), eng.heater_power,
+        *eng.big.state(), *eng.cold.state(), *eng.hot.state(), *eng.mix.state(),
+    )
+
+
+def set_engine_state(eng: MixingEngine, state, mix_full_msg: str = ""):
+    (eng.t_sim, phase, eng.cold_heat_t, eng.hot_heat_t, cold_ready, hot_ready, eng.heater_power) = state[:7]
+    tanks = (eng.big, eng.cold, eng.hot, eng.mix)
+    if len(state) == 15:
+        #wersja 1: objętość i temperatura
+        for k, tank in enumerate(tanks):
+            v, t = state[7 + 2 * k:9 + 2 * k]
+            tank.set_state(v, v * t, t)
+    else:
+        for k, tank in enumerate(tanks):
+            tank.set_state(*state[7 + 3 * k:10 + 3 * k])
+    eng.phase = _PHASES[int(phase)]
+    eng.cold_ready = bool(cold_ready)
+    eng.hot_ready = bool(hot_ready)
+    eng.mix_full_msg = mix_full_msg
+    #wyjścia jak po kroku zatrzymanym – następny krok ustawi je według stanu
+    eng._stop_outputs()
+
+
+def save(eng: MixingEngine) -> bytes:
+    inp = eng.inputs
+    msg = eng.mix_full_msg.encode("utf-8")
+    return _RECORD.pack(MAGIC, VERSION, *engine_state(eng),
+                        inp.pump_rate, inp.cold_rate, inp.hot_rate, inp.running, len(msg)) + msg
+
+
+def restore(data: bytes, eng: MixingEngine | None = None) -> MixingEngine:
+    #stan z punktu kontrolnego do istniejącego silnika (widoki trzymają referencje) albo nowego
+    if len(data) < _RECORD_V1.size or data[:4] != MAGIC:
+        raise ValueError("to nie jest punkt kontrolny stanu")
+    (version,) = struct.unpack_from("<H", data, 4)
+    if version not in _STATE_LEN:
+        raise ValueError(f"nieobsługiwana wersja punktu kontrolnego: {version}")
+    rec = _RECORD if version == VERSION else _RECORD_V1
+    if len(data) < rec.size:
+        raise ValueError("punkt kontrolny uszkodzony (zła długość)")
+    fields = rec.unpack_from(data)
+    n = fields[-1]
+    if len(data) != rec.size + n:
+        raise ValueError("punkt kontrolny uszkodzony (zła długość)")
+
+    k = 2 + _STATE_LEN[version]
+    eng = eng or MixingEngine()
+    set_engine_state(eng, fields[2:k], data[rec.size:].decode("utf-8"))
+    eng.inputs = Inputs(fields[k], fields[k + 1], fields[k + 2], bool(fields[k + 3]))
+    return eng
+
+
+def fork(data: bytes, n: int) -> list[MixingEngine]:
+    #n niezależnych kopii instalacji z jednego punktu kontrolnego (np. warianty scenariusza)
+    return [restore(data) for _ in range(n)]
+
+
+def save_file(path, eng: MixingEngine):
+    with open(path, "wb") as f:
+        f.write(save(eng))
+
+
+def load_file(path, eng: MixingEngine | None = None) -> MixingEngine:
+    with open(path, "rb") as f:
+        return restore(f.read(), eng)
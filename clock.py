@@ -0,0 +1,76 @@
+import math
+import time
+
+from engine import TICK_S
+
+
+#ZEGAR SYMULACJI: stały krok fizyki + akumulator czasu rzeczywistego
+#Spóźniony timer GUI nie spowalnia czasu instalacji – zaległe kroki są nadrabiane
+#(najwyżej max_steps na klatkę, reszta jest odrzucana i liczona w dropped_s).
+
+SPEED_PAUSE = 0.0
+SPEED_MAX = math.inf
+
+
+class SimClock:
+    def __init__(self, step_fn, dt: float = TICK_S, speed: float = 1.0,
+                 max_steps: int = 10, max_budget_s: float = 0.015, now=time.monotonic):
+        self.step_fn = step_fn
+        self.dt = dt
+        self.max_steps = max_steps          #limit nadrabiania na klatkę (przy speed <= 10x)
+        self.max_budget_s = max_budget_s    #czas CPU na klatkę w trybie MAX
+        self.now = now
+
+        self.speed = speed
+        self.acc = 0.0
+        self.last = None
+        self.steps_total = 0
+        self.dropped_s = 0.0
+
+    def set_speed(self, speed: float):
+        self.speed = max(0.0, speed)
+        #po pauzie/zmianie nie nadrabiamy czasu sprzed zmiany
+        self.acc = 0.0
+        self.last = None
+
+    @property
+    def paused(self) -> bool:
+        return self.speed == SPEED_PAUSE
+
+    def tick(self) -> int:
+        #wołane z timera GUI; zwraca liczbę wykonanych kroków fizyki
+        t = self.now()
+        if self.last is None:
+            self.last = t
+            return 0
+        elapsed = t - self.last
+        self.last = t
+
+        if self.paused:
+            return 0
+
+        if math.isinf(self.speed):
+            #MAX: tyle kroków, ile zmieści się w budżecie klatki
+            n = 0
+            while self.now() - t < self.max_budget_s:
+                self.step_fn()
+                n += 1
+            self.steps_total += n
+            return n
+
+        self.acc += elapsed * self.speed
+        #szybsze tryby mogą nadrabiać proporcjonalnie więcej kroków na klatkę
+        cap = self.max_steps * max(1, int(math.ceil(self.speed)))
+        n = 0
+        while self.acc >= self.dt and n < cap:
+            self.step_fn()
+            self.acc -= self.dt
+            n += 1
+
+        if self.acc >= self.dt:
+            #nie dajemy rady – odrzuć zaległość zamiast spirali opóźnień
+            lost = self.acc - self.acc % self.dt
+            self.dropped_s += lost
+            self.acc -= lost
+        self.steps_total += n
+        return n
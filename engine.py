@@ -0,0 +1,360 @@
+import math
+import sys
+from dataclasses import dataclass
+
+
+#MODEL
+
+TICK_S = 0.03         #krok odniesienia: szybkości pomp podajemy w L/tick (tick = 30 ms)
+COND_TIME_S = 10.0    #czas kondycjonowania zimnego i gorącego zbiornika
+TAU_S = 10.0          #stała czasowa chłodzenia/grzania
+COLD_TARGET_C = 0.0
+HOT_TARGET_C = 100.0
+
+
+def relax(temp_c: float, target_c: float, dt: float, tau_s: float = TAU_S) -> float:
+    #dokładne rozwiązanie dT/dt = (target - T) / tau – stabilne dla dowolnie dużego dt
+    return target_c + (temp_c - target_c) * math.exp(-dt / tau_s)
+
+
+class TankModel:
+    #stan: objętość i energia (L·°C); przypisanie volume_l zachowuje temperaturę (jak dawny @dataclass)
+    __slots__ = ("name", "capacity_l", "_v", "_h", "_t")
+
+    def __init__(self, name: str, capacity_l: float, volume_l: float, temp_c: float):
+        self.name = name
+        self.capacity_l = capacity_l
+        self._v = volume_l
+        self._h = volume_l * temp_c
+        self._t = temp_c  #temperatura pustego zbiornika (ostatnia przed opróżnieniem)
+
+    @property
+    def volume_l(self) -> float:
+        return self._v
+
+    @volume_l.setter
+    def volume_l(self, v: float):
+        t = self.temp_c
+        self._v = v
+        self._h = v * t
+        self._t = t
+
+    @property
+    def temp_c(self) -> float:
+        #średnia temperatura w zbiorniku
+        v = self._v
+        return self._h / v if v > 1e-9 else self._t
+
+    @temp_c.setter
+    def temp_c(self, t: float):
+        self._h = self._v * t
+        self._t = t
+
+    @property
+    def energy_lc(self) -> float:
+        return self._h
+
+    def state(self) -> tuple:
+        #(objętość, energia, temperatura) – odtworzenie przez set_state jest dokładne co do bitu
+        return self._v, self._h, self.temp_c
+
+    def set_state(self, volume_l: float, energy_lc: float, temp_c: float):
+        self._v = volume_l
+        self._h = energy_lc
+        self._t = temp_c
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TankModel):
+            return NotImplemented
+        return ((self.name, self.capacity_l, self._v, self.temp_c)
+                == (other.name, other.capacity_l, other._v, other.temp_c))
+
+    __hash__ = None   #zmienny, jak dawny @dataclass
+
+    def __repr__(self) -> str:
+        return (f"TankModel(name={self.name!r}, capacity_l={self.capacity_l!r}, "
+                f"volume_l={self._v!r}, temp_c={self.temp_c!r})")
+
+    def relax_to(self, target_c: float, dt: float, tau_s: float = TAU_S) -> float:
+        #relax() na temperaturze zbiornika bez dwóch wywołań właściwości temp_c (pętla silnika)
+        v = self._v
+        t = relax(self._h / v if v > 1e-9 else self._t, target_c, dt, tau_s)
+        self._h = v * t
+        self._t = t
+        return t
+
+    def level(self) -> float:
+        if self.capacity_l <= 0:
+            return 0.0
+        return max(0.0, min(1.0, self._v / self.capacity_l))
+
+    def add(self, dV: float, Tin: float) -> float:
+        if dV <= 0:
+            return 0.0
+        v = self._v
+        added = min(dV, max(0.0, self.capacity_l - v))
+        if added <= 0:
+            return 0.0
+
+        if v <= 1e-9:
+            self._h = (v + added) * Tin
+        else:
+            self._h += added * Tin
+
+        self._v = v + added
+        return added
+
+    def remove(self, dV: float) -> float:
+        if dV <= 0:
+            return 0.0
+        v = self._v
+        removed = min(dV, max(0.0, v))
+        rest = v - removed
+        if rest > 1e-9:
+            #odpływ ma temperaturę zbiornika – temperatura pozostałej wody bez zmian
+            self._h -= removed * (self._h / v)
+        else:
+            self._t = self.temp_c
+            self._h = rest * self._t
+        self._v = rest
+        return removed
+
+    def is_empty(self) -> bool:
+        return self._v <= 0.1
+
+    def is_full(self) -> bool:
+        return self._v >= self.capacity_l - 0.1
+
+
+def heater_power_for(hot_temp_c: float) -> float:
+    return max(0.0, min(1.0, abs(HOT_TARGET_C - hot_temp_c) / 60.0))
+
+
+@dataclass
+class Inputs:
+    pump_rate: float = 0.3  #L/tick
+    cold_rate: float = 0.0  #L/tick
+    hot_rate: float = 0.0   #L/tick
+    running: bool = True
+
+
+#SILNIK (bez Qt) – GUI tylko go napędza
+
+class MixingEngine:
+    def __init__(self):
+        self.big = TankModel("Zbiornik główny", 200.0, 200.0, 20.0)
+        self.cold = TankModel("Zimny (0°C)", 100.0, 0.0, 20.0)
+        self.hot = TankModel("Gorący (100°C)", 100.0, 0.0, 20.0)
+        self.mix = TankModel("Mieszalnik", 100.0, 0.0, 0.0)
+        self.inputs = Inputs()
+        self.thermal = None   #model cieplny (thermal.ThermalModel); None = relaksacja do celu
+        self.reset()
+
+    def reset(self):
+        #stany
+        self.phase = "FILL"   # "FILL" albo "MIX"
+        self.t_sim = 0.0
+        self.cold_heat_t = 0.0
+        self.hot_heat_t = 0.0
+        self.cold_ready = False
+        self.hot_ready = False
+        self.mix_full_msg = ""
+
+        #zbiorniki (te same obiekty – widoki trzymają do nich referencje)
+        self.big.volume_l, self.big.temp_c = 200.0, 20.0
+        self.cold.volume_l, self.cold.temp_c = 0.0, 20.0
+        self.hot.volume_l, self.hot.temp_c = 0.0, 20.0
+        self.mix.volume_l, self.mix.temp_c = 0.0, 0.0
+
+        #wyjścia dla wizualizacji
+        self.heater_power = 0.0
+        self._stop_outputs()
+
+    def _stop_outputs(self):
+        self.pump_split_on = False
+        self.pump_cold_on = False
+        self.pump_hot_on = False
+        self.flow_big_to_pump = False
+        self.flow_pump_to_cold = False
+        self.flow_pump_to_hot = False
+        self.flow_cold_to_mix = False
+        self.flow_hot_to_mix = False
+
+    def cool_process(self, dt):
+        #relaksacja do 0°C ze stałą czasową 10 s (wzór zamknięty zamiast Eulera)
+        self.cold.relax_to(COLD_TARGET_C, dt)
+
+    def heat_process(self, dt):
+        temp_c = self.hot.relax_to(HOT_TARGET_C, dt)
+
+        #świecenie grzałki: moc ~ im dalej od 100
+        self.heater_power = heater_power_for(temp_c)
+
+    def step(self, dt: float = TICK_S, inputs: Inputs | None = None):
+        if inputs is not None:
+            self.inputs = inputs
+        inp = self.inputs
+
+        #szybkości są w L/tick – przeliczamy na dowolny krok dt
+        k = dt / TICK_S
+        pump_rate = inp.pump_rate * k
+        cold_rate = inp.cold_rate * k
+        hot_rate = inp.hot_rate * k
+        self.t_sim += dt
+
+        if self.thermal is not None:
+            self.heater_power = self.thermal.advance(self, dt)
+        else:
+            if self.cold.volume_l > 0.1:
+                self.cool_process(dt)
+
+            if self.hot.volume_l > 0.1:
+                self.heat_process(dt)
+            else:
+                self.heater_power = 0.0
+
+        self._stop_outputs()
+
+        if not inp.running:
+            self.heater_power = 0.0
+            return
+
+        #PHASE 1: NAJPIERW NAPEŁNIJ COLD I HOT
+        if self.phase == "FILL":
+            self.pump_split_on = True
+
+            #Pompuj tylko do momentu, aż oba pełne
+            if not (self.cold.is_full() and self.hot.is_full()) and not self.big.is_empty():
+                take = self.big.remove(pump_rate)
+                big_temp_c = self.big.temp_c  #temperatura liczona z energii – raz na krok
+
+                #rozdział 50/50, ale dociśnij do pełna
+                to_cold = take * 0.5
+                to_hot = take * 0.5
+
+                added_c = self.cold.add(to_cold, big_temp_c)
+                rest = to_cold - added_c
+                if rest > 0:
+                    self.hot.add(rest, big_temp_c)
+
+                added_h = self.hot.add(to_hot, big_temp_c)
+                rest2 = to_hot - added_h
+                if rest2 > 0:
+                    self.cold.add(rest2, big_temp_c)
+
+                self.flow_big_to_pump = True
+                self.flow_pump_to_cold = True
+                self.flow_pump_to_hot = True
+
+            #gdy oba pełne -> przejdź do sterowania miksowaniem
+            if self.cold.is_full() and self.hot.is_full():
+                self.phase = "MIX"
+            return
+
+        #liczymy tylko jeśli w zbiorniku jest woda i jeszcze nie jest gotowy
+        if self.cold.volume_l > 0.1 and not self.cold_ready:
+            self.cold_heat_t += dt
+            if self.cold_heat_t >= COND_TIME_S:
+                self.cold_ready = True
+
+        if self.hot.volume_l > 0.1 and not self.hot_ready:
+            self.hot_heat_t += dt
+            if self.hot_heat_t >= COND_TIME_S:
+                self.hot_ready = True
+
+        #PHASE 2: Teraz sami sterujemy do mieszalnika
+        if not self.mix.is_full():
+            cold_out = min(cold_rate, self.cold.volume_l) if self.cold_ready else 0.0
+            hot_out = min(hot_rate, self.hot.volume_l) if self.hot_ready else 0.0
+
+            removed_c = self.cold.remove(cold_out)
+            if removed_c > 0:
+                self.mix.add(removed_c, self.cold.temp_c)
+                self.flow_cold_to_mix = True
+                self.pump_cold_on = True
+
+            removed_h = self.hot.remove(hot_out)
+            if removed_h > 0:
+                self.mix.add(removed_h, self.hot.temp_c)
+                self.flow_hot_to_mix = True
+                self.pump_hot_on = True
+
+        else:
+            #MIX pełny – ustaw komunikat raz
+            if self.mix_full_msg == "":
+                self.mix_full_msg = f"Otrzymano wyregulowaną temperaturę: {self.mix.temp_c:.1f}°C (mieszalnik pełny)."
+
+    def run_until(self, t: float | None = None, condition=None, dt: float = TICK_S,
+                  inputs: Inputs | None = None, max_steps: int | None = None) -> int:
+        if t is None and condition is None and max_steps is None:
+            raise ValueError("run_until wymaga t, condition albo max_steps")
+        if inputs is not None:
+            self.inputs = inputs
+
+        steps = 0
+        while True:
+            if t is not None and self.t_sim >= t - 1e-9:
+                break
+            if condition is not None and condition(self):
+                break
+            if max_steps is not None and steps >= max_steps:
+                break
+            #ostatni krok przycinamy, żeby trafić dokładnie w t
+            h = dt if t is None else min(dt, t - self.t_sim)
+            self.step(h)
+            steps += 1
+        return steps
+
+    def report_lines(self) -> list[str]:
+        big, cold, hot, mix = self.big, self.cold, self.hot, self.mix
+        return [
+            f"Zbiornik główny: {big.volume_l:.0f}/{big.capacity_l:.0f} L, {big.temp_c:.1f}°C",
+            f"Zimny (0°C): {cold.volume_l:.0f}/{cold.capacity_l:.0f} L, {cold.temp_c:.1f}°C",
+            f"Gorący (100°C): {hot.volume_l:.0f}/{hot.capacity_l:.0f} L, {hot.temp_c:.1f}°C",
+            f"Mieszalnik: {mix.volume_l:.0f}/{mix.capacity_l:.0f} L, {mix.temp_c:.1f}°C",
+            f"Faza: {self.phase}",
+            f"Kondycjonowanie: {self.cold_heat_t:.1f}/{COND_TIME_S:.1f} s (zimny), "
+            f"{self.hot_heat_t:.1f}/{COND_TIME_S:.1f} s (gorący)",
+        ]
+
+
+#URUCHOMIENIE BEZ GUI
+
+def main(argv=None):
+    import argparse  #tylko dla wiersza poleceń – import silnika w procesach roboczych bez argparse
+
+    ap = argparse.ArgumentParser(description="Symulacja mieszania bez GUI (szybciej niż w czasie rzeczywistym).")
+    ap.add_argument("--pump", type=float, default=0.3, help="szybkość pompy rozdziału [L/tick]")
+    ap.add_argument("--cold", type=float, default=0.2, help="zimna -> mix [L/tick]")
+    ap.add_argument("--hot", type=float, default=0.2, help="ciepła -> mix [L/tick]")
+    ap.add_argument("--dt", type=float, default=TICK_S, help="krok symulacji [s]")
+    ap.add_argument("--until", type=float, default=None, help="czas symulacji [s]")
+    ap.add_argument("--until-full", action="store_true", help="zatrzymaj, gdy mieszalnik pełny")
+    ap.add_argument("--events", action="store_true", help="skacz od zdarzenia do zdarzenia zamiast ticków")
+    args = ap.parse_args(argv)
+
+    eng = MixingEngine()
+    inputs = Inputs(pump_rate=args.pump, cold_rate=args.cold, hot_rate=args.hot)
+    t_end = args.until
+    if t_end is None:
+        #bez limitu czasu "do pełna" mogłoby nie skończyć się nigdy (np. zerowe szybkości)
+        t_end = 24 * 3600.0 if args.until_full else 3600.0
+
+    cond = (lambda e: e.mix.is_full()) if args.until_full else None
+    if args.events:
+        from events import run_events
+        steps = run_events(eng, t=None if args.until_full and args.until is None else t_end,
+                           until=cond, inputs=inputs)
+    else:
+        steps = eng.run_until(t=t_end, condition=cond, dt=args.dt, inputs=inputs)
+
+    print(f"Czas symulacji: {eng.t_sim:.2f} s ({steps} kroków)")
+    for line in eng.report_lines():
+        print(line)
+    if eng.mix_full_msg:
+        print(eng.mix_full_msg)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
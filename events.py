@@ -0,0 +1,205 @@
+import math
+
+from engine import (MixingEngine, Inputs, TICK_S, TAU_S, COND_TIME_S,
+                    COLD_TARGET_C, HOT_TARGET_C, relax, heater_power_for)
+
+
+#SYMULACJA ZDARZENIOWA
+#Między zdarzeniami (zbiornik pełny/pusty, koniec kondycjonowania, ...) przepływy są
+#stałe, a temperatury mają rozwiązania zamknięte – można więc skoczyć od razu do
+#następnego zdarzenia zamiast liczyć tysiące ticków po 30 ms.
+#To granica modelu tickowego dla dt -> 0 (bez błędu kroku czasowego).
+
+EPS = 1e-9
+WET_L = 0.1   #poniżej tej objętości nie ma chłodzenia/grzania ani kondycjonowania (jak w step)
+
+
+def _fill_temp(v0, t0, q, t_in, a, target, h):
+    #zbiornik z dopływem q [L/s] o temperaturze t_in i relaksacją (współczynnik a=1/tau) do target
+    v = v0 + q * h
+    if v <= EPS:
+        return t0
+    if a == 0.0:
+        return (v0 * t0 + q * t_in * h) / v
+    em = math.exp(-a * h)
+    energy = (t0 * v0 * em
+              + (target * v0 + q * t_in / a) * (1.0 - em)
+              + target * q * (h - 1.0 / a + em / a))
+    return energy / v
+
+
+def _mean_integral(t0, target, a, h):
+    #całka temperatury relaksującej po czasie h
+    if a == 0.0:
+        return t0 * h
+    return target * h + (t0 - target) * (1.0 - math.exp(-a * h)) / a
+
+
+def _wet(volume, net):
+    return volume > WET_L + EPS or (volume >= WET_L - EPS and net > 0)
+
+
+def _flows(eng: MixingEngine, inp: Inputs) -> dict:
+    f = {"big_out": 0.0, "cold_in": 0.0, "hot_in": 0.0, "cold_out": 0.0, "hot_out": 0.0}
+    if not inp.running:
+        return f
+
+    if eng.phase == "FILL":
+        if not (eng.cold.is_full() and eng.hot.is_full()) and not eng.big.is_empty():
+            q = inp.pump_rate / TICK_S
+            cold_can = eng.cold.volume_l < eng.cold.capacity_l - EPS
+            hot_can = eng.hot.volume_l < eng.hot.capacity_l - EPS
+            f["big_out"] = q
+            #rozdział 50/50, a gdy jeden pełny – wszystko do drugiego
+            if cold_can and hot_can:
+                f["cold_in"] = f["hot_in"] = q * 0.5
+            elif cold_can:
+                f["cold_in"] = q
+            elif hot_can:
+                f["hot_in"] = q
+        return f
+
+    if not eng.mix.is_full():
+        if eng.cold_ready and eng.cold.volume_l > EPS:
+            f["cold_out"] = inp.cold_rate / TICK_S
+        if eng.hot_ready and eng.hot.volume_l > EPS:
+            f["hot_out"] = inp.hot_rate / TICK_S
+    return f
+
+
+def _nets(eng, f):
+    #(zbiornik, przepływ netto [L/s]) w kolejności big, cold, hot, mix
+    return [
+        (eng.big, -f["big_out"]),
+        (eng.cold, f["cold_in"] - f["cold_out"]),
+        (eng.hot, f["hot_in"] - f["hot_out"]),
+        (eng.mix, f["cold_out"] + f["hot_out"]),
+    ]
+
+
+def _timers_running(eng, inp, nets):
+    if not inp.running or eng.phase != "MIX":
+        return False, False
+    return (not eng.cold_ready and _wet(eng.cold.volume_l, nets[1][1]),
+            not eng.hot_ready and _wet(eng.hot.volume_l, nets[2][1]))
+
+
+def next_event(eng: MixingEngine, inputs: Inputs | None = None) -> float:
+    #czas [s] do najbliższego zdarzenia przy obecnych przepływach (inf = nic się nie wydarzy)
+    inp = inputs or eng.inputs
+    f = _flows(eng, inp)
+    nets = _nets(eng, f)
+    h = math.inf
+
+    for tank, net in nets:
+        if net == 0.0:
+            continue
+        for thr in (0.0, WET_L, tank.capacity_l - WET_L, tank.capacity_l):
+            if net > 0 and thr > tank.volume_l + EPS:
+                h = min(h, (thr - tank.volume_l) / net)
+            elif net < 0 and thr < tank.volume_l - EPS:
+                h = min(h, (tank.volume_l - thr) / -net)
+
+    cold_t, hot_t = _timers_running(eng, inp, nets)
+    if cold_t:
+        h = min(h, COND_TIME_S - eng.cold_heat_t)
+    if hot_t:
+        h = min(h, COND_TIME_S - eng.hot_heat_t)
+    return max(h, 0.0)
+
+
+def _snap(x, targets):
+    for t in targets:
+        if abs(x - t) < 1e-7:
+            return t
+    return x
+
+
+def advance(eng: MixingEngine, h: float, inputs: Inputs | None = None):
+    #przesuń stan o h sekund; h nie może przekraczać next_event()
+    inp = inputs or eng.inputs
+    f = _flows(eng, inp)
+    nets = _nets(eng, f)
+    cold_t, hot_t = _timers_running(eng, inp, nets)
+    a = 1.0 / TAU_S
+    a_c = a if _wet(eng.cold.volume_l, nets[1][1]) else 0.0
+    a_h = a if _wet(eng.hot.volume_l, nets[2][1]) else 0.0
+    big, cold, hot, mix = eng.big, eng.cold, eng.hot, eng.mix
+
+    #temperatury liczone z objętości na początku odcinka; ustawiane po objętościach
+    #(TankModel trzyma energię – przypisanie objętości zachowuje energię, nie temperaturę)
+    tc0, th0, tm0, tb0 = cold.temp_c, hot.temp_c, mix.temp_c, big.temp_c
+    tc, th, tm = tc0, th0, tm0
+    if f["cold_in"] > 0:
+        tc = _fill_temp(cold.volume_l, tc0, f["cold_in"], tb0, a_c, COLD_TARGET_C, h)
+    elif a_c:
+        tc = relax(tc0, COLD_TARGET_C, h)
+    if f["hot_in"] > 0:
+        th = _fill_temp(hot.volume_l, th0, f["hot_in"], tb0, a_h, HOT_TARGET_C, h)
+    elif a_h:
+        th = relax(th0, HOT_TARGET_C, h)
+
+    q_mix = f["cold_out"] + f["hot_out"]
+    if q_mix > 0:
+        energy = (mix.volume_l * tm0
+                  + f["cold_out"] * _mean_integral(tc0, COLD_TARGET_C, a_c, h)
+                  + f["hot_out"] * _mean_integral(th0, HOT_TARGET_C, a_h, h))
+        tm = energy / (mix.volume_l + q_mix * h)
+
+    for tank, net in nets:
+        if net:
+            v = tank.volume_l + net * h
+            v = _snap(v, (0.0, WET_L, tank.capacity_l - WET_L, tank.capacity_l))
+            tank.volume_l = max(0.0, min(tank.capacity_l, v))
+    big.temp_c, cold.temp_c, hot.temp_c, mix.temp_c = tb0, tc, th, tm
+
+    if cold_t:
+        eng.cold_heat_t = _snap(eng.cold_heat_t + h, (COND_TIME_S,))
+        eng.cold_ready = eng.cold_heat_t >= COND_TIME_S
+    if hot_t:
+        eng.hot_heat_t = _snap(eng.hot_heat_t + h, (COND_TIME_S,))
+        eng.hot_ready = eng.hot_heat_t >= COND_TIME_S
+    eng.t_sim += h
+
+    #wyjścia dla wizualizacji – jak po ostatnim ticku odcinka
+    eng.pump_split_on = inp.running and eng.phase == "FILL"
+    eng.flow_big_to_pump = f["big_out"] > 0
+    eng.flow_pump_to_cold = eng.flow_pump_to_hot = f["big_out"] > 0
+    eng.flow_cold_to_mix = eng.pump_cold_on = f["cold_out"] > 0
+    eng.flow_hot_to_mix = eng.pump_hot_on = f["hot_out"] > 0
+    eng.heater_power = heater_power_for(hot.temp_c) if inp.running and hot.volume_l > WET_L else 0.0
+
+    #przejścia dyskretne
+    if eng.phase == "FILL" and cold.is_full() and hot.is_full():
+        eng.phase = "MIX"
+    elif eng.phase == "MIX" and inp.running and mix.is_full() and eng.mix_full_msg == "":
+        eng.mix_full_msg = f"Otrzymano wyregulowaną temperaturę: {mix.temp_c:.1f}°C (mieszalnik pełny)."
+
+
+def run_events(eng: MixingEngine, t: float | None = None, until=None,
+               inputs: Inputs | None = None, max_events: int = 100_000, stop_idle: bool = False) -> int:
+    #skacz od zdarzenia do zdarzenia; bez t (albo ze stop_idle) kończy, gdy proces stoi
+    #(brak kolejnych zdarzeń), z t – ostatni skok dochodzi dokładnie do t
+    if inputs is not None:
+        eng.inputs = inputs
+
+    n = 0
+    while n < max_events:
+        if until is not None and until(eng):
+            break
+        h = next_event(eng)
+        if math.isinf(h) and stop_idle:
+            break
+        if t is not None:
+            left = t - eng.t_sim
+            if left <= EPS:
+                break
+            h = min(h, left)
+        elif math.isinf(h):
+            break
+        advance(eng, h)
+        n += 1
+
+    if t is not None and abs(eng.t_sim - t) < 1e-7:
+        eng.t_sim = t
+    return n
@@ -0,0 +1,217 @@
+import numpy as np
+
+from engine import MixingEngine, TICK_S
+
+
+#HISTORIAN W PAMIĘCI
+#Każdy tick to jedna kolumna w prealokowanych tablicach (czas float64, wartości float32),
+#bez obiektów Pythona na próbkę. Obok surowych danych trzymamy agregaty min/max/avg
+#dla okresów 1 s, 1 min i 1 h, liczone przyrostowo. Czas jest rosnący, więc zakres
+#czasu znajdujemy wyszukiwaniem binarnym (O(log n)).
+
+ENGINE_TAGS = [
+    "big.volume_l", "big.temp_c",
+    "cold.volume_l", "cold.temp_c",
+    "hot.volume_l", "hot.temp_c",
+    "mix.volume_l", "mix.temp_c",
+    "pump_split", "pump_cold", "pump_hot",
+    "heater_power", "phase",
+    "cold_heat_t", "hot_heat_t",
+]
+
+#(okres agregatu [s], liczba przechowywanych kubełków)
+DEFAULT_TIERS = ((1.0, 8 * 3600), (60.0, 7 * 24 * 60), (3600.0, 365 * 24))
+
+SHIFT_S = 8 * 3600.0
+
+
+def sample_engine(eng: MixingEngine) -> list[float]:
+    #kolejność jak w ENGINE_TAGS
+    return [
+        eng.big.volume_l, eng.big.temp_c,
+        eng.cold.volume_l, eng.cold.temp_c,
+        eng.hot.volume_l, eng.hot.temp_c,
+        eng.mix.volume_l, eng.mix.temp_c,
+        float(eng.pump_split_on), float(eng.pump_cold_on), float(eng.pump_hot_on),
+        eng.heater_power, 0.0 if eng.phase == "FILL" else 1.0,
+        eng.cold_heat_t, eng.hot_heat_t,
+    ]
+
+
+class _Ring:
+    #bufor cykliczny: wspólna oś czasu + tablice (tagi x pojemność) dla każdego pola
+    def __init__(self, cap: int, ntags: int, fields):
+        self.cap = cap
+        self.t = np.zeros(cap, dtype=np.float64)
+        self.data = {f: np.zeros((ntags, cap), dtype=np.float32) for f in fields}
+        self.head = 0   #następna pozycja zapisu
+        self.n = 0
+
+    def push(self, t: float, cols: dict):
+        i = self.head
+        self.t[i] = t
+        for f, col in cols.items():
+            self.data[f][:, i] = col
+        self.head = (i + 1) % self.cap
+        self.n = min(self.n + 1, self.cap)
+
+    def segments(self):
+        #fizyczne zakresy w kolejności logicznej (czasowo rosnącej)
+        if self.n < self.cap:
+            return [(0, self.n)]
+        return [(self.head, self.cap), (0, self.head)]
+
+    def slices(self, t0: float, t1: float):
+        out = []
+        for a, b in self.segments():
+            seg = self.t[a:b]
+            lo = a + int(np.searchsorted(seg, t0, side="left"))
+            hi = a + int(np.searchsorted(seg, t1, side="right"))
+            if hi > lo:
+                out.append((lo, hi))
+        return out
+
+    def nbytes(self) -> int:
+        return self.t.nbytes + sum(a.nbytes for a in self.data.values())
+
+
+class _Rollup:
+    def __init__(self, period_s: float, cap: int, ntags: int):
+        self.period_s = period_s
+        self.ring = _Ring(cap, ntags, ("min", "max", "avg"))
+        self.start = None
+        self.count = 0
+        self.vmin = np.zeros(ntags)
+        self.vmax = np.zeros(ntags)
+        self.vsum = np.zeros(ntags)
+
+    def add(self, t: float, v: np.ndarray):
+        b = np.floor(t / self.period_s) * self.period_s
+        if self.count and b != self.start:
+            self.flush()
+        if not self.count:
+            self.start = b
+            self.vmin[:] = v
+            self.vmax[:] = v
+            self.vsum[:] = v
+        else:
+            np.minimum(self.vmin, v, out=self.vmin)
+            np.maximum(self.vmax, v, out=self.vmax)
+            self.vsum += v
+        self.count += 1
+
+    def flush(self):
+        self.ring.push(self.start, {"min": self.vmin, "max": self.vmax, "avg": self.vsum / self.count})
+        self.count = 0
+
+
+class Historian:
+    def __init__(self, tags, capacity: int, tiers=DEFAULT_TIERS):
+        self.tags = list(tags)
+        self.index = {name: i for i, name in enumerate(self.tags)}
+        self.raw = _Ring(capacity, len(self.tags), ("v",))
+        self.rollups = {float(p): _Rollup(float(p), cap, len(self.tags)) for p, cap in tiers}
+        self._v = np.zeros(len(self.tags))
+
+    @classmethod
+    def for_budget(cls, tags, budget_bytes: int, tiers=DEFAULT_TIERS):
+        #ile surowych próbek zmieści się w budżecie po odjęciu agregatów
+        ntags = len(tags)
+        rollup_bytes = sum(cap * (8 + 3 * 4 * ntags) for _, cap in tiers)
+        per_sample = 8 + 4 * ntags
+        capacity = (budget_bytes - rollup_bytes) // per_sample
+        if capacity <= 0:
+            raise ValueError("budżet pamięci za mały nawet na agregaty")
+        return cls(tags, int(capacity), tiers)
+
+    @classmethod
+    def for_shift(cls, tags=ENGINE_TAGS, shift_s: float = SHIFT_S, dt: float = TICK_S, tiers=DEFAULT_TIERS):
+        return cls(tags, int(np.ceil(shift_s / dt)), tiers)
+
+    def nbytes(self) -> int:
+        return self.raw.nbytes() + sum(r.ring.nbytes() for r in self.rollups.values())
+
+    def __len__(self):
+        return self.raw.n
+
+    def record(self, t: float, values):
+        v = self._v
+        v[:] = values
+        self.raw.push(t, {"v": v})
+        for r in self.rollups.values():
+            r.add(t, v)
+
+    def record_engine(self, eng: MixingEngine):
+        self.record(eng.t_sim, sample_engine(eng))
+
+    def time_span(self) -> tuple[float, float] | None:
+        if not self.raw.n:
+            return None
+        segs = self.raw.segments()
+        return float(self.raw.t[segs[0][0]]), float(self.raw.t[segs[-1][1] - 1])
+
+    def query(self, tag: str, t0: float, t1: float) -> tuple[np.ndarray, np.ndarray]:
+        #surowe próbki z [t0, t1]
+        i = self.index[tag]
+        parts = self.raw.slices(t0, t1)
+        t = np.concatenate([self.raw.t[a:b] for a, b in parts]) if parts else np.empty(0)
+        v = np.concatenate([self.raw.data["v"][i, a:b] for a, b in parts]) if parts else np.empty(0, np.float32)
+        return t, v
+
+    def query_rollup(self, tag: str, t0: float, t1: float, period_s: float) -> dict:
+        #agregaty z [t0, t1] (kubełki wg czasu początku) + bieżący, niedomknięty kubełek
+        r = self.rollups[float(period_s)]
+        i = self.index[tag]
+        ring = r.ring
+        parts = ring.slices(t0, t1)
+        out = {"t": [ring.t[a:b] for a, b in parts]}
+        for f in ("min", "max", "avg"):
+            out[f] = [ring.data[f][i, a:b] for a, b in parts]
+
+        if r.count and t0 <= r.start <= t1:
+            out["t"].append(np.array([r.start]))
+            out["min"].append(np.array([r.vmin[i]], np.float32))
+            out["max"].append(np.array([r.vmax[i]], np.float32))
+            out["avg"].append(np.array([r.vsum[i] / r.count], np.float32))
+
+        return {k: (np.concatenate(v) if v else np.empty(0)) for k, v in out.items()}
+
+    def latest(self, tag: str) -> float | None:
+        if not self.raw.n:
+            return None
+        return float(self.raw.data["v"][self.index[tag], (self.raw.head - 1) % self.raw.cap])
+
+    def envelope(self, tag: str, t0: float, t1: float, width: int) -> tuple[np.ndarray, np.ndarray]:
+        #min/max na kolumnę piksela dla [t0, t1); NaN tam, gdzie brak danych.
+        #Dla długich okien bierzemy najgrubszy agregat nie grubszy niż piksel,
+        #więc koszt nie rośnie z długością okna.
+        px_s = (t1 - t0) / width
+        tiers = [p for p in self.rollups if p <= px_s]
+        if tiers:
+            r = self.query_rollup(tag, t0, t1, max(tiers))
+            t, lo, hi = r["t"], r["min"], r["max"]
+        else:
+            t, v = self.query(tag, t0, t1)
+            lo = hi = v
+        return minmax_columns(t, lo, hi, t0, t1, width)
+
+
+def minmax_columns(t, lo, hi, t0: float, t1: float, width: int) -> tuple[np.ndarray, np.ndarray]:
+    out_lo = np.full(width, np.nan)
+    out_hi = np.full(width, np.nan)
+    if t.size == 0:
+        return out_lo, out_hi
+
+    #t jest posortowane – granice kolumn przez searchsorted, potem reduceat
+    edges = t0 + (t1 - t0) * np.arange(width + 1) / width
+    starts = np.searchsorted(t, edges[:-1], side="left")
+    ends = np.searchsorted(t, edges[1:], side="left")
+    filled = ends > starts
+    if not filled.any():
+        return out_lo, out_hi
+    #próbki za ostatnią kolumną nie mogą wpaść do ostatniego segmentu reduceat
+    n = ends[-1]
+    idx = starts[filled]
+    out_lo[filled] = np.minimum.reduceat(lo[:n], idx)
+    out_hi[filled] = np.maximum.reduceat(hi[:n], idx)
+    return out_lo, out_hi
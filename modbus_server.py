@@ -0,0 +1,344 @@
+import argparse
+import asyncio
+import dataclasses
+import math
+import queue
+import statistics
+import struct
+import sys
+import threading
+import time
+
+from tags import TagDB, ENGINE_TAG_SPECS, INPUT_TAG_SPECS, INPUT_RANGES, register_engine
+
+
+#SERWER MODBUS-TCP (asyncio, osobny wątek)
+#Stan instalacji jest odwzorowany na tablicę rejestrów: każdy tag liczbowy zajmuje
+#2 rejestry (float32, big-endian, najpierw starsze słowo). Rejestry wejściowe (FC 04)
+#to wartości procesu, rejestry holding (FC 03, zapis FC 16 całymi liczbami) to nastawy.
+#Tablica jest aktualizowana z subskrypcji bazy tagów (tylko zmiany), a odczyt to wycięcie bajtów
+#pod krótką blokadą – odpowiedź nie czeka na tick symulacji.
+#Zapisy klientów trafiają do kolejki, którą symulacja opróżnia na początku ticka.
+
+FC_READ_HOLDING = 0x03
+FC_READ_INPUT = 0x04
+FC_WRITE_SINGLE = 0x06
+FC_WRITE_MULTIPLE = 0x10
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_ADDRESS = 0x02
+ILLEGAL_VALUE = 0x03
+GATEWAY_TARGET_FAILED = 0x0B   #inny unit id niż serwera
+
+MAX_READ = 125
+MAX_WRITE = 123
+MAX_ADU = 254   #pole długości MBAP: unit id + PDU
+
+_MBAP = struct.Struct(">HHHB")   #transakcja, protokół, długość, unit id
+
+
+class RegisterTable:
+    def __init__(self, names):
+        #names: tagi w kolejności adresów (adres = 2 * pozycja)
+        self.names = list(names)
+        self.address = {n: 2 * i for i, n in enumerate(self.names)}
+        self.data = bytearray(4 * len(self.names))
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return 2 * len(self.names)
+
+    def set(self, name: str, value: float):
+        with self.lock:
+            struct.pack_into(">f", self.data, 2 * self.address[name], value)
+
+    def get(self, name: str) -> float:
+        with self.lock:
+            return struct.unpack_from(">f", self.data, 2 * self.address[name])[0]
+
+    def read(self, addr: int, count: int) -> bytes:
+        with self.lock:
+            return bytes(self.data[2 * addr:2 * (addr + count)])
+
+    def write(self, addr: int, raw: bytes):
+        with self.lock:
+            self.data[2 * addr:2 * addr + len(raw)] = raw
+
+    def tags_in(self, addr: int, count: int) -> list[str]:
+        #tagi, których oba rejestry mieszczą się w zakresie zapisu
+        first = (addr + 1) // 2
+        last = (addr + count) // 2
+        return self.names[first:last]
+
+
+def _numeric(specs):
+    return [name for name, type_, _, _ in specs if type_ in (float, bool)]
+
+
+INPUT_REGISTERS = _numeric(ENGINE_TAG_SPECS)
+HOLDING_REGISTERS = _numeric(INPUT_TAG_SPECS)
+
+
+class ModbusServer:
+    def __init__(self, db: TagDB, host: str = "127.0.0.1", port: int = 5020, unit_id: int = 1,
+                 inputs=INPUT_REGISTERS, holding=HOLDING_REGISTERS):
+        self.db = db
+        self.host, self.port = host, port
+        self.unit_id = unit_id
+        self.inputs = RegisterTable(inputs)
+        self.holding = RegisterTable(holding)
+        self.writes = queue.SimpleQueue()   #(tag, wartość) od klientów, dla symulacji
+        self.requests = 0
+        self.clients = 0
+
+        for table in (self.inputs, self.holding):
+            for name in table.names:
+                table.set(name, float(db.value(name)))
+        #nastawy zmienione lokalnie (suwaki) też widać w rejestrach holding
+        db.subscribe(self.inputs.names + self.holding.names, self._on_tags)
+
+        self.loop = None
+        self._task = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def _on_tags(self, t, changed: dict):
+        for name, value in changed.items():
+            table = self.inputs if name in self.inputs.address else self.holding
+            table.set(name, float(value))
+
+    #SYMULACJA
+
+    def drain_writes(self) -> dict:
+        #zapisy klientów od ostatniego ticka (ostatni zapis wygrywa)
+        out = {}
+        while True:
+            try:
+                name, value = self.writes.get_nowait()
+            except queue.Empty:
+                return out
+            out[name] = value
+
+    #PROTOKÓŁ
+
+    def handle_pdu(self, pdu: bytes) -> bytes:
+        fc = pdu[0]
+        try:
+            if fc in (FC_READ_HOLDING, FC_READ_INPUT):
+                addr, count = struct.unpack_from(">HH", pdu, 1)
+                table = self.holding if fc == FC_READ_HOLDING else self.inputs
+                if not 1 <= count <= MAX_READ:
+                    return bytes((fc | 0x80, ILLEGAL_VALUE))
+                if addr + count > len(table):
+                    return bytes((fc | 0x80, ILLEGAL_ADDRESS))
+                data = table.read(addr, count)
+                return bytes((fc, len(data))) + data
+
+            if fc == FC_WRITE_SINGLE:
+                #pojedynczy rejestr to pół liczby float32 – zapis musi obejmować całe tagi
+                return bytes((fc | 0x80, ILLEGAL_ADDRESS))
+
+            if fc == FC_WRITE_MULTIPLE:
+                addr, count, nbytes = struct.unpack_from(">HHB", pdu, 1)
+                raw = pdu[6:6 + nbytes]
+                if not 1 <= count <= MAX_WRITE or nbytes != 2 * count or len(raw) != nbytes:
+                    return bytes((fc | 0x80, ILLEGAL_VALUE))
+                if addr % 2 or count % 2 or addr + count > len(self.holding):
+                    return bytes((fc | 0x80, ILLEGAL_ADDRESS))
+                names = self.holding.tags_in(addr, count)
+                values = struct.unpack(f">{len(names)}f", raw)
+                if not all(math.isfinite(v) for v in values):
+                    return bytes((fc | 0x80, ILLEGAL_VALUE))   #NaN/inf – nic nie zapisujemy
+                for name, value in zip(names, values):
+                    lo, hi = INPUT_RANGES.get(name, (-math.inf, math.inf))
+                    value = min(hi, max(lo, value))
+                    self.holding.set(name, value)
+                    self.writes.put((name, value))
+                return struct.pack(">BHH", fc, addr, count)
+        except struct.error:
+            return bytes((fc | 0x80, ILLEGAL_VALUE))
+        return bytes((fc | 0x80, ILLEGAL_FUNCTION))
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.clients += 1
+        try:
+            while True:
+                head = await reader.readexactly(_MBAP.size)
+                tid, proto, length, unit = _MBAP.unpack(head)
+                if proto != 0 or not 2 <= length <= MAX_ADU:
+                    break   #nie Modbus albo pusta/za długa ramka – zamykamy połączenie
+                pdu = await reader.readexactly(length - 1)
+                if unit != self.unit_id:
+                    resp = bytes((pdu[0] | 0x80, GATEWAY_TARGET_FAILED))
+                else:
+                    resp = self.handle_pdu(pdu)
+                self.requests += 1
+                writer.write(_MBAP.pack(tid, 0, len(resp) + 1, unit) + resp)
+                #bez drain() po każdej odpowiedzi – tylko gdy bufor nadawczy się zapycha
+                if writer.transport.get_write_buffer_size() > 64 * 1024:
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    #WĄTEK SERWERA
+
+    async def _main(self):
+        server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]   #port 0 = dowolny wolny
+        self._ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start(self) -> "ModbusServer":
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self._task = self.loop.create_task(self._main())
+            try:
+                self.loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self.loop.close()
+
+        self._thread = threading.Thread(target=run, name="modbus", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        return self
+
+    def stop(self):
+        if self._task is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(5.0)
+
+    def describe(self) -> list[str]:
+        #mapa rejestrów (dokumentacja dla mastera SCADA)
+        lines = [f"IR {a:4d}-{a + 1:<4d} {n}" for n, a in self.inputs.address.items()]
+        lines += [f"HR {a:4d}-{a + 1:<4d} {n}" for n, a in self.holding.address.items()]
+        return lines
+
+
+#KLIENT TESTOWY
+
+class ModbusClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 5020, unit_id: int = 1):
+        self.host, self.port, self.unit_id = host, port, unit_id
+        self.tid = 0
+        self.reader = self.writer = None
+
+    async def connect(self) -> "ModbusClient":
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def request(self, pdu: bytes) -> bytes:
+        self.tid = (self.tid + 1) & 0xFFFF
+        self.writer.write(_MBAP.pack(self.tid, 0, len(pdu) + 1, self.unit_id) + pdu)
+        head = await self.reader.readexactly(_MBAP.size)
+        tid, _, length, _ = _MBAP.unpack(head)
+        resp = await self.reader.readexactly(length - 1)
+        if tid != self.tid:
+            raise IOError(f"odpowiedź na transakcję {tid}, oczekiwano {self.tid}")
+        if resp[0] & 0x80:
+            raise IOError(f"wyjątek Modbus {resp[1]} dla funkcji {resp[0] & 0x7F}")
+        return resp
+
+    async def read_floats(self, addr: int, n: int, holding: bool = False) -> list[float]:
+        fc = FC_READ_HOLDING if holding else FC_READ_INPUT
+        resp = await self.request(struct.pack(">BHH", fc, addr, 2 * n))
+        return list(struct.unpack(f">{n}f", resp[2:]))
+
+    async def write_floats(self, addr: int, values):
+        raw = struct.pack(f">{len(values)}f", *values)
+        await self.request(struct.pack(">BHHB", FC_WRITE_MULTIPLE, addr, 2 * len(values), len(raw)) + raw)
+
+
+async def bench(host: str, port: int, clients: int = 50, requests: int = 200, hz: float = 0.0) -> list[float]:
+    #clients równoległych połączeń, każde czyta wszystkie rejestry wejściowe; zwraca czasy odpowiedzi [s]
+    #przy hz > 0 klienci odpytują w stałym rytmie, rozłożeni równo w okresie (jak stacje mastera)
+    n = len(INPUT_REGISTERS)
+    lat = []
+
+    async def one(k):
+        c = await ModbusClient(host, port).connect()
+        loop = asyncio.get_running_loop()
+        try:
+            next_t = loop.time() + (k / clients / hz if hz else 0.0)
+            for _ in range(requests):
+                if hz:
+                    await asyncio.sleep(max(0.0, next_t - loop.time()))
+                    next_t += 1.0 / hz
+                t0 = time.perf_counter()
+                await c.read_floats(0, n)
+                lat.append(time.perf_counter() - t0)
+        finally:
+            await c.close()
+
+    await asyncio.gather(*(one(k) for k in range(clients)))
+    return lat
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serwer Modbus-TCP z symulacją bez GUI albo test obciążenia.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5020)
+    ap.add_argument("--bench", action="store_true", help="uruchom serwer z symulacją i zmierz czasy odpowiedzi")
+    ap.add_argument("--clients", type=int, default=50)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--hz", type=float, default=10.0, help="częstotliwość odpytywania na klienta (0 = bez przerw)")
+    args = ap.parse_args(argv)
+
+    from engine import MixingEngine, TICK_S
+    from tags import write_engine, write_inputs
+
+    eng = MixingEngine()
+    db = register_engine(TagDB(), eng)
+    server = ModbusServer(db, args.host, 0 if args.bench else args.port).start()
+    for line in server.describe():
+        print(line)
+
+    stop = threading.Event()
+
+    def simulate():
+        #symulacja w czasie rzeczywistym; zapisy klientów stosowane na początku ticka
+        next_t = time.monotonic()
+        while not stop.is_set():
+            for name, value in server.drain_writes().items():
+                field = name.split(".", 1)[1]
+                eng.inputs = dataclasses.replace(eng.inputs, **{field: bool(value) if field == "running" else value})
+            eng.step(TICK_S)
+            write_inputs(db, eng.inputs, eng.t_sim)
+            write_engine(db, eng, eng.t_sim)
+            db.publish(eng.t_sim)
+            next_t += TICK_S
+            time.sleep(max(0.0, next_t - time.monotonic()))
+
+    sim = threading.Thread(target=simulate, daemon=True)
+    sim.start()
+    try:
+        if args.bench:
+            lat = sorted(asyncio.run(bench(args.host, server.port, args.clients, args.requests, args.hz)))
+            ms = [x * 1000 for x in lat]
+            print(f"{len(ms)} odpowiedzi: p50 {statistics.median(ms):.3f} ms, "
+                  f"p99 {ms[int(0.99 * (len(ms) - 1))]:.3f} ms, max {ms[-1]:.3f} ms")
+        else:
+            print(f"Serwer na {args.host}:{server.port} (Ctrl+C kończy)")
+            while True:
+                time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        sim.join()
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
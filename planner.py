@@ -0,0 +1,276 @@
+import bisect
+import collections
+import dataclasses
+import math
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from engine import MixingEngine, Inputs, TICK_S, TAU_S, COND_TIME_S, COLD_TARGET_C, HOT_TARGET_C
+
+
+#PLANOWANIE SZYBKOŚCI ZIMNA/CIEPŁA POD ZADANĄ TEMPERATURĘ MIESZALNIKA
+#Najszybciej napełniają mieszalnik pary szybkości, w których jedna pompa pracuje na maksimum
+#(RATE_MAX, górna granica suwaka). Ten "brzeg" parametryzujemy jednym parametrem s ∈ [-1, 1]:
+#s = -1 sama zimna, s = 0 obie na maksimum, s = 1 sama ciepła. Dla stanu zbiorników liczymy
+#naraz (NumPy, wszystkie pary w jednym przebiegu ticków, ta sama arytmetyka co silnik) końcową
+#temperaturę i czas napełniania w FRONTIER_POINTS punktach brzegu. Tablica trafia do pamięci
+#podręcznej (LRU) pod kluczem ze stanu zaokrąglonego do rozdzielczości wyświetlania, a zapytanie
+#to tylko interpolacja liniowa po tablicy – mikrosekundy. Nowa tablica to dziesiątki milisekund,
+#więc regulator w wątku symulacji (AutoMix z background=True) liczy ją w wątku planera
+#i do czasu wyniku zostawia poprzedni plan.
+
+RATE_MAX = 0.5          #L/tick – suwak 0–5
+FRONTIER_POINTS = 101
+CACHE_SIZE = 256
+MAX_TICKS = 100_000
+
+
+@dataclass(frozen=True)
+class MixState:
+    mix_v: float
+    mix_t: float
+    cold_v: float
+    cold_t: float
+    hot_v: float
+    hot_t: float
+    cold_heat_t: float = COND_TIME_S   #czas kondycjonowania (>= COND_TIME_S = gotowy)
+    hot_heat_t: float = COND_TIME_S
+    capacity_l: float = 100.0          #pojemność mieszalnika
+
+    @classmethod
+    def from_engine(cls, eng: MixingEngine) -> "MixState":
+        return cls(eng.mix.volume_l, eng.mix.temp_c, eng.cold.volume_l, eng.cold.temp_c,
+                   eng.hot.volume_l, eng.hot.temp_c,
+                   COND_TIME_S if eng.cold_ready else eng.cold_heat_t,
+                   COND_TIME_S if eng.hot_ready else eng.hot_heat_t,
+                   eng.mix.capacity_l)
+
+    def key(self) -> tuple:
+        #0.1 L, 0.1 °C, 0.1 s – stany nierozróżnialne na ekranie dzielą jedną tablicę
+        return (round(self.mix_v, 1), round(self.mix_t, 1), round(self.cold_v, 1), round(self.cold_t, 1),
+                round(self.hot_v, 1), round(self.hot_t, 1), round(self.cold_heat_t, 1),
+                round(self.hot_heat_t, 1), round(self.capacity_l, 1))
+
+
+@dataclass(frozen=True)
+class Plan:
+    cold_rate: float     #L/tick
+    hot_rate: float      #L/tick
+    final_temp_c: float  #przewidywana temperatura po napełnieniu
+    ticks: float         #przewidywany czas do napełnienia [ticki]
+    reachable: bool      #False = cel poza zasięgiem, plan daje temperaturę najbliższą celowi
+
+
+def simulate_final(state: MixState, cold_rate, hot_rate, dt: float = TICK_S, max_ticks: int = MAX_TICKS):
+    #faza MIX silnika dla wielu par szybkości naraz; zwraca (temperatura końcowa, ticki, czy pełny)
+    cold_rate, hot_rate = np.broadcast_arrays(np.asarray(cold_rate, float), np.asarray(hot_rate, float))
+    n = cold_rate.size
+    k = dt / TICK_S
+    c_rate = cold_rate.ravel() * k
+    h_rate = hot_rate.ravel() * k
+    cap = state.capacity_l
+    decay = math.exp(-dt / TAU_S)
+
+    #zbiorniki jak TankModel: objętość, energia (L·°C) i temperatura na wypadek opróżnienia
+    vm = np.full(n, state.mix_v)
+    hm = vm * state.mix_t
+    vc = np.full(n, state.cold_v)
+    hc = vc * state.cold_t
+    ec = np.full(n, state.cold_t)
+    vh = np.full(n, state.hot_v)
+    hh = vh * state.hot_t
+    eh = np.full(n, state.hot_t)
+    c_heat = np.full(n, state.cold_heat_t)
+    h_heat = np.full(n, state.hot_heat_t)
+    ticks = np.zeros(n, dtype=np.int64)
+    active = vm < cap - 0.1
+
+    def temp(v, h, e):
+        wet = v > 1e-9
+        return np.where(wet, h / np.where(wet, v, 1.0), e)
+
+    for _ in range(max_ticks):
+        if not active.any():
+            break
+        #chłodzenie/grzanie (relax z silnika, ta sama kolejność działań)
+        has_c = vc > 0.1
+        has_h = vh > 0.1
+        tc = COLD_TARGET_C + (temp(vc, hc, ec) - COLD_TARGET_C) * decay
+        th = HOT_TARGET_C + (temp(vh, hh, eh) - HOT_TARGET_C) * decay
+        hc, ec = np.where(has_c, vc * tc, hc), np.where(has_c, tc, ec)
+        hh, eh = np.where(has_h, vh * th, hh), np.where(has_h, th, eh)
+        c_heat = np.where(has_c & (c_heat < COND_TIME_S), c_heat + dt, c_heat)
+        h_heat = np.where(has_h & (h_heat < COND_TIME_S), h_heat + dt, h_heat)
+        c_ready = c_heat >= COND_TIME_S
+        h_ready = h_heat >= COND_TIME_S
+
+        out_c = np.where(active & c_ready, np.minimum(c_rate, vc), 0.0)
+        out_h = np.where(active & h_ready, np.minimum(h_rate, vh), 0.0)
+        #odpływ (TankModel.remove), potem dolewka do mieszalnika (TankModel.add) – zimna, ciepła
+        for out, v, h, e, is_cold in ((out_c, vc, hc, ec, True), (out_h, vh, hh, eh, False)):
+            pos = out > 0
+            rest = v - out
+            keep = rest > 1e-9
+            t_pre = temp(v, h, e)
+            h = np.where(pos, np.where(keep, h - out * (h / np.where(pos, v, 1.0)), rest * t_pre), h)
+            e = np.where(pos & ~keep, t_pre, e)
+            v = np.where(pos, rest, v)
+            if is_cold:
+                vc, hc, ec = v, h, e
+            else:
+                vh, hh, eh = v, h, e
+
+            t_in = temp(v, h, e)
+            added = np.minimum(out, np.maximum(0.0, cap - vm))
+            flow = added > 0
+            hm = np.where(flow, np.where(vm <= 1e-9, (vm + added) * t_in, hm + added * t_in), hm)
+            vm = vm + added
+
+        ticks += active
+        #koniec: mieszalnik pełny albo nic już nie płynie (oba gotowe, zero odpływu)
+        stalled = c_ready & h_ready & (out_c + out_h <= 0.0)
+        active = active & (vm < cap - 0.1) & ~stalled
+
+    tm = temp(vm, hm, np.full(n, state.mix_t))
+    shape = cold_rate.shape
+    return tm.reshape(shape), ticks.reshape(shape), (vm >= cap - 0.1).reshape(shape)
+
+
+def frontier(points: int = FRONTIER_POINTS, rate_max: float = RATE_MAX):
+    #(s, zimna, ciepła) wzdłuż brzegu najszybszych par
+    s = np.linspace(-1.0, 1.0, points)
+    cold = rate_max * np.minimum(1.0, 1.0 - s)
+    hot = rate_max * np.minimum(1.0, 1.0 + s)
+    return s, cold, hot
+
+
+class MixPlanner:
+    def __init__(self, dt: float = TICK_S, points: int = FRONTIER_POINTS, rate_max: float = RATE_MAX,
+                 cache_size: int = CACHE_SIZE):
+        self.dt = dt
+        self.rate_max = rate_max
+        s, cold, hot = frontier(points, rate_max)
+        self.s = s
+        self.cold = cold.tolist()  #listy – zapytania bez narzutu NumPy
+        self.hot = hot.tolist()
+        self._cold_a, self._hot_a = cold, hot
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()   #pamięć podręczna wspólna dla wątku planera i wywołań wprost
+        self._executor = None
+        self.hits = 0
+        self.misses = 0
+
+    def table(self, state: MixState) -> tuple:
+        #(temperatura końcowa, ticki, pełny) dla punktów brzegu – z pamięci albo policzone
+        return self._entry(state)[:3]
+
+    def cached(self, state: MixState) -> bool:
+        with self._lock:
+            return state.key() in self._cache
+
+    def _entry(self, state: MixState) -> tuple:
+        key = state.key()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return entry
+            self.misses += 1
+        #przeliczenie bez blokady – zapytania z pamięci w tym czasie nie czekają
+        temp, ticks, full = simulate_final(MixState(*key), self._cold_a, self._hot_a, self.dt)
+        #typowo temperatura rośnie wzdłuż brzegu i wszystkie pary napełniają – wtedy zapytanie to bisekcja
+        mono = temp.tolist() if full.all() and bool(np.all(np.diff(temp) > 0)) else None
+        entry = (temp, ticks, full, mono, ticks.tolist())
+        with self._lock:
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def plan_async(self, target_c: float, state: MixState):
+        #Future z Plan; jeden wątek planera na planer – przeliczenia po kolei
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+        return self._executor.submit(self.plan, target_c, state)
+
+    def plan(self, target_c: float, state) -> Plan:
+        #state: MixState albo MixingEngine
+        if isinstance(state, MixingEngine):
+            state = MixState.from_engine(state)
+        temp, ticks, full, mono, ticks_l = self._entry(state)
+
+        if mono is not None:
+            i = bisect.bisect_left(mono, target_c)
+            if i == 0 or i == len(mono):
+                i = 0 if i == 0 else i - 1
+                return Plan(float(self.cold[i]), float(self.hot[i]), mono[i], ticks_l[i],
+                            mono[i] == target_c)
+            w = (target_c - mono[i - 1]) / (mono[i] - mono[i - 1])
+            c0, c1, h0, h1 = self.cold[i - 1], self.cold[i], self.hot[i - 1], self.hot[i]
+            return Plan(float(c0 + w * (c1 - c0)), float(h0 + w * (h1 - h0)), target_c,
+                        ticks_l[i - 1] + w * (ticks_l[i] - ticks_l[i - 1]), True)
+
+        #odcinki brzegu, na których temperatura przechodzi przez cel; wybieramy najszybszy
+        d = temp - target_c
+        seg = np.flatnonzero((d[:-1] * d[1:] <= 0.0) & full[:-1] & full[1:])
+        if seg.size:
+            d0, d1 = d[seg], d[seg + 1]
+            w = np.where(d0 != d1, d0 / np.where(d0 != d1, d0 - d1, 1.0), 0.0)
+            t_seg = ticks[seg] + w * (ticks[seg + 1] - ticks[seg])
+            j = int(np.argmin(t_seg))
+            i, w = int(seg[j]), float(w[j])
+            return Plan(float(self.cold[i] + w * (self.cold[i + 1] - self.cold[i])),
+                        float(self.hot[i] + w * (self.hot[i + 1] - self.hot[i])),
+                        target_c, float(t_seg[j]), True)
+
+        #poza zasięgiem: najbliższa temperatura (wśród napełniających, jeśli są), potem najszybciej
+        cand = np.flatnonzero(full) if full.any() else np.arange(temp.size)
+        err = np.abs(d[cand])
+        best = cand[err <= err.min() + 1e-9]
+        i = int(best[np.argmin(ticks[best])])
+        return Plan(float(self.cold[i]), float(self.hot[i]), float(temp[i]), float(ticks[i]), False)
+
+
+class AutoMix:
+    #regulator dla wątku symulacji: w fazie MIX co replan_s przelicza plan i zwraca nowe nastawy.
+    #background=True: tablica spoza pamięci liczona w wątku planera, do tego czasu obowiązuje
+    #poprzedni plan (symulacja nie staje); False: wprost – przebieg zależy tylko od stanu (testy)
+    def __init__(self, planner: MixPlanner, target_c: float, replan_s: float = 1.0, background: bool = False):
+        self.planner = planner
+        self.target_c = target_c
+        self.replan_s = replan_s
+        self.background = background
+        self.last_t = None
+        self.plan = None
+        self.pending = None   #Future z planem liczonym w tle
+
+    def __call__(self, eng: MixingEngine) -> Inputs | None:
+        if eng.phase != "MIX" or eng.mix.is_full():
+            self.last_t = None
+            self.pending = None   #wynik byłby dla nieaktualnego stanu
+            return None
+        if self.pending is not None:
+            if not self.pending.done():
+                return None
+            plan, self.pending = self.pending.result(), None
+            return self._apply(eng, plan)
+        if self.last_t is not None and eng.t_sim - self.last_t < self.replan_s - 1e-9:
+            return None
+        self.last_t = eng.t_sim
+        state = MixState.from_engine(eng)
+        if self.background and not self.planner.cached(state):
+            self.pending = self.planner.plan_async(self.target_c, state)
+            return None
+        return self._apply(eng, self.planner.plan(self.target_c, state))
+
+    def _apply(self, eng: MixingEngine, plan: Plan) -> Inputs | None:
+        self.plan = plan
+        inp = eng.inputs
+        if (inp.cold_rate, inp.hot_rate) == (self.plan.cold_rate, self.plan.hot_rate):
+            return None
+        return dataclasses.replace(inp, cold_rate=self.plan.cold_rate, hot_rate=self.plan.hot_rate)
@@ -0,0 +1,434 @@
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from engine import MixingEngine, TICK_S, TAU_S, COND_TIME_S
+from tank_bank import TankBank
+from tags import ENGINE_TAG_SPECS
+
+
+#TOPOLOGIA INSTALACJI Z KONFIGURACJI
+#Zbiorniki, pompy (z rurami do odbiorników), grzałki/chłodnice i fazy procesu są
+#wczytywane z pliku (plant.json) do grafu skierowanego. Solver przepływów liczy
+#w jednym przebiegu na tick wszystkie pompy poziomami porządku topologicznego:
+#pompy z jednego poziomu są liczone wektorowo (NumPy), więc koszt ticka to
+#O(krawędzie + poziomy), a nie O(zbiorniki^2).
+
+EMPTY_L = 0.1   #jak TankModel.is_empty / is_full
+
+
+@dataclass
+class Conditioner:
+    target_c: float
+    tau_s: float = TAU_S
+
+
+@dataclass
+class TankSpec:
+    id: str
+    name: str
+    capacity_l: float
+    volume_l: float = 0.0
+    temp_c: float = 20.0
+    heater: Conditioner | None = None
+    cooler: Conditioner | None = None
+
+
+@dataclass
+class PumpSpec:
+    id: str
+    src: str
+    dst: list[str]
+    rate: str                     #nazwa nastawy (L/tick), np. "pump_rate"
+    phase: str | None = None      #None – pompa pracuje w każdej fazie
+    requires_ready: bool = False  #czekaj na koniec kondycjonowania zbiornika źródłowego
+
+    def pipes(self) -> list[tuple[str, str, str]]:
+        #(id rury, skąd, dokąd); pompa z kilkoma odbiornikami to rozdzielacz z własną rurą wejściową
+        if len(self.dst) == 1:
+            return [(f"{self.src}_to_{self.dst[0]}", self.src, self.dst[0])]
+        return ([(f"{self.src}_to_{self.id}", self.src, self.id)]
+                + [(f"{self.id}_to_{d}", self.id, d) for d in self.dst])
+
+
+@dataclass
+class PhaseSpec:
+    name: str
+    until_full: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PlantConfig:
+    tanks: list[TankSpec]
+    pumps: list[PumpSpec]
+    phases: list[PhaseSpec]
+    cond_time_s: float = COND_TIME_S
+
+    def __post_init__(self):
+        ids = {t.id for t in self.tanks}
+        if len(ids) != len(self.tanks):
+            raise ValueError("powtórzony identyfikator zbiornika")
+        phases = {ph.name for ph in self.phases}
+        pipes = set()
+        for p in self.pumps:
+            for tid in [p.src] + p.dst:
+                if tid not in ids:
+                    raise ValueError(f"pompa {p.id!r}: nieznany zbiornik {tid!r}")
+            if p.phase is not None and p.phase not in phases:
+                raise ValueError(f"pompa {p.id!r}: nieznana faza {p.phase!r}")
+            for pid, _, _ in p.pipes():
+                if pid in pipes:
+                    raise ValueError(f"powtórzona rura {pid!r}")
+                pipes.add(pid)
+        if not self.phases:
+            raise ValueError("konfiguracja wymaga co najmniej jednej fazy")
+        self.levels()  #cykl w grafie -> ValueError
+
+    def pipe_ids(self) -> list[str]:
+        return [pid for p in self.pumps for pid, _, _ in p.pipes()]
+
+    def levels(self) -> dict[str, int]:
+        #poziom zbiornika = najdłuższa ścieżka od źródła (Kahn, O(V + E))
+        succ = {t.id: [] for t in self.tanks}
+        indeg = {t.id: 0 for t in self.tanks}
+        for p in self.pumps:
+            for d in p.dst:
+                succ[p.src].append(d)
+                indeg[d] += 1
+        level = {tid: 0 for tid in succ}
+        queue = [tid for tid, n in indeg.items() if n == 0]
+        seen = 0
+        while queue:
+            tid = queue.pop()
+            seen += 1
+            for d in succ[tid]:
+                level[d] = max(level[d], level[tid] + 1)
+                indeg[d] -= 1
+                if indeg[d] == 0:
+                    queue.append(d)
+        if seen != len(succ):
+            raise ValueError("graf instalacji ma cykl – przepływy muszą tworzyć DAG")
+        return level
+
+
+def _conditioner(d):
+    return Conditioner(**d) if d is not None else None
+
+
+def parse_plant(data: dict) -> PlantConfig:
+    tanks = [TankSpec(**{**t, "heater": _conditioner(t.get("heater")), "cooler": _conditioner(t.get("cooler"))})
+             for t in data["tanks"]]
+    pumps = [PumpSpec(id=p["id"], src=p["from"], dst=list(p["to"]), rate=p["rate"],
+                      phase=p.get("phase"), requires_ready=p.get("requires_ready", False))
+             for p in data["pumps"]]
+    phases = [PhaseSpec(**ph) for ph in data.get("phases", [{"name": "RUN"}])]
+    return PlantConfig(tanks, pumps, phases, data.get("cond_time_s", COND_TIME_S))
+
+
+def load_plant(path) -> PlantConfig:
+    with open(path, encoding="utf-8") as f:
+        return parse_plant(json.load(f))
+
+
+def engine_mismatches(cfg: PlantConfig, eng: MixingEngine) -> list[str]:
+    #różnice konfiguracji względem silnika o stałej topologii (GUI symuluje MixingEngine,
+    #a jego tagi – ENGINE_TAG_SPECS – wyznaczają zbiorniki, pompy i rury widoków)
+    names = [name for name, _, _, _ in ENGINE_TAG_SPECS]
+    tanks = [n[:-len(".volume_l")] for n in names if n.endswith(".volume_l")]
+    pumps = {n[len("pump_"):] for n in names if n.startswith("pump_")}
+    pipes = {n[len("flow_"):] for n in names if n.startswith("flow_")}
+    out = []
+    ids = [t.id for t in cfg.tanks]
+    if sorted(ids) != sorted(tanks):
+        out.append(f"zbiorniki {sorted(ids)}, silnik ma {sorted(tanks)}")
+    for t in cfg.tanks:
+        if t.id in tanks and t.capacity_l != getattr(eng, t.id).capacity_l:
+            out.append(f"zbiornik {t.id!r}: pojemność {t.capacity_l} L, w silniku {getattr(eng, t.id).capacity_l} L")
+    if {p.id for p in cfg.pumps} != pumps:
+        out.append(f"pompy {sorted(p.id for p in cfg.pumps)}, silnik ma {sorted(pumps)}")
+    if set(cfg.pipe_ids()) != pipes:
+        out.append(f"rury {sorted(cfg.pipe_ids())}, silnik ma {sorted(pipes)}")
+    return out
+
+
+#SOLVER
+
+class Plant:
+    def __init__(self, cfg: PlantConfig):
+        self.cfg = cfg
+        self.index = {t.id: i for i, t in enumerate(cfg.tanks)}
+        n = len(cfg.tanks)
+        self.bank = TankBank([t.capacity_l for t in cfg.tanks], np.zeros(n), np.zeros(n),
+                             names=[t.name for t in cfg.tanks])
+
+        #grzałki i chłodnice: indeksy zbiorników + cele/stałe czasowe
+        cond = [(i, c, t.heater is not None) for i, t in enumerate(cfg.tanks)
+                for c in (t.heater or t.cooler,) if c is not None]
+        self.cond_idx = np.array([i for i, _, _ in cond], dtype=np.intp)
+        self.cond_target = np.array([c.target_c for _, c, _ in cond])
+        self.cond_tau = np.array([c.tau_s for _, c, _ in cond])
+        self.heater_idx = np.array([i for i, _, h in cond if h], dtype=np.intp)
+
+        #pompy i krawędzie pompa -> odbiornik
+        pumps = cfg.pumps
+        self.pump_index = {p.id: k for k, p in enumerate(pumps)}
+        self.p_src = np.array([self.index[p.src] for p in pumps], dtype=np.intp)
+        self.p_ready = np.array([p.requires_ready for p in pumps], dtype=bool)
+        self.rate_keys = sorted({p.rate for p in pumps})
+        self.p_rate = np.array([self.rate_keys.index(p.rate) for p in pumps], dtype=np.intp)
+        e_pump, e_dst, self.p_edges = [], [], []
+        for k, p in enumerate(pumps):
+            self.p_edges.append(range(len(e_pump), len(e_pump) + len(p.dst)))
+            for d in p.dst:
+                e_pump.append(k)
+                e_dst.append(self.index[d])
+        self.e_pump = np.array(e_pump, dtype=np.intp)
+        self.e_dst = np.array(e_dst, dtype=np.intp)
+
+        #rury (do wizualizacji): rura płynie, gdy płynie jej krawędź albo – wejście rozdzielacza – gdy pompa pracuje
+        self.pipe_ids = cfg.pipe_ids()
+        pipe_pump, pipe_edge = [], []
+        e = 0
+        for k, p in enumerate(pumps):
+            if len(p.dst) > 1:
+                pipe_pump.append(k)
+                pipe_edge.append(-1)
+            for _ in p.dst:
+                pipe_pump.append(k)
+                pipe_edge.append(e)
+                e += 1
+        self.pipe_pump = np.array(pipe_pump, dtype=np.intp)
+        self.pipe_edge = np.array(pipe_edge, dtype=np.intp)
+
+        #plan: dla każdej fazy lista poziomów -> (pompy, krawędzie tych pomp)
+        level = cfg.levels()
+        self.levels = level
+        self.plans = []
+        for ph in cfg.phases:
+            active = [k for k, p in enumerate(pumps) if p.phase in (None, ph.name)]
+            by_level = {}
+            for k in active:
+                by_level.setdefault(level[pumps[k].src], []).append(k)
+            plan = []
+            for lv in sorted(by_level):
+                P = np.array(by_level[lv], dtype=np.intp)
+                E = np.array([e for k in P for e in self.p_edges[k]], dtype=np.intp)
+                #numer pompy lokalnie w P dla każdej krawędzi
+                local = np.searchsorted(P, self.e_pump[E])
+                plan.append((P, E, local))
+            #kondycjonowanie liczymy dla źródeł pomp, które czekają na gotowość
+            timers = np.unique(self.p_src[[k for k in active if pumps[k].requires_ready]]).astype(np.intp)
+            full = np.array([self.index[t] for t in ph.until_full], dtype=np.intp)
+            self.plans.append((plan, timers, full))
+
+        self.rates = {key: 0.0 for key in self.rate_keys}
+        self.running = True
+        self.reset()
+
+    def reset(self):
+        self.bank.volume_l[:] = [t.volume_l for t in self.cfg.tanks]
+        self.bank.temp_c[:] = [t.temp_c for t in self.cfg.tanks]
+        n = len(self.bank)
+        self.heat_t = np.zeros(n)
+        self.ready = np.zeros(n, dtype=bool)
+        self.phase_idx = 0
+        self.done = False
+        self.t_sim = 0.0
+        self.heater_power = np.zeros(len(self.heater_idx))
+        self.pump_on = np.zeros(len(self.cfg.pumps), dtype=bool)
+        self.pump_flow = np.zeros(len(self.cfg.pumps), dtype=bool)
+        self.edge_flow = np.zeros(len(self.e_pump))
+        self.pipe_flow = np.zeros(len(self.pipe_ids), dtype=bool)
+
+    @property
+    def phase(self) -> str:
+        return self.cfg.phases[self.phase_idx].name
+
+    def tank(self, tid: str):
+        return self.bank.view(self.index[tid])
+
+    def set_rates(self, **rates):
+        for key, v in rates.items():
+            if key not in self.rates:
+                raise KeyError(f"brak pompy z nastawą {key!r}")
+            self.rates[key] = v
+
+    def step(self, dt: float = TICK_S):
+        bank = self.bank
+        vol, temp, cap = bank.volume_l, bank.temp_c, bank.capacity_l
+        self.t_sim += dt
+
+        #grzanie/chłodzenie: dokładna relaksacja wszystkich zbiorników z wodą naraz
+        ci = self.cond_idx
+        if ci.size:
+            wet = vol[ci] > EMPTY_L
+            tgt = self.cond_target
+            temp[ci] = np.where(wet, tgt + (temp[ci] - tgt) * np.exp(-dt / self.cond_tau), temp[ci])
+            hi = self.heater_idx
+            self.heater_power[:] = np.where(vol[hi] > EMPTY_L, np.clip(np.abs(
+                self.cond_target[np.searchsorted(ci, hi)] - temp[hi]) / 60.0, 0.0, 1.0), 0.0)
+
+        self.pump_on[:] = False
+        self.pump_flow[:] = False
+        self.edge_flow[:] = 0.0
+        self.pipe_flow[:] = False
+        if not self.running:
+            self.heater_power[:] = 0.0
+            return
+
+        plan, timers, full = self.plans[self.phase_idx]
+        if timers.size:
+            counting = (vol[timers] > EMPTY_L) & ~self.ready[timers]
+            self.heat_t[timers] += np.where(counting, dt, 0.0)
+            self.ready[timers] |= self.heat_t[timers] >= self.cfg.cond_time_s
+
+        rate = np.array([self.rates[k] for k in self.rate_keys]) * (dt / TICK_S)
+        for P, E, local in plan:
+            self._transfer(P, E, local, rate)
+
+        self.pipe_flow[:] = np.where(self.pipe_edge >= 0, self.edge_flow[self.pipe_edge] > 0,
+                                     self.pump_flow[self.pipe_pump])
+
+        #przejście fazy, gdy wszystkie wskazane zbiorniki są pełne
+        if full.size and np.all(vol[full] >= cap[full] - EMPTY_L):
+            if self.phase_idx + 1 < len(self.cfg.phases):
+                self.phase_idx += 1
+            else:
+                self.done = True
+
+    def _transfer(self, P, E, local, rate):
+        #jeden poziom topologiczny: wszystkie jego pompy naraz
+        vol, temp, cap = self.bank.volume_l, self.bank.temp_c, self.bank.capacity_l
+        src = self.p_src[P]
+        dst = self.e_dst[E]
+        n = len(self.bank)
+
+        open_ = vol[dst] < cap[dst] - EMPTY_L
+        n_open = np.bincount(local, weights=open_, minlength=len(P))
+        ok = (vol[src] > EMPTY_L) & (n_open > 0) & (~self.p_ready[P] | self.ready[src])
+        want = np.where(ok, np.minimum(rate[self.p_rate[P]], vol[src]), 0.0)
+
+        #kilka pomp z jednego zbiornika nie może wziąć więcej, niż w nim jest
+        per_src = np.bincount(src, weights=want, minlength=n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = np.where(per_src > vol, vol / per_src, 1.0)
+        want *= s[src]
+
+        #rozdział po równo między odbiorniki, które nie są pełne
+        with np.errstate(divide="ignore", invalid="ignore"):
+            q = np.where(open_, want[local] / np.maximum(n_open[local], 1), 0.0)
+
+        #odbiornik przyjmie najwyżej wolne miejsce
+        req = np.bincount(dst, weights=q, minlength=n)
+        free = np.maximum(0.0, cap - vol)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = np.where(req > free, free / req, 1.0)
+        q *= s[dst]
+
+        taken = np.bincount(local, weights=q, minlength=len(P))
+        t_in = temp[src]
+        np.subtract.at(vol, src, taken)
+        vol[src] = np.maximum(vol[src], 0.0)  #bez -1e-17 z zaokrągleń
+
+        #mieszanie energii w odbiornikach (zbiornik pusty przejmuje temperaturę dopływu)
+        inflow = np.bincount(dst, weights=q, minlength=n)
+        heat = np.bincount(dst, weights=q * t_in[local], minlength=n)
+        hit = np.flatnonzero(inflow > 0)
+        v0 = vol[hit]
+        new_v = v0 + inflow[hit]
+        temp[hit] = np.where(v0 <= 1e-9, heat[hit] / inflow[hit], (v0 * temp[hit] + heat[hit]) / new_v)
+        vol[hit] = new_v
+
+        #jak w silniku: pompa przetłaczająca pracuje przez całą fazę (rozdzielacz w FILL),
+        #dozująca (requires_ready) tylko gdy faktycznie pompuje
+        self.pump_flow[P] = taken > 0
+        self.pump_on[P] = self.pump_flow[P] | ~self.p_ready[P]
+        self.edge_flow[E] = q
+
+    def run_until(self, t: float | None = None, condition=None, dt: float = TICK_S,
+                  max_steps: int | None = None) -> int:
+        if t is None and condition is None and max_steps is None:
+            raise ValueError("run_until wymaga t, condition albo max_steps")
+        steps = 0
+        while True:
+            if t is not None and self.t_sim >= t - 1e-9:
+                break
+            if condition is not None and condition(self):
+                break
+            if max_steps is not None and steps >= max_steps:
+                break
+            self.step(dt if t is None else min(dt, t - self.t_sim))
+            steps += 1
+        return steps
+
+    def report_lines(self) -> list[str]:
+        b = self.bank
+        lines = [f"{t.name}: {b.volume_l[i]:.0f}/{b.capacity_l[i]:.0f} L, {b.temp_c[i]:.1f}°C"
+                 for i, t in enumerate(self.cfg.tanks)]
+        lines.append(f"Faza: {self.phase}")
+        return lines
+
+
+#AUTOMATYCZNY UKŁAD (współrzędne bez Qt – widok tworzy z nich TankView/Pipe/PumpIcon)
+
+@dataclass
+class Layout:
+    tanks: dict      #id -> (x, y, w, h)
+    pumps: dict      #id -> (cx, cy, r)
+    pipes: dict      #id rury -> [(x, y), ...]
+
+
+def layout(cfg: PlantConfig, width: float = 1000.0, height: float = 620.0,
+           margin: tuple = (70.0, 80.0, 70.0, 120.0)) -> Layout:
+    #kolumny = poziomy topologiczne, w kolumnie zbiorniki rozłożone równo w pionie;
+    #margin: (lewy, górny, prawy, dolny) – dół zostaje na suwaki
+    left, top, right, bottom = margin
+    level = cfg.levels()
+    ncols = max(level.values()) + 1
+    cols = [[t for t in cfg.tanks if level[t.id] == c] for c in range(ncols)]
+    col_w = (width - left - right) / ncols
+    area_h = height - top - bottom
+    max_cap = max(t.capacity_l for t in cfg.tanks) or 1.0
+
+    tanks = {}
+    for c, col in enumerate(cols):
+        slot_h = area_h / len(col)
+        for r, t in enumerate(col):
+            w = min(120.0, col_w * 0.45)
+            h = max(30.0, min(220.0, slot_h - 50.0) * (0.75 + 0.25 * t.capacity_l / max_cap))
+            x = left + c * col_w
+            y = top + r * slot_h + (slot_h - h) / 2 + 20
+            tanks[t.id] = (x, y, w, h)
+
+    def left_center(tid):
+        x, y, w, h = tanks[tid]
+        return x, y + h / 2
+
+    #wyjścia: kilka pomp z jednego zbiornika – rozsunięte w pionie
+    outs = {}
+    for p in cfg.pumps:
+        outs.setdefault(p.src, []).append(p.id)
+
+    pumps, pipes = {}, {}
+    for p in cfg.pumps:
+        x, y, w, h = tanks[p.src]
+        k, n = outs[p.src].index(p.id), len(outs[p.src])
+        sx, sy = x + w, y + h * (k + 1) / (n + 1)
+        dest_x = min(left_center(d)[0] for d in p.dst)
+        gap = dest_x - sx
+        if len(p.dst) == 1:
+            d = p.dst[0]
+            dx, dy = left_center(d)
+            px, bus = sx + gap * 0.55, sx + gap * 0.8
+            pumps[p.id] = (px, sy, 14)
+            pipes[f"{p.src}_to_{d}"] = [(sx, sy), (px, sy), (bus, sy), (bus, dy), (dx, dy)]
+        else:
+            r = 18
+            px, bus = sx + gap * 0.45, sx + gap * 0.7
+            pumps[p.id] = (px, sy, r)
+            pipes[f"{p.src}_to_{p.id}"] = [(sx, sy), (px - r - 2, sy)]
+            for d in p.dst:
+                dx, dy = left_center(d)
+                pipes[f"{p.id}_to_{d}"] = [(px + r + 2, sy), (bus, sy), (bus, dy), (dx, dy)]
+    return Layout(tanks, pumps, pipes)
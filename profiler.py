@@ -0,0 +1,178 @@
+import collections
+import json
+import math
+import os
+import threading
+import time
+
+
+#PROFILOWANIE FAZ TICKA
+#Punkty pomiarowe to metody obiektów (krok fizyki, zapis historii, odświeżenie raportu, paintEvent).
+#Włączenie profilera podmienia je na instancjach na wersje mierzące czas; wyłączenie przywraca
+#oryginały – przy wyłączonym profilerze w kodzie nie ma żadnego dodatkowego sprawdzenia.
+#Czasy trafiają do histogramów o stałej liczbie koszyków (skala logarytmiczna, ~5% rozdzielczości),
+#a pojedyncze wywołania do bufora pierścieniowego, który można zrzucić jako plik śladu
+#(format Chrome Trace Event: chrome://tracing, Perfetto).
+
+HIST_MIN_S = 1e-7      #100 ns
+HIST_MAX_S = 10.0
+HIST_RATIO = 1.05      #szerokość koszyka: kolejne granice różnią się o 5%
+TRACE_EVENTS = 100_000
+
+
+class Histogram:
+    _LOG_RATIO = math.log(HIST_RATIO)
+    BUCKETS = int(math.ceil(math.log(HIST_MAX_S / HIST_MIN_S) / _LOG_RATIO)) + 1
+
+    def __init__(self, deadline_s: float | None = None):
+        self.deadline_s = deadline_s
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.missed = 0
+
+    def add(self, dt: float):
+        if dt <= HIST_MIN_S:
+            i = 0
+        else:
+            i = min(self.BUCKETS - 1, int(math.log(dt / HIST_MIN_S) / self._LOG_RATIO) + 1)
+        self.counts[i] += 1
+        self.count += 1
+        self.total_s += dt
+        if dt > self.max_s:
+            self.max_s = dt
+        if self.deadline_s is not None and dt > self.deadline_s:
+            self.missed += 1
+
+    def percentile(self, q: float) -> float:
+        #górna granica koszyka z q-tym percentylem (nie więcej niż zmierzone maksimum)
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank and c:
+                return min(self.max_s, HIST_MIN_S * HIST_RATIO ** i)
+        return self.max_s
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_s": self.total_s / self.count if self.count else 0.0,
+            "p50_s": self.percentile(50),
+            "p99_s": self.percentile(99),
+            "max_s": self.max_s,
+            "missed": self.missed,
+            "deadline_s": self.deadline_s,
+        }
+
+
+class _Hook:
+    __slots__ = ("obj", "attr", "name", "own")
+
+    def __init__(self, obj, attr, name):
+        self.obj = obj
+        self.attr = attr
+        self.name = name
+        self.own = False   #czy atrybut siedział w słowniku instancji (a nie w klasie)
+
+
+class Profiler:
+    def __init__(self, trace_events: int = TRACE_EVENTS):
+        self.enabled = False
+        self.hists = {}
+        self.trace = collections.deque(maxlen=trace_events)
+        self._hooks = []
+        self._saved = {}
+        self._t0 = time.perf_counter()
+
+    #PUNKTY POMIAROWE
+
+    def hook(self, obj, attr: str, name: str, deadline_s: float | None = None):
+        #obj.attr(...) będzie mierzone jako `name`, gdy profiler jest włączony
+        if name not in self.hists:
+            self.hists[name] = Histogram(deadline_s)
+        h = _Hook(obj, attr, name)
+        self._hooks.append(h)
+        if self.enabled:
+            self._attach(h)
+        return h
+
+    def _attach(self, h: _Hook):
+        d = getattr(h.obj, "__dict__", {})
+        h.own = h.attr in d
+        fn = getattr(h.obj, h.attr)
+        self._saved[id(h)] = fn
+        setattr(h.obj, h.attr, self.wrap(fn, h.name))
+
+    def _detach(self, h: _Hook):
+        fn = self._saved.pop(id(h))
+        if h.own:
+            setattr(h.obj, h.attr, fn)
+        else:
+            delattr(h.obj, h.attr)  #znów widać metodę klasy
+
+    def wrap(self, fn, name: str):
+        hist = self.hists[name]
+        trace = self.trace
+        clock = time.perf_counter
+        t0 = self._t0
+
+        def timed(*args, **kw):
+            start = clock()
+            try:
+                return fn(*args, **kw)
+            finally:
+                dt = clock() - start
+                hist.add(dt)
+                trace.append((name, start - t0, dt, threading.get_ident()))
+        timed.__wrapped__ = fn
+        return timed
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            for h in self._hooks:
+                self._attach(h)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for h in self._hooks:
+                self._detach(h)
+
+    def set_enabled(self, on: bool):
+        self.enable() if on else self.disable()
+
+    #WYNIKI
+
+    def reset(self):
+        for hist in self.hists.values():
+            hist.reset()
+        self.trace.clear()
+
+    def stats(self) -> dict:
+        return {name: hist.stats() for name, hist in self.hists.items()}
+
+    def report_lines(self) -> list[str]:
+        lines = [f"{'faza [ms]':12s} {'n':>7s} {'p50':>6s} {'p99':>6s} {'max':>6s} {'spóźn':>5s}"]
+        for name, s in self.stats().items():
+            missed = f"{s['missed']:5d}" if s["deadline_s"] is not None else f"{'-':>5s}"
+            lines.append(f"{name:12s} {s['count']:7d} {s['p50_s'] * 1e3:6.2f} {s['p99_s'] * 1e3:6.2f} "
+                         f"{s['max_s'] * 1e3:6.2f} {missed}")
+        return lines
+
+    def dump_trace(self, path) -> int:
+        #zdarzenia "X" (czas trwania) w mikrosekundach; zwraca liczbę zapisanych zdarzeń
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": start * 1e6, "dur": dt * 1e6, "pid": pid, "tid": tid}
+                  for name, start, dt, tid in list(self.trace)]
+        meta = {name: s for name, s in self.stats().items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"stats": meta}}, f)
+        return len(events)
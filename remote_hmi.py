@@ -0,0 +1,460 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+
+from tags import TagDB
+
+
+#ZDALNY PODGLĄD HMI (HTTP + WebSocket, asyncio, osobny wątek)
+#Przeglądarka pobiera GET / (strona z widokiem zbiorników, raportem i alarmami) i łączy się
+#z /ws. Po połączeniu dostaje pełną migawkę, potem co klatkę (FRAME_HZ) tylko tagi zmienione
+#od poprzedniej klatki. Zmiany zbiera subskrypcja bazy tagów (w wątku symulacji tylko wpis do
+#słownika pod krótką blokadą), a pętla serwera raz na klatkę koduje JEDNĄ wiadomość i wysyła
+#te same bajty wszystkim widzom – koszt CPU klatki nie zależy od liczby widzów poza kopią bajtów.
+#
+#Przeciwciśnienie: widz, którego bufor nadawczy przekroczył high_water, przestaje dostawać
+#delty (nic się dla niego nie kolejkuje). Gdy bufor spadnie poniżej low_water, dostaje świeżą
+#migawkę i wraca do delt – wolny widz widzi rzadsze klatki, ale nie spowalnia symulacji
+#ani innych widzów, a pamięć serwera na widza jest ograniczona.
+#
+#Widok jest tylko do odczytu – nastawy zmienia operator przy stanowisku (albo Modbus).
+
+FRAME_HZ = 10.0
+HIGH_WATER = 256 * 1024
+LOW_WATER = 32 * 1024
+DEADBAND = 0.01
+MAX_REQUEST = 8192
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+def ws_accept(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + _WS_GUID).digest()).decode("ascii")
+
+
+def ws_frame(payload: bytes, opcode: int = OP_TEXT) -> bytes:
+    #ramka serwera (bez maski, FIN)
+    n = len(payload)
+    if n < 126:
+        head = struct.pack(">BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        head = struct.pack(">BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack(">BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+async def ws_read(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    #(opcode, dane) jednej ramki; ramki klienta są maskowane
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        (n,) = struct.unpack(">H", await reader.readexactly(2))
+    elif n == 127:
+        (n,) = struct.unpack(">Q", await reader.readexactly(8))
+    if n > MAX_REQUEST:
+        raise ConnectionError("za duża ramka od klienta")
+    mask = await reader.readexactly(4) if b1 & 0x80 else None
+    data = await reader.readexactly(n)
+    if mask:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return b0 & 0x0F, data
+
+
+def _json_value(v):
+    #zaokrąglenie do rozdzielczości wyświetlania – mniej bajtów na łączu
+    if isinstance(v, float):
+        return round(v, 3) if math.isfinite(v) else None
+    return v
+
+
+def _encode(msg: dict) -> bytes:
+    return ws_frame(json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+class _Viewer:
+    __slots__ = ("writer", "stale", "frames", "skipped")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.stale = True     #przed pierwszą migawką
+        self.frames = 0
+        self.skipped = 0
+
+
+class RemoteHMI:
+    def __init__(self, db: TagDB, host: str = "127.0.0.1", port: int = 8080, extras=None,
+                 frame_hz: float = FRAME_HZ, deadband: float = DEADBAND,
+                 high_water: int = HIGH_WATER, low_water: int = LOW_WATER):
+        #extras: fn() -> dict dodatkowych pól (raport, alarmy) – wołane w wątku serwera raz na klatkę
+        self.db = db
+        self.host, self.port = host, port
+        self.extras = extras
+        self.frame_s = 1.0 / frame_hz
+        self.high_water = high_water
+        self.low_water = low_water
+
+        self.state = {name: _json_value(db.value(name)) for name in db.tags}
+        if extras is not None:
+            self.state.update(extras())   #pierwsza migawka już kompletna
+        self.seq = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._snapshot = None     #zakodowana migawka dla bieżącego seq
+        self.viewers = set()
+        self.frames = 0
+        self.bytes_sent = 0
+        db.subscribe(None, self._on_tags, deadband=deadband)
+
+        self.loop = None
+        self._task = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def _on_tags(self, t, changed: dict):
+        #wątek symulacji: tylko dopisanie zmian (ostatnia wartość w klatce wygrywa)
+        with self._lock:
+            self._pending.update(changed)
+
+    #KLATKI
+
+    def take_delta(self) -> dict | None:
+        #zmiany od poprzedniej klatki (tagi + zmienione pola extras); None = nic nowego
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        delta = {}
+        for name, value in pending.items():
+            value = _json_value(value)
+            if self.state.get(name) != value:
+                self.state[name] = value
+                delta[name] = value
+        extras = {}
+        if self.extras is not None:
+            for key, value in self.extras().items():
+                if self.state.get(key) != value:
+                    self.state[key] = value
+                    extras[key] = value
+        if not delta and not extras:
+            return None
+        self.seq += 1
+        self._snapshot = None
+        return {"type": "delta", "seq": self.seq, "tags": delta, **extras}
+
+    def snapshot_frame(self) -> bytes:
+        if self._snapshot is None:
+            self._snapshot = _encode({"type": "snapshot", "seq": self.seq, "state": self.state})
+        return self._snapshot
+
+    def broadcast(self, frame: bytes | None):
+        #delta do nadążających widzów; migawka dla tych, którzy właśnie nadrobili bufor
+        for v in self.viewers:
+            buffered = v.writer.transport.get_write_buffer_size()
+            if v.stale:
+                if buffered > self.low_water:
+                    v.skipped += frame is not None
+                    continue
+                data = self.snapshot_frame()
+                v.stale = False
+            elif frame is None:
+                continue
+            elif buffered > self.high_water:
+                v.stale = True
+                v.skipped += 1
+                continue
+            else:
+                data = frame
+            v.writer.write(data)
+            v.frames += 1
+            self.bytes_sent += len(data)
+
+    async def _frames(self):
+        loop = asyncio.get_running_loop()
+        next_t = loop.time()
+        while True:
+            next_t += self.frame_s
+            await asyncio.sleep(max(0.0, next_t - loop.time()))
+            delta = self.take_delta()
+            frame = _encode(delta) if delta is not None else None
+            if frame is not None:
+                self.frames += 1
+            self.broadcast(frame)
+
+    #HTTP / WEBSOCKET
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if len(head) > MAX_REQUEST:
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = (lines[0].split(" ") + ["", ""])[:3]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+            path = path.split("?", 1)[0]
+
+            if method != "GET":
+                self._http(writer, 405, "text/plain", b"tylko GET")
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self._serve_ws(reader, writer, headers.get("sec-websocket-key", ""))
+            elif path == "/":
+                self._http(writer, 200, "text/html; charset=utf-8", PAGE.encode("utf-8"))
+            elif path == "/snapshot":
+                body = json.dumps({"seq": self.seq, "state": self.state}, ensure_ascii=False)
+                self._http(writer, 200, "application/json", body.encode("utf-8"))
+            else:
+                self._http(writer, 404, "text/plain", b"nie ma")
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _http(self, writer, status: int, ctype: str, body: bytes):
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+                     f"Cache-Control: no-store\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+
+    async def _serve_ws(self, reader, writer, key: str):
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {ws_accept(key)}\r\n\r\n").encode("latin-1"))
+        viewer = _Viewer(writer)
+        #migawka od razu (bez czekania na klatkę); potem delty z pętli klatek
+        writer.write(self.snapshot_frame())
+        viewer.stale = False
+        self.viewers.add(viewer)
+        try:
+            while True:
+                op, data = await ws_read(reader)
+                if op == OP_CLOSE:
+                    writer.write(ws_frame(data[:2], OP_CLOSE))
+                    return
+                if op == OP_PING:
+                    writer.write(ws_frame(data, OP_PONG))
+        finally:
+            self.viewers.discard(viewer)
+
+    #WĄTEK SERWERA
+
+    async def _main(self):
+        server = await asyncio.start_server(self._serve_client, self.host, self.port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]   #port 0 = dowolny wolny
+        frames = asyncio.create_task(self._frames())
+        self._ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            frames.cancel()
+
+    def start(self) -> "RemoteHMI":
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self._task = self.loop.create_task(self._main())
+            try:
+                self.loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self.loop.close()
+
+        self._thread = threading.Thread(target=run, name="remote-hmi", daemon=True)
+        self._thread.start()
+        self._ready.wait(5.0)
+        return self
+
+    def stop(self):
+        if self._task is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(5.0)
+
+
+#KLIENT TESTOWY
+
+class HMIClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+        self.state = {}
+        self.seq = None
+
+    async def connect(self) -> "HMIClient":
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        self.writer.write((f"GET /ws HTTP/1.1\r\nHost: {self.host}\r\nUpgrade: websocket\r\n"
+                           f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                           "Sec-WebSocket-Version: 13\r\n\r\n").encode("latin-1"))
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        if b" 101 " not in head.split(b"\r\n", 1)[0] or ws_accept(key).encode() not in head:
+            raise IOError("serwer nie przyjął połączenia WebSocket")
+        return self
+
+    async def recv(self) -> dict:
+        #następna wiadomość; stan widza (self.state) aktualizowany migawką/deltą
+        while True:
+            op, data = await ws_read(self.reader)
+            if op == OP_TEXT:
+                break
+        msg = json.loads(data)
+        if msg["type"] == "snapshot":
+            self.state = dict(msg["state"])
+        else:
+            self.state.update(msg["tags"])
+            self.state.update({k: v for k, v in msg.items() if k not in ("type", "seq", "tags")})
+        self.seq = msg["seq"]
+        return msg
+
+    async def close(self):
+        mask = os.urandom(4)
+        payload = struct.pack(">H", 1000)
+        self.writer.write(bytes((0x80 | OP_CLOSE, 0x80 | len(payload))) + mask
+                          + bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def bench(host: str, port: int, viewers: int = 200, seconds: float = 5.0) -> dict:
+    #viewers połączeń czyta przez seconds; zwraca wiadomości i bajty na widza
+    counts = [0] * viewers
+    nbytes = [0] * viewers
+
+    async def one(k):
+        c = await HMIClient(host, port).connect()
+        loop = asyncio.get_running_loop()
+        end = loop.time() + seconds
+        try:
+            while loop.time() < end:
+                try:
+                    op, data = await asyncio.wait_for(ws_read(c.reader), end - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                counts[k] += 1
+                nbytes[k] += len(data)
+        finally:
+            await c.close()
+
+    await asyncio.gather(*(one(k) for k in range(viewers)))
+    return {"viewers": viewers, "msgs": sum(counts) / viewers, "bytes_s": sum(nbytes) / viewers / seconds}
+
+
+PAGE = """<!doctype html>
+<html lang="pl"><head><meta charset="utf-8"><title>Mini SCADA – podgląd</title>
+<style>
+body{background:#1b1b1b;color:#eee;font:14px Arial,sans-serif;margin:20px}
+.tanks{display:flex;gap:24px}.tank{width:150px}
+.box{height:180px;border:2px solid #888;position:relative;background:#222}
+.fill{position:absolute;bottom:0;left:0;right:0;background:#3a7bd5}
+.on{color:#0c6}.off{color:#777}pre{background:#111;padding:8px}
+</style></head><body>
+<h2>Instalacja <small id="phase"></small></h2>
+<div class="tanks" id="tanks"></div>
+<p id="pumps"></p>
+<h3>Raporty</h3><pre id="report"></pre>
+<h3>Alarmy</h3><pre id="alarms"></pre>
+<script>
+const TANKS=[["big","Zbiornik główny",200],["cold","Zimny",100],["hot","Gorący",100],["mix","Mieszalnik",100]];
+const s={};
+document.getElementById("tanks").innerHTML=TANKS.map(([id,name])=>
+  `<div class="tank"><b>${name}</b><div class="box"><div class="fill" id="${id}-fill"></div></div>`+
+  `<div id="${id}-txt"></div></div>`).join("");
+function render(){
+  for(const [id,,cap] of TANKS){
+    const v=s[id+".volume_l"]||0,t=s[id+".temp_c"]||0;
+    document.getElementById(id+"-fill").style.height=Math.min(100,100*v/cap)+"%";
+    document.getElementById(id+"-txt").textContent=`${v.toFixed(1)} L, ${t.toFixed(1)} °C`;
+  }
+  document.getElementById("phase").textContent=s.phase||"";
+  document.getElementById("pumps").innerHTML=["pump_split","pump_cold","pump_hot"].map(p=>
+    `<span class="${s[p]?"on":"off"}">${p}</span>`).join(" · ")+
+    ` · grzałka ${Math.round(100*(s["hot.heater_power"]||0))}%`;
+  document.getElementById("report").textContent=(s.report||[]).join("\\n");
+  const al=(s.alarms||[]).slice();if(s.mix_full_msg)al.push(s.mix_full_msg);
+  document.getElementById("alarms").textContent=al.length?al.map(a=>"• "+a).join("\\n"):"• Brak alarmów.";
+}
+let pending=false;
+function connect(){
+  const ws=new WebSocket(`ws://${location.host}/ws`);
+  ws.onmessage=e=>{const m=JSON.parse(e.data);
+    if(m.type==="snapshot"){for(const k in s)delete s[k];Object.assign(s,m.state);}
+    else{Object.assign(s,m.tags);for(const k in m)if(!["type","seq","tags"].includes(k))s[k]=m[k];}
+    if(!pending){pending=true;requestAnimationFrame(()=>{pending=false;render();});}};
+  ws.onclose=()=>setTimeout(connect,1000);
+}
+connect();
+</script></body></html>
+"""
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Zdalny podgląd HMI (HTTP/WebSocket) z symulacją bez GUI albo test obciążenia.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--bench", action="store_true", help="uruchom serwer z symulacją i podłącz wielu widzów")
+    ap.add_argument("--viewers", type=int, default=200)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args(argv)
+
+    from engine import MixingEngine, Inputs, TICK_S
+    from tags import register_engine, write_engine, write_inputs
+
+    eng = MixingEngine()
+    eng.inputs = Inputs(1.0, 0.2, 0.3)
+    db = register_engine(TagDB(), eng)
+    hmi = RemoteHMI(db, args.host, 0 if args.bench else args.port,
+                    extras=lambda: {"report": eng.report_lines()}).start()
+
+    stop = threading.Event()
+
+    def simulate():
+        next_t = time.monotonic()
+        while not stop.is_set():
+            eng.step(TICK_S)
+            if eng.mix.is_full():
+                eng.reset()
+            write_inputs(db, eng.inputs, eng.t_sim)
+            write_engine(db, eng, eng.t_sim)
+            db.publish(eng.t_sim)
+            next_t += TICK_S
+            time.sleep(max(0.0, next_t - time.monotonic()))
+
+    sim = threading.Thread(target=simulate, daemon=True)
+    sim.start()
+    try:
+        if args.bench:
+            t0, p0 = time.perf_counter(), time.process_time()
+            res = asyncio.run(bench(args.host, hmi.port, args.viewers, args.seconds))
+            wall, cpu = time.perf_counter() - t0, time.process_time() - p0
+            #CPU całego procesu – razem z symulacją i klientami testowymi
+            print(f"{res['viewers']} widzów: {res['msgs']:.0f} wiadomości na widza, "
+                  f"{res['bytes_s'] / 1024:.1f} KiB/s na widza, {hmi.frames} klatek, "
+                  f"CPU procesu {100 * cpu / wall:.0f}%")
+        else:
+            print(f"Podgląd na http://{args.host}:{hmi.port}/ (Ctrl+C kończy)")
+            while True:
+                time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        sim.join()
+        hmi.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
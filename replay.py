@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+
+from engine import MixingEngine, Inputs, TICK_S
+from checkpoint import engine_state, set_engine_state, restore
+
+
+#ZAPIS I ODTWARZANIE NASTAW OPERATORA
+#Silnik jest deterministyczny: ten sam stan początkowy + te same nastawy w tych samych tickach
+#= ten sam przebieg co do bitu. Zapisujemy więc tylko zmiany nastaw i RESET z numerem ticka,
+#a co CHECKPOINT_EVERY ticków skrót stanu silnika. Odtwarzanie liczy bez GUI i zegara
+#(tyle kroków, ile się da) i porównuje skróty – pierwszy rozjazd wskazuje tick, w którym
+#fizyka zachowała się inaczej niż w nagraniu.
+#
+#Format (little-endian):
+#  nagłówek: MAGIC, wersja u8, dt f64, co ile ticków skrót u32,
+#            stan silnika (u16 liczba + f64 × n), komunikat mix_full_msg (u16 długość + UTF-8)
+#  rekordy:  tick u32, rodzaj u8, dane:
+#            INPUTS – pump_rate, cold_rate, hot_rate f64, running u8
+#            RESET  – brak
+#            STATE  – wczytany punkt kontrolny (u16 długość + dane checkpoint.save)
+#            HASH   – 8 B skrótu stanu po ticku
+#            END    – 8 B skrótu stanu końcowego
+
+MAGIC = b"MSIL"
+VERSION = 2   #2: stan zbiorników z energią (TankModel) – skróty z wersji 1 nieporównywalne
+CHECKPOINT_EVERY = 100
+HASH_LEN = 8
+
+K_INPUTS, K_RESET, K_HASH, K_END, K_STATE = 1, 2, 3, 4, 5
+
+_HEADER = struct.Struct("<4sBdI")
+_REC = struct.Struct("<IB")
+_INPUTS = struct.Struct("<dddB")
+_U16 = struct.Struct("<H")
+
+#STAN SILNIKA
+
+def state_hash(eng: MixingEngine) -> bytes:
+    state = engine_state(eng)
+    return hashlib.blake2b(struct.pack(f"<{len(state)}d", *state), digest_size=HASH_LEN).digest()
+
+
+#ZAPIS
+
+class InputRecorder:
+    def __init__(self, path, engine: MixingEngine, dt: float = TICK_S, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.path = path
+        self.engine = engine
+        self.checkpoint_every = checkpoint_every
+        self.tick = 0
+        self._f = open(path, "wb")
+
+        state = engine_state(engine)
+        msg = engine.mix_full_msg.encode("utf-8")
+        self._f.write(_HEADER.pack(MAGIC, VERSION, dt, checkpoint_every))
+        self._f.write(_U16.pack(len(state)) + struct.pack(f"<{len(state)}d", *state))
+        self._f.write(_U16.pack(len(msg)) + msg)
+        self.inputs(engine.inputs)
+
+    def inputs(self, inp: Inputs):
+        #nastawy obowiązujące od następnego kroku
+        self._f.write(_REC.pack(self.tick, K_INPUTS)
+                      + _INPUTS.pack(inp.pump_rate, inp.cold_rate, inp.hot_rate, inp.running))
+
+    def reset(self):
+        self._f.write(_REC.pack(self.tick, K_RESET))
+
+    def state(self, data: bytes):
+        #stan wczytany z punktu kontrolnego (razem z nastawami)
+        self._f.write(_REC.pack(self.tick, K_STATE) + _U16.pack(len(data)) + data)
+
+    def step(self):
+        #po każdym kroku silnika
+        self.tick += 1
+        if self.tick % self.checkpoint_every == 0:
+            self._f.write(_REC.pack(self.tick, K_HASH) + state_hash(self.engine))
+
+    def close(self):
+        if self._f.closed:
+            return
+        self._f.write(_REC.pack(self.tick, K_END) + state_hash(self.engine))
+        self._f.close()
+
+
+#ODCZYT I ODTWARZANIE
+
+@dataclass
+class InputLog:
+    dt: float
+    checkpoint_every: int
+    state: tuple
+    mix_full_msg: str
+    events: list = field(default_factory=list)   #(tick, rodzaj, dane)
+    end_tick: int | None = None                  #None = nagranie przerwane (brak END)
+    end_hash: bytes | None = None
+
+
+def read_log(path) -> InputLog:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, dt, every = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: to nie jest zapis nastaw")
+    if version != VERSION:
+        raise ValueError(f"{path}: nieobsługiwana wersja {version}")
+    pos = _HEADER.size
+    (n,) = _U16.unpack_from(data, pos)
+    state = struct.unpack_from(f"<{n}d", data, pos + 2)
+    pos += 2 + 8 * n
+    (n,) = _U16.unpack_from(data, pos)
+    msg = data[pos + 2:pos + 2 + n].decode("utf-8")
+    pos += 2 + n
+
+    log = InputLog(dt, every, state, msg)
+    size = len(data)
+    while pos + _REC.size <= size:
+        tick, kind = _REC.unpack_from(data, pos)
+        pos += _REC.size
+        if kind == K_INPUTS:
+            if pos + _INPUTS.size > size:
+                break
+            p, c, h, running = _INPUTS.unpack_from(data, pos)
+            pos += _INPUTS.size
+            log.events.append((tick, kind, Inputs(p, c, h, bool(running))))
+        elif kind == K_RESET:
+            log.events.append((tick, kind, None))
+        elif kind == K_STATE:
+            if pos + _U16.size > size:
+                break
+            (n,) = _U16.unpack_from(data, pos)
+            if pos + _U16.size + n > size:
+                break
+            log.events.append((tick, kind, data[pos + _U16.size:pos + _U16.size + n]))
+            pos += _U16.size + n
+        elif kind in (K_HASH, K_END):
+            if pos + HASH_LEN > size:
+                break
+            digest = data[pos:pos + HASH_LEN]
+            pos += HASH_LEN
+            if kind == K_END:
+                log.end_tick, log.end_hash = tick, digest
+                break
+            log.events.append((tick, kind, digest))
+        else:
+            raise ValueError(f"{path}: nieznany rekord {kind} (offset {pos - _REC.size})")
+    return log
+
+
+@dataclass
+class ReplayResult:
+    ticks: int
+    checkpoints: int
+    mismatch_tick: int | None   #pierwszy tick z innym skrótem stanu
+    complete: bool              #nagranie miało rekord END
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatch_tick is None
+
+
+def replay(log, engine: MixingEngine | None = None) -> ReplayResult:
+    #log: ścieżka albo InputLog; kończy na pierwszym rozjeździe skrótów
+    if not isinstance(log, InputLog):
+        log = read_log(log)
+    eng = engine or MixingEngine()
+    set_engine_state(eng, log.state, log.mix_full_msg)
+
+    dt = log.dt
+    step = eng.step
+    tick = 0
+    checkpoints = 0
+    for ev_tick, kind, payload in log.events:
+        for _ in range(ev_tick - tick):
+            step(dt)
+        tick = ev_tick
+        if kind == K_INPUTS:
+            eng.inputs = payload
+        elif kind == K_RESET:
+            eng.reset()
+        elif kind == K_STATE:
+            restore(payload, eng)
+        elif kind == K_HASH:
+            checkpoints += 1
+            if state_hash(eng) != payload:
+                return ReplayResult(tick, checkpoints, tick, False)
+
+    if log.end_tick is None:
+        return ReplayResult(tick, checkpoints, None, False)
+    for _ in range(log.end_tick - tick):
+        step(dt)
+    checkpoints += 1
+    if state_hash(eng) != log.end_hash:
+        return ReplayResult(log.end_tick, checkpoints, log.end_tick, True)
+    return ReplayResult(log.end_tick, checkpoints, None, True)
+
+
+def _replay_path(path) -> tuple:
+    return path, replay(path)
+
+
+def replay_many(paths, workers: int | None = None):
+    #generator (ścieżka, ReplayResult) w kolejności ścieżek; sesje równolegle na wszystkich rdzeniach
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    paths = list(paths)
+    if workers <= 1 or len(paths) <= 1:
+        yield from map(_replay_path, paths)
+        return
+    from concurrent.futures import ProcessPoolExecutor  #procesy tylko przy wielu sesjach (szybki import)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_replay_path, paths, chunksize=max(1, len(paths) // (workers * 4)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Odtwarzanie zapisanych sesji bez GUI ze sprawdzaniem skrótów stanu.")
+    ap.add_argument("logs", nargs="+", help="pliki zapisu nastaw (Projekt_mini_Scada.py --record)")
+    ap.add_argument("--jobs", type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    args = ap.parse_args(argv)
+
+    bad = 0
+    for path, res in replay_many(args.logs, args.jobs):
+        if not res.ok:
+            status = f"ROZJAZD w ticku {res.mismatch_tick}"
+            bad += 1
+        else:
+            status = "OK" if res.complete else "OK (nagranie przerwane)"
+        print(f"{path}: {res.ticks} ticków, {res.checkpoints} punktów kontrolnych – {status}")
+    if len(args.logs) > 1:
+        print(f"{len(args.logs) - bad}/{len(args.logs)} sesji zgodnych")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import argparse
+import platform
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+
+from engine import MixingEngine
+
+
+#STAN INSTALACJI W PAMIĘCI WSPÓŁDZIELONEJ (seqlock)
+#Symulacja po każdym kroku zapisuje stan zbiorników big/cold/hot/mix, pomp i nastaw do bloku
+#multiprocessing.shared_memory o stałym układzie. Lokalne narzędzia (rejestratory, optymalizatory,
+#testy) czytają go bez gniazd i bez blokad – odczyt to rozpakowanie kilkudziesięciu bajtów
+#prosto z odwzorowanej pamięci, pojedyncze mikrosekundy.
+#
+#Spójność daje licznik wersji (seqlock): pisarz zwiększa go do nieparzystego przed zapisem
+#i do parzystego po nim. Czytelnik bierze licznik, kopiuje stan i sprawdza licznik jeszcze raz –
+#nieparzysty albo zmieniony oznacza, że trafił na zapis, więc ponawia. Pisarz nigdy nie czeka
+#na czytelników (symulacja nie zwalnia od ich liczby).
+#Licznik ma w bloku wyrównany adres (offset 8 od początku strony), a pisarz i czytelnik sięgają
+#do niego przez memoryview.cast("Q") – jeden wyrównany 8-bajtowy zapis/odczyt (na x86 niepodzielny),
+#więc czytelnik nie zobaczy licznika rozdartego (struct.pack_into z "<Q" zapisuje bajt po bajcie).
+#Na x86 "Q" w kolejności natywnej to little-endian, jak reszta układu.
+#Kolejność zapisów licznik -> stan -> licznik (i odczytów po drugiej stronie) zapewnia model pamięci
+#x86 (TSO); na ARM i innych słabszych modelach potrzebne byłyby bariery, których z Pythona nie
+#postawimy, więc na innych architekturach ShmPublisher/ShmReader odmawiają uruchomienia.
+#
+#Układ (little-endian):
+#  nagłówek 16 B: MAGIC, LAYOUT u16, rozmiar stanu u16, licznik wersji u64 (offset 8)
+#  stan:         krok u64, t f64, (volume_l, temp_c) f64 × 4 zbiorniki, hot.heater_power f64,
+#                sp.pump_rate, sp.cold_rate, sp.hot_rate f64, flagi u32 (FLAGS, bit 0 = pierwszy)
+
+MAGIC = b"MSHM"
+LAYOUT = 1
+DEFAULT_NAME = "mini_scada_state"
+READ_RETRIES = 10000
+SPIN = 64          #ponowienia bez oddawania procesora; potem krótki sen (pisarz mógł zostać wywłaszczony)
+YIELD_S = 20e-6
+
+TANKS = ("big", "cold", "hot", "mix")
+#nazwy jak w bazie tagów (tags.ENGINE_TAG_SPECS / INPUT_TAG_SPECS)
+FLOATS = tuple(f"{tid}.{f}" for tid in TANKS for f in ("volume_l", "temp_c")) + (
+    "hot.heater_power", "sp.pump_rate", "sp.cold_rate", "sp.hot_rate")
+FLAGS = ("sp.running", "pump_split", "pump_cold", "pump_hot", "flow_big_to_split", "flow_split_to_cold",
+         "flow_split_to_hot", "flow_cold_to_mix", "flow_hot_to_mix")
+FIELDS = FLOATS + FLAGS
+_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+_HEADER = struct.Struct("<4sHHQ")
+_SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+_STATE = struct.Struct(f"<Qd{len(FLOATS)}dI4x")
+SIZE = _HEADER.size + _STATE.size
+
+X86 = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686", "x86")
+
+_created = set()   #bloki utworzone w tym procesie (sprzątanie zostaje po stronie pisarza)
+
+
+@dataclass(frozen=True, slots=True)
+class ShmState:
+    seq: int         #licznik wersji (parzysty); seq // 2 = liczba publikacji
+    step: int        #numer publikacji od utworzenia bloku
+    t: float         #czas instalacji
+    values: tuple    #wartości w kolejności FIELDS
+
+    def value(self, name: str):
+        return self.values[_INDEX[name]]
+
+    def tank(self, tid: str) -> tuple[float, float]:
+        #(objętość [L], temperatura [°C])
+        i = _INDEX[f"{tid}.volume_l"]
+        return self.values[i], self.values[i + 1]
+
+
+def _require_x86():
+    if not X86:
+        raise RuntimeError(f"seqlock w pamięci współdzielonej wymaga x86 (TSO), a to {platform.machine()}")
+
+
+def _seq_view(buf) -> tuple:
+    #(wycinek, licznik jako u64) – oba trzeba zwolnić przed zamknięciem bloku
+    part = buf[SEQ_OFFSET:SEQ_OFFSET + _SEQ.size]
+    return part, part.cast("Q")
+
+
+class ShmPublisher:
+    def __init__(self, name: str = DEFAULT_NAME):
+        _require_x86()
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=SIZE)
+            seq = 0
+        except FileExistsError:
+            #blok po poprzedniej sesji (np. przerwanej) – przejmujemy, jeśli układ ten sam
+            self.shm = shared_memory.SharedMemory(name)
+            magic, layout, size, seq = _HEADER.unpack_from(self.shm.buf, 0)
+            if self.shm.size < SIZE or (magic, layout, size) != (MAGIC, LAYOUT, _STATE.size):
+                self.shm.close()
+                raise ValueError(f"{name}: blok pamięci współdzielonej o innym układzie")
+            seq = (seq | 1) + 1   #parzysty i nowszy niż wszystko przed nim
+        _created.add(self.shm.name)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        self.seq = seq
+        self.step = 0
+        _HEADER.pack_into(self.buf, 0, MAGIC, LAYOUT, _STATE.size, seq)
+        self._part, self._seqv = _seq_view(self.buf)
+
+    def publish(self, eng: MixingEngine, t: float):
+        #wątek symulacji, po każdym kroku
+        big, cold, hot, mix = eng.big, eng.cold, eng.hot, eng.mix
+        inp = eng.inputs
+        flags = (inp.running | eng.pump_split_on << 1 | eng.pump_cold_on << 2 | eng.pump_hot_on << 3
+                 | eng.flow_big_to_pump << 4 | eng.flow_pump_to_cold << 5 | eng.flow_pump_to_hot << 6
+                 | eng.flow_cold_to_mix << 7 | eng.flow_hot_to_mix << 8)
+        self.step += 1
+        buf = self.buf
+        self._seqv[0] = self.seq + 1   #nieparzysty – zapis w toku
+        _STATE.pack_into(buf, _HEADER.size, self.step, t,
+                         big.volume_l, big.temp_c, cold.volume_l, cold.temp_c,
+                         hot.volume_l, hot.temp_c, mix.volume_l, mix.temp_c,
+                         eng.heater_power, inp.pump_rate, inp.cold_rate, inp.hot_rate, flags)
+        self.seq += 2
+        self._seqv[0] = self.seq
+
+    def close(self, unlink: bool = True):
+        if self.buf is None:
+            return
+        self.buf = None
+        self._seqv.release()
+        self._part.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+        _created.discard(self.name)
+
+
+class ShmReader:
+    def __init__(self, name: str = DEFAULT_NAME):
+        _require_x86()
+        self.shm = shared_memory.SharedMemory(name)
+        if self.shm.name not in _created:
+            #w Pythonie < 3.13 dołączenie rejestruje blok w resource_tracker, który usunąłby go
+            #przy wyjściu czytelnika – blok należy do pisarza
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.buf = self.shm.buf
+        magic, layout, size, _ = _HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or layout != LAYOUT or size != _STATE.size:
+            self.buf = None
+            self.shm.close()
+            raise ValueError(f"{name}: nieobsługiwany blok stanu (układ {layout})")
+        self._part, self._seqv = _seq_view(self.buf)
+        self.retries = 0   #ponowienia z powodu trwającego zapisu (statystyka)
+
+    def seq(self) -> int:
+        return self._seqv[0]
+
+    def read(self, retries: int = READ_RETRIES) -> ShmState:
+        buf, seqv = self.buf, self._seqv
+        for k in range(retries):
+            s1 = seqv[0]
+            if not s1 & 1:
+                raw = _STATE.unpack_from(buf, _HEADER.size)
+                if seqv[0] == s1:
+                    flags = raw[-1]
+                    bits = tuple(bool(flags >> i & 1) for i in range(len(FLAGS)))
+                    return ShmState(s1, raw[0], raw[1], raw[2:-1] + bits)
+            self.retries += 1
+            if k >= SPIN:
+                time.sleep(YIELD_S)
+        raise IOError("stan w pamięci współdzielonej ciągle w zapisie (pisarz przerwany?)")
+
+    def wait(self, after_seq: int, timeout: float = 1.0, poll_s: float = 0.0005) -> ShmState | None:
+        #pierwszy stan nowszy niż after_seq; None po timeout
+        end = time.monotonic() + timeout
+        while self.seq() <= after_seq:
+            if time.monotonic() >= end:
+                return None
+            time.sleep(poll_s)
+        return self.read()
+
+    def close(self):
+        if self.buf is None:
+            return
+        self.buf = None
+        self._seqv.release()
+        self._part.release()
+        self.shm.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stan instalacji w pamięci współdzielonej: symulacja bez GUI albo odczyt.")
+    ap.add_argument("name", nargs="?", default=DEFAULT_NAME)
+    ap.add_argument("--simulate", action="store_true", help="symulacja bez GUI publikująca stan (Ctrl+C kończy)")
+    ap.add_argument("--watch", action="store_true", help="wypisuj stan co sekundę")
+    ap.add_argument("--bench", type=int, default=0, metavar="N", help="zmierz N odczytów")
+    args = ap.parse_args(argv)
+
+    if args.simulate:
+        from engine import Inputs, TICK_S
+
+        eng = MixingEngine()
+        eng.inputs = Inputs(1.0, 0.2, 0.3)
+        pub = ShmPublisher(args.name)
+        print(f"Publikacja stanu w bloku {pub.name} (Ctrl+C kończy)")
+        t = 0.0
+        next_t = time.monotonic()
+        try:
+            while True:
+                eng.step(TICK_S)
+                t += TICK_S
+                if eng.mix.is_full():
+                    eng.reset()
+                pub.publish(eng, t)
+                next_t += TICK_S
+                time.sleep(max(0.0, next_t - time.monotonic()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pub.close()
+        return 0
+
+    reader = ShmReader(args.name)
+    try:
+        if args.bench:
+            t0 = time.perf_counter()
+            for _ in range(args.bench):
+                reader.read()
+            us = (time.perf_counter() - t0) / args.bench * 1e6
+            print(f"{args.bench} odczytów: {us:.2f} µs na odczyt, {reader.retries} ponowień")
+            return 0
+        while True:
+            s = reader.read()
+            tanks = "  ".join(f"{tid} {v:6.1f} L {T:5.1f} °C" for tid, (v, T) in ((tid, s.tank(tid)) for tid in TANKS))
+            print(f"t={s.t:8.2f} s  {tanks}")
+            if not args.watch:
+                return 0
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
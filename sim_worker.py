@@ -0,0 +1,232 @@
+import queue
+import sys
+import threading
+import traceback
+from dataclasses import dataclass
+
+from engine import MixingEngine, Inputs, TICK_S
+from clock import SimClock, SPEED_MAX
+from tags import ENGINE_TAG_SPECS, INPUT_TAG_SPECS
+from replay import InputRecorder
+import checkpoint
+
+
+#SYMULACJA W OSOBNYM WĄTKU
+#Wątek symulacji jest jedynym właścicielem silnika. Po każdej porcji kroków publikuje
+#niezmienną migawkę stanu do jednego z dwóch buforów i przestawia wskaźnik na nowy
+#(zamiana referencji jest atomowa) – GUI czyta zawsze kompletną, ostatnią migawkę
+#i nigdy nie dotyka żywych obiektów TankModel. Polecenia (nastawy, RESET, prędkość)
+#GUI wysyła kolejką; wątek wykonuje je przed kolejnym krokiem.
+
+SNAPSHOT_TAGS = tuple(name for name, _, _, _ in (*ENGINE_TAG_SPECS, *INPUT_TAG_SPECS))
+_INDEX = {name: i for i, name in enumerate(SNAPSHOT_TAGS)}
+_GETTERS = tuple(get for _, _, get, _ in ENGINE_TAG_SPECS)
+_INPUT_GETTERS = tuple(get for _, _, get, _ in INPUT_TAG_SPECS)
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    seq: int                   #numer publikacji
+    steps: int                 #kroki fizyki od startu wątku
+    t: float                   #czas instalacji (ciągły także po RESET)
+    values: tuple              #wartości tagów w kolejności SNAPSHOT_TAGS
+    report: tuple              #linie raportu silnika
+    alarms: tuple = ()         #aktywne alarmy: (reguła, od kiedy, potwierdzony)
+
+    def value(self, name: str):
+        return self.values[_INDEX[name]]
+
+    def items(self):
+        return zip(SNAPSHOT_TAGS, self.values)
+
+
+class SimWorker:
+    def __init__(self, engine: MixingEngine | None = None, on_tick=None, dt: float = TICK_S,
+                 speed: float = 1.0, alarms=None, poll_s: float = 0.005):
+        self.engine = engine or MixingEngine()
+        self.on_tick = on_tick      #fn(t) po każdym kroku, w wątku symulacji (historia, alarmy, tagi)
+        self.alarms = alarms        #AlarmEngine – aktywne alarmy trafiają do migawki
+        self.dt = dt
+        self.poll_s = poll_s
+        self.t0 = 0.0               #przesunięcie czasu instalacji po RESET
+        self.recorder = None        #InputRecorder – zapis nastaw do odtworzenia (record)
+        self.initial_state = None   #punkt kontrolny, do którego wraca RESET (None = stan domyślny)
+        self.controller = None      #fn(engine) -> Inputs | None przed każdym krokiem (np. planner.AutoMix)
+        self.error = None           #wyjątek, który zatrzymał wątek symulacji (on_tick, regulator, polecenie)
+
+        self.clock = SimClock(self._step, dt=dt, speed=speed)
+        self.commands = queue.SimpleQueue()
+        #blokada na czas porcji kroków – dla czytelników współdzielonych struktur (historian)
+        self.lock = threading.Lock()
+
+        self._buffers = [None, None]
+        self._front = 0
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._publish()
+
+    @property
+    def t(self) -> float:
+        return self.t0 + self.engine.t_sim
+
+    #POLECENIA (z dowolnego wątku)
+
+    def call(self, fn):
+        #fn(engine) zostanie wykonane w wątku symulacji przed kolejnym krokiem
+        self.commands.put(fn)
+
+    def set_inputs(self, inputs: Inputs):
+        def do(e):
+            e.inputs = inputs
+            if self.recorder is not None:
+                self.recorder.inputs(inputs)
+        self.call(do)
+
+    def set_speed(self, speed: float):
+        self.call(lambda e: self.clock.set_speed(speed))
+
+    def reset(self):
+        if self.initial_state is not None:
+            self.restore(self.initial_state)
+            return
+
+        def do(e):
+            self.t0 += e.t_sim
+            e.reset()
+            if self.recorder is not None:
+                self.recorder.reset()
+        self.call(do)
+
+    def restore(self, data: bytes):
+        #stan z punktu kontrolnego (checkpoint.save); czas instalacji dalej rośnie
+        def do(e):
+            t = self.t
+            checkpoint.restore(data, e)
+            self.t0 = t - e.t_sim
+            if self.recorder is not None:
+                self.recorder.state(data)
+        self.call(do)
+
+    def save(self) -> bytes:
+        #punkt kontrolny stanu między porcjami kroków
+        with self.lock:
+            return checkpoint.save(self.engine)
+
+    def record(self, path) -> InputRecorder:
+        #od tej chwili każda zmiana nastaw i RESET trafia do pliku z numerem ticka
+        #(polecenia jeszcze w kolejce zostaną zapisane w ticku 0)
+        with self.lock:
+            self._close_recorder()
+            self.recorder = InputRecorder(path, self.engine, self.dt)
+        return self.recorder
+
+    def stop_recording(self):
+        with self.lock:
+            self._close_recorder()
+
+    def _close_recorder(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def set_controller(self, controller):
+        #None wyłącza automatykę; nastawy zostają takie, jakie zostawił regulator
+        self.call(lambda e: setattr(self, "controller", controller))
+
+    def acknowledge(self):
+        self.call(lambda e: self.alarms.acknowledge(self.t))
+
+    #MIGAWKI
+
+    def latest(self) -> Snapshot:
+        return self._buffers[self._front]
+
+    def _publish(self):
+        eng = self.engine
+        values = tuple(get(eng) for get in _GETTERS) + tuple(get(eng.inputs) for get in _INPUT_GETTERS)
+        alarms = tuple(self.alarms.active()) if self.alarms is not None else ()
+        self._seq += 1
+        snap = Snapshot(self._seq, self.clock.steps_total, self.t, values, tuple(eng.report_lines()), alarms)
+        #zapis do bufora tylnego, potem zamiana – czytelnik widzi stary albo nowy, nigdy pół
+        back = 1 - self._front
+        self._buffers[back] = snap
+        self._front = back
+
+    #WĄTEK
+
+    def _step(self):
+        if self.controller is not None:
+            inputs = self.controller(self.engine)
+            if inputs is not None:
+                #nastawy regulatora zapisujemy jak ręczne – odtwarzanie nie potrzebuje regulatora
+                self.engine.inputs = inputs
+                if self.recorder is not None:
+                    self.recorder.inputs(inputs)
+        self.engine.step(self.dt)
+        if self.recorder is not None:
+            self.recorder.step()
+        if self.on_tick is not None:
+            self.on_tick(self.t)
+
+    def _drain(self) -> bool:
+        done = False
+        while True:
+            try:
+                fn = self.commands.get_nowait()
+            except queue.Empty:
+                return done
+            fn(self.engine)
+            done = True
+
+    def poll(self) -> int:
+        #jedna iteracja pętli wątku: polecenia, kroki wg zegara, migawka
+        with self.lock:
+            changed = self._drain()
+            n = self.clock.tick()
+            if n or changed:
+                self._publish()
+        return n
+
+    def step_now(self, n: int = 1):
+        #n kroków od razu, niezależnie od zegara (testy, praca krokowa)
+        with self.lock:
+            self._drain()
+            step = self.clock.step_fn  #ten sam punkt co zegar (profiler może go podmienić)
+            for _ in range(n):
+                step()
+            self.clock.steps_total += n
+            self._publish()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                #bez tego wątek znika po cichu, a GUI rysuje zamrożoną migawkę
+                self.error = e
+                print("Wątek symulacji zatrzymany przez wyjątek:", file=sys.stderr)
+                traceback.print_exc()
+                self._stop.set()
+                self.stop_recording()
+                return
+            #w trybie MAX zegar sam zajmuje budżet klatki – tylko krótka przerwa dla GUI
+            self._stop.wait(self.poll_s if self.clock.speed != SPEED_MAX else 0.001)
+
+    def start(self) -> "SimWorker":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="symulacja", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+            self._thread = None
+        self.stop_recording()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
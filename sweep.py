@@ -0,0 +1,231 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+
+from engine import MixingEngine, Inputs, TICK_S
+from events import run_events
+import checkpoint
+
+
+#PRZEGLĄD PARAMETRÓW: wiele scenariuszy bez GUI, równolegle na wszystkich rdzeniach
+#Scenariusze i wyniki są generowane/oddawane strumieniowo – 100k scenariuszy
+#nie leży naraz w pamięci (w locie jest tylko kilka paczek na proces).
+
+THERMAL_DT = 10 * TICK_S  #temperatury liczone dokładnie przy każdym dt; grubszy krok dzieli tylko przepływy
+
+@dataclass(frozen=True)
+class Scenario:
+    pump_rate: float   #L/tick
+    cold_rate: float   #L/tick
+    hot_rate: float    #L/tick
+    big: tuple[float, float] = (200.0, 20.0)   #stan początkowy: (objętość L, temperatura °C)
+    cold: tuple[float, float] = (0.0, 20.0)
+    hot: tuple[float, float] = (0.0, 20.0)
+    mix: tuple[float, float] = (0.0, 0.0)
+    t_max: float = 3600.0     #czas symulacji od stanu początkowego
+    dt: float | None = None   #krok [s]; None = TICK_S, a z modelem cieplnym THERMAL_DT
+    idx: int = 0
+    state: bytes | None = None  #punkt kontrolny (checkpoint.save) zamiast big/cold/hot/mix
+    thermal: bool = False       #model cieplny z mocami i stratami (thermal.ThermalModel)
+    events: bool = False        #symulacja zdarzeniowa (events.run_events) zamiast kroków dt
+
+    def __post_init__(self):
+        if self.dt is not None and not self.dt > 0.0:
+            raise ValueError(f"krok dt musi być dodatni (jest {self.dt})")
+
+    def step_dt(self) -> float | None:
+        #None = symulacja zdarzeniowa
+        if self.events:
+            return None
+        if self.dt is not None:
+            return self.dt
+        return THERMAL_DT if self.thermal else TICK_S
+
+
+RESULT_FIELDS = [
+    "idx", "pump_rate", "cold_rate", "hot_rate",
+    "mix_temp_c", "mix_volume_l", "time_to_full_s", "t_start_s", "t_end_s",
+    "big_volume_l", "cold_volume_l", "hot_volume_l", "phase",
+]
+
+
+def _finished(e: MixingEngine, t_start: float = 0.0) -> bool:
+    #nic się już nie zmieni: mieszalnik pełny albo proces stanął (puste zbiorniki, zerowe szybkości)
+    if e.t_sim <= t_start:   #flagi przepływu liczy dopiero pierwszy krok
+        return False
+    if e.phase == "FILL":
+        return not e.flow_big_to_pump
+    if e.pump_cold_on or e.pump_hot_on:
+        return False
+    return (e.cold_ready or e.cold.volume_l <= 0.1) and (e.hot_ready or e.hot.volume_l <= 0.1)
+
+
+def run_scenario(sc: Scenario) -> dict:
+    if sc.state is not None:
+        eng = checkpoint.restore(sc.state)
+    else:
+        eng = MixingEngine()
+        for tank, (vol, temp) in ((eng.big, sc.big), (eng.cold, sc.cold), (eng.hot, sc.hot), (eng.mix, sc.mix)):
+            tank.volume_l = min(vol, tank.capacity_l)
+            tank.temp_c = temp
+
+    dt = sc.step_dt()
+    if sc.thermal:
+        if dt is None:
+            raise ValueError("model cieplny wymaga kroku dt (symulacja zdarzeniowa liczy relaksację)")
+        from thermal import ThermalModel  #NumPy tylko dla scenariuszy z modelem cieplnym
+        eng.thermal = ThermalModel()
+
+    inputs = Inputs(pump_rate=sc.pump_rate, cold_rate=sc.cold_rate, hot_rate=sc.hot_rate)
+    t_start = eng.t_sim   #punkt kontrolny niesie własny czas
+    t_end = t_start + sc.t_max
+    if dt is None:
+        run_events(eng, t=t_end, until=lambda e: e.mix.is_full(), inputs=inputs, stop_idle=True)
+    else:
+        eng.run_until(t=t_end, condition=lambda e: e.mix.is_full() or _finished(e, t_start), dt=dt, inputs=inputs)
+
+    return {
+        "idx": sc.idx,
+        "pump_rate": sc.pump_rate,
+        "cold_rate": sc.cold_rate,
+        "hot_rate": sc.hot_rate,
+        "mix_temp_c": eng.mix.temp_c,
+        "mix_volume_l": eng.mix.volume_l,
+        #czasy od startu scenariusza; t_start_s = czas instalacji w punkcie kontrolnym (0 bez niego)
+        "time_to_full_s": eng.t_sim - t_start if eng.mix.is_full() else None,
+        "t_start_s": t_start,
+        "t_end_s": eng.t_sim - t_start,
+        "big_volume_l": eng.big.volume_l,
+        "cold_volume_l": eng.cold.volume_l,
+        "hot_volume_l": eng.hot.volume_l,
+        "phase": eng.phase,
+    }
+
+
+def _run_chunk(chunk: list[Scenario]) -> list[dict]:
+    return [run_scenario(sc) for sc in chunk]
+
+
+#GENERATORY SCENARIUSZY
+
+def grid(pump_rates, cold_rates, hot_rates, initial_states=({},), **common):
+    #initial_states: słowniki np. {"cold": (50.0, 20.0)} – nadpisują stan początkowy
+    idx = 0
+    for state, p, c, h in itertools.product(initial_states, pump_rates, cold_rates, hot_rates):
+        yield Scenario(pump_rate=p, cold_rate=c, hot_rate=h, idx=idx, **state, **common)
+        idx += 1
+
+
+def random_scenarios(n: int, pump=(0.1, 1.0), cold=(0.0, 0.5), hot=(0.0, 0.5), seed=None, **common):
+    #każdy parametr: (min, max) -> rozkład jednostajny albo funkcja rng -> wartość
+    rng = random.Random(seed)
+
+    def draw(spec):
+        if callable(spec):
+            return spec(rng)
+        lo, hi = spec
+        return rng.uniform(lo, hi)
+
+    for idx in range(n):
+        yield Scenario(pump_rate=draw(pump), cold_rate=draw(cold), hot_rate=draw(hot), idx=idx, **common)
+
+
+#URUCHAMIANIE
+
+def run_sweep(scenarios, workers: int | None = None, chunk_size: int = 32, max_pending: int | None = None):
+    #generator: wyniki w kolejności ukończenia (pole "idx" wskazuje scenariusz)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    scenarios = iter(scenarios)
+
+    if workers <= 1:
+        for sc in scenarios:
+            yield run_scenario(sc)
+        return
+
+    max_pending = max_pending or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(scenarios, chunk_size))
+                if not chunk:
+                    break
+                pending.add(pool.submit(_run_chunk, chunk))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from fut.result()
+
+
+def _positive(spec: str) -> float:
+    v = float(spec)
+    if not v > 0.0:
+        raise argparse.ArgumentTypeError(f"krok musi być dodatni: {spec}")
+    return v
+
+
+def _values(spec: str) -> list[float]:
+    #"0.1,0.3" albo zakres "start:stop:krok" (stop włącznie)
+    if ":" in spec:
+        parts = [float(x) for x in spec.split(":")]
+        if len(parts) == 2:
+            return parts
+        start, stop, step = parts
+        n = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(n)]
+    return [float(x) for x in spec.split(",")]
+
+
+def _bounds(spec: str) -> tuple[float, float]:
+    #dla Monte Carlo: "min:max[:krok]" albo jedna wartość
+    vals = _values(spec)
+    return min(vals), max(vals)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Przegląd szybkości pomp (siatka albo Monte Carlo) bez GUI.")
+    ap.add_argument("--pump", default="1.0", help="szybkości pompy [L/tick], np. 0.3,1.0 albo 0.1:1.0:0.1")
+    ap.add_argument("--cold", default="0.0:0.5:0.1", help="zimna -> mix [L/tick]")
+    ap.add_argument("--hot", default="0.0:0.5:0.1", help="ciepła -> mix [L/tick]")
+    ap.add_argument("--random", type=int, default=0, help="zamiast siatki: N losowych scenariuszy z zakresów min:max")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--t-max", type=float, default=3600.0)
+    ap.add_argument("--dt", type=_positive, default=None, help=f"krok [s] (domyślnie {TICK_S}, z --thermal {THERMAL_DT:g})")
+    ap.add_argument("--events", action="store_true", help="symulacja zdarzeniowa (ignoruje --dt)")
+    ap.add_argument("--thermal", action="store_true",
+                    help="model cieplny: moc grzałki/chłodnicy, straty do otoczenia (adaptacyjny RK)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--state", default=None, help="wszystkie scenariusze z punktu kontrolnego (plik .msck)")
+    ap.add_argument("--out", default="-", help="plik CSV (domyślnie stdout)")
+    args = ap.parse_args(argv)
+
+    common = {"t_max": args.t_max, "dt": args.dt, "events": args.events, "thermal": args.thermal}
+    if args.state:
+        with open(args.state, "rb") as f:
+            common["state"] = f.read()
+    if args.random:
+        scenarios = random_scenarios(args.random, pump=_bounds(args.pump), cold=_bounds(args.cold),
+                                     hot=_bounds(args.hot), seed=args.seed, **common)
+    else:
+        scenarios = grid(_values(args.pump), _values(args.cold), _values(args.hot), **common)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="", encoding="utf-8")
+    try:
+        w = csv.DictWriter(out, fieldnames=RESULT_FIELDS)
+        w.writeheader()
+        for row in run_sweep(scenarios, workers=args.workers):
+            w.writerow(row)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+from engine import MixingEngine, Inputs
+
+
+#BAZA TAGÓW
+#Każda wielkość procesu (objętości, temperatury, pompy, grzałka, faza, nastawy) jest
+#zarejestrowana jako tag z typem, jakością i znacznikiem czasu. Zapis tylko zaznacza
+#zmianę; publish() raz na tick rozsyła zmiany paczką – każdy subskrybent dostaje jedno
+#wywołanie z samymi tagami, które zmieniły się (o więcej niż jego deadband).
+
+GOOD, UNCERTAIN, BAD = 0, 1, 2
+QUALITY_NAMES = {GOOD: "GOOD", UNCERTAIN: "UNCERTAIN", BAD: "BAD"}
+
+
+class Tag:
+    __slots__ = ("name", "type", "value", "quality", "timestamp", "unit", "subs")
+
+    def __init__(self, name: str, type_, value, unit: str = ""):
+        self.name = name
+        self.type = type_
+        self.value = type_(value)
+        self.quality = BAD      #do pierwszego zapisu wartość jest tylko domyślna
+        self.timestamp = None
+        self.unit = unit
+        self.subs = []          #subskrypcje obejmujące ten tag
+
+
+class Subscription:
+    __slots__ = ("fn", "tags", "deadband", "every_tick", "sent", "pending")
+
+    def __init__(self, fn, tags, deadband: float, every_tick: bool):
+        self.fn = fn                #fn(t, {nazwa: wartość})
+        self.tags = tags
+        self.deadband = deadband
+        self.every_tick = every_tick  #wołaj też z pustą paczką (np. dla opóźnień alarmów)
+        self.sent = {}              #nazwa -> (wartość, jakość) ostatnio dostarczone
+        self.pending = {}
+
+
+class TagDB:
+    def __init__(self):
+        self.tags = {}
+        self.subscriptions = []
+        self._changed = []      #tagi zapisane z nową wartością/jakością od ostatniego publish
+        self._dirty = set()
+
+    def register(self, name: str, type_=float, value=0.0, unit: str = "") -> Tag:
+        if name in self.tags:
+            raise ValueError(f"tag {name!r} już istnieje")
+        tag = Tag(name, type_, value, unit)
+        self.tags[name] = tag
+        return tag
+
+    def __contains__(self, name):
+        return name in self.tags
+
+    def __getitem__(self, name) -> Tag:
+        return self.tags[name]
+
+    def value(self, name: str):
+        return self.tags[name].value
+
+    def write(self, name: str, value, t: float, quality: int = GOOD):
+        tag = self.tags[name]
+        value = tag.type(value)
+        if value == tag.value and quality == tag.quality:
+            return
+        tag.value = value
+        tag.quality = quality
+        tag.timestamp = t
+        if name not in self._dirty:
+            self._dirty.add(name)
+            self._changed.append(tag)
+
+    def write_many(self, t: float, values, quality: int = GOOD):
+        #values: pary (nazwa, wartość)
+        for name, value in values:
+            self.write(name, value, t, quality)
+
+    def subscribe(self, names, fn, deadband: float = 0.0, every_tick: bool = False) -> Subscription:
+        #names=None – wszystkie zarejestrowane tagi
+        names = list(self.tags) if names is None else list(names)
+        sub = Subscription(fn, names, deadband, every_tick)
+        for name in names:
+            self.tags[name].subs.append(sub)
+        self.subscriptions.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for name in sub.tags:
+            self.tags[name].subs.remove(sub)
+        self.subscriptions.remove(sub)
+
+    def publish(self, t: float) -> int:
+        #rozesłanie zmian z ostatniego ticka; zwraca liczbę zmienionych tagów
+        changed, self._changed = self._changed, []
+        self._dirty.clear()
+
+        for tag in changed:
+            for sub in tag.subs:
+                last = sub.sent.get(tag.name)
+                if last is not None and last[1] == tag.quality:
+                    old = last[0]
+                    if old == tag.value:
+                        continue
+                    if (sub.deadband and tag.type is float
+                            and abs(tag.value - old) < sub.deadband):
+                        continue
+                sub.sent[tag.name] = (tag.value, tag.quality)
+                sub.pending[tag.name] = tag.value
+
+        for sub in self.subscriptions:
+            if sub.pending:
+                batch, sub.pending = sub.pending, {}
+                sub.fn(t, batch)
+            elif sub.every_tick:
+                sub.fn(t, {})
+        return len(changed)
+
+    def snapshot(self) -> dict:
+        #pełny stan (np. dla nowego klienta): nazwa -> (wartość, jakość, czas)
+        return {n: (tg.value, tg.quality, tg.timestamp) for n, tg in self.tags.items()}
+
+
+#TAGI INSTALACJI
+
+def _tank_tags(prefix, tank):
+    return [
+        (f"{prefix}.volume_l", float, lambda e, k=tank: getattr(e, k).volume_l, "L"),
+        (f"{prefix}.temp_c", float, lambda e, k=tank: getattr(e, k).temp_c, "°C"),
+    ]
+
+
+#(nazwa, typ, getter z silnika, jednostka); nazwy pomp i rur jak w plant.json (plant.Plant)
+ENGINE_TAG_SPECS = (
+    _tank_tags("big", "big") + _tank_tags("cold", "cold") + _tank_tags("hot", "hot") + _tank_tags("mix", "mix")
+    + [
+        ("pump_split", bool, lambda e: e.pump_split_on, ""),
+        ("pump_cold", bool, lambda e: e.pump_cold_on, ""),
+        ("pump_hot", bool, lambda e: e.pump_hot_on, ""),
+        ("flow_big_to_split", bool, lambda e: e.flow_big_to_pump, ""),
+        ("flow_split_to_cold", bool, lambda e: e.flow_pump_to_cold, ""),
+        ("flow_split_to_hot", bool, lambda e: e.flow_pump_to_hot, ""),
+        ("flow_cold_to_mix", bool, lambda e: e.flow_cold_to_mix, ""),
+        ("flow_hot_to_mix", bool, lambda e: e.flow_hot_to_mix, ""),
+        ("hot.heater_power", float, lambda e: e.heater_power, ""),
+        ("phase", str, lambda e: e.phase, ""),
+        ("cold_heat_t", float, lambda e: e.cold_heat_t, "s"),
+        ("hot_heat_t", float, lambda e: e.hot_heat_t, "s"),
+        ("mix_full_msg", str, lambda e: e.mix_full_msg, ""),
+    ]
+)
+
+#nastawy operatora
+INPUT_TAG_SPECS = (
+    ("sp.pump_rate", float, lambda i: i.pump_rate, "L/tick"),
+    ("sp.cold_rate", float, lambda i: i.cold_rate, "L/tick"),
+    ("sp.hot_rate", float, lambda i: i.hot_rate, "L/tick"),
+    ("sp.running", bool, lambda i: i.running, ""),
+)
+#zakresy nastaw (jak suwaki GUI) – zapisy z sieci są do nich przycinane
+INPUT_RANGES = {
+    "sp.pump_rate": (0.1, 1.0),
+    "sp.cold_rate": (0.0, 0.5),
+    "sp.hot_rate": (0.0, 0.5),
+    "sp.running": (0.0, 1.0),
+}
+
+
+def register_engine(db: TagDB, eng: MixingEngine | None = None) -> TagDB:
+    eng = eng or MixingEngine()
+    for name, type_, get, unit in ENGINE_TAG_SPECS:
+        db.register(name, type_, get(eng), unit)
+    for name, type_, get, unit in INPUT_TAG_SPECS:
+        db.register(name, type_, get(eng.inputs), unit)
+    return db
+
+
+def write_engine(db: TagDB, eng: MixingEngine, t: float):
+    for name, _, get, _ in ENGINE_TAG_SPECS:
+        db.write(name, get(eng), t)
+
+
+def write_inputs(db: TagDB, inputs: Inputs, t: float):
+    for name, _, get, _ in INPUT_TAG_SPECS:
+        db.write(name, get(inputs), t)
@@ -0,0 +1,132 @@
+import numpy as np
+
+from engine import TankModel
+
+
+#MODEL WEKTOROWY: wiele zbiorników w tablicach (struct-of-arrays)
+#Semantyka identyczna jak TankModel: przycinanie do pojemności, pusty zbiornik
+#przejmuje temperaturę dolewki, dV <= 0 jest ignorowane. Temperatury liczone średnią ważoną
+#(TankModel trzyma energię) – zgodne z TankModel do zaokrągleń.
+#Uwaga: w jednym wywołaniu add/remove indeksy nie mogą się powtarzać.
+
+class TankBank:
+    def __init__(self, capacity_l, volume_l, temp_c, names=None):
+        self.capacity_l = np.array(capacity_l, dtype=np.float64)
+        self.volume_l = np.array(volume_l, dtype=np.float64)
+        self.temp_c = np.array(temp_c, dtype=np.float64)
+        n = self.capacity_l.shape[0]
+        if self.volume_l.shape != (n,) or self.temp_c.shape != (n,):
+            raise ValueError("capacity_l, volume_l i temp_c muszą mieć ten sam rozmiar")
+        self.names = list(names) if names is not None else [f"T{i}" for i in range(n)]
+
+    @classmethod
+    def from_models(cls, models):
+        models = list(models)
+        return cls([m.capacity_l for m in models],
+                   [m.volume_l for m in models],
+                   [m.temp_c for m in models],
+                   names=[m.name for m in models])
+
+    @classmethod
+    def full_of(cls, n: int, capacity_l: float, volume_l: float = 0.0, temp_c: float = 20.0):
+        return cls(np.full(n, capacity_l), np.full(n, volume_l), np.full(n, temp_c))
+
+    def __len__(self):
+        return self.capacity_l.shape[0]
+
+    def level(self) -> np.ndarray:
+        cap = self.capacity_l
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lvl = np.clip(self.volume_l / cap, 0.0, 1.0)
+        return np.where(cap <= 0, 0.0, lvl)
+
+    def add(self, indices, dV, Tin) -> np.ndarray:
+        vol = self.volume_l[indices]
+        temp = self.temp_c[indices]
+        dV = np.broadcast_to(np.asarray(dV, dtype=np.float64), vol.shape)
+        Tin = np.broadcast_to(np.asarray(Tin, dtype=np.float64), vol.shape)
+
+        free = np.maximum(0.0, self.capacity_l[indices] - vol)
+        added = np.where(dV > 0, np.minimum(dV, free), 0.0)
+        ok = added > 0
+
+        new_vol = vol + added
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mixed = (vol * temp + added * Tin) / new_vol
+        new_temp = np.where(vol <= 1e-9, Tin, mixed)
+
+        self.temp_c[indices] = np.where(ok, new_temp, temp)
+        self.volume_l[indices] = np.where(ok, new_vol, vol)
+        return added
+
+    def remove(self, indices, dV) -> np.ndarray:
+        vol = self.volume_l[indices]
+        dV = np.broadcast_to(np.asarray(dV, dtype=np.float64), vol.shape)
+
+        removed = np.where(dV > 0, np.minimum(dV, np.maximum(0.0, vol)), 0.0)
+        self.volume_l[indices] = vol - removed
+        return removed
+
+    def is_empty(self) -> np.ndarray:
+        return self.volume_l <= 0.1
+
+    def is_full(self) -> np.ndarray:
+        return self.volume_l >= self.capacity_l - 0.1
+
+    def view(self, i: int) -> "TankRef":
+        return TankRef(self, i)
+
+    def model(self, i: int) -> TankModel:
+        return TankModel(self.names[i], float(self.capacity_l[i]),
+                         float(self.volume_l[i]), float(self.temp_c[i]))
+
+
+class TankRef:
+    #pojedynczy zbiornik z banku z API jak TankModel (np. dla TankView)
+    __slots__ = ("bank", "i")
+
+    def __init__(self, bank: TankBank, i: int):
+        self.bank = bank
+        self.i = i
+
+    @property
+    def name(self) -> str:
+        return self.bank.names[self.i]
+
+    @property
+    def capacity_l(self) -> float:
+        return float(self.bank.capacity_l[self.i])
+
+    @property
+    def volume_l(self) -> float:
+        return float(self.bank.volume_l[self.i])
+
+    @volume_l.setter
+    def volume_l(self, v: float):
+        self.bank.volume_l[self.i] = v
+
+    @property
+    def temp_c(self) -> float:
+        return float(self.bank.temp_c[self.i])
+
+    @temp_c.setter
+    def temp_c(self, v: float):
+        self.bank.temp_c[self.i] = v
+
+    def level(self) -> float:
+        cap = self.capacity_l
+        if cap <= 0:
+            return 0.0
+        return max(0.0, min(1.0, self.volume_l / cap))
+
+    def add(self, dV: float, Tin: float) -> float:
+        return float(self.bank.add([self.i], dV, Tin)[0])
+
+    def remove(self, dV: float) -> float:
+        return float(self.bank.remove([self.i], dV)[0])
+
+    def is_empty(self) -> bool:
+        return self.volume_l <= 0.1
+
+    def is_full(self) -> bool:
+        return self.volume_l >= self.capacity_l - 0.1
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+from alarms import AlarmEngine, AlarmRule, RAISE, CLEAR, ACK, load_rules
+
+
+def kinds(eng):
+    return [eng.journal.entry(i)[2] for i in range(len(eng.journal))]
+
+def test_histereza_progu_gornego():
+    eng = AlarmEngine([AlarmRule("HI", "x", "hi", 70.0, "za gorąco", deadband=2.0)])
+    for t, x in enumerate([60.0, 71.0, 69.0, 68.5, 67.9, 71.0]):
+        eng.update(float(t), {"x": x})
+
+    assert kinds(eng) == [RAISE, CLEAR, RAISE]
+    assert [eng.journal.entry(i)[0] for i in range(3)] == [1.0, 4.0, 5.0]
+
+def test_reset_gasi_aktywne_alarmy_w_dzienniku():
+    eng = AlarmEngine([AlarmRule("HI", "x", "hi", 70.0, "za gorąco"), AlarmRule("LO", "x", "lo", 10.0, "zimno")])
+    eng.update(1.0, {"x": 80.0})
+    eng.reset(2.0)
+    assert kinds(eng) == [RAISE, CLEAR] and eng.journal.entry(1)[:2] == (2.0, 0)
+    assert eng.active() == []
+    eng.update(3.0, {"x": 80.0})   # po RESET alarm zapala się od nowa
+    assert kinds(eng) == [RAISE, CLEAR, RAISE]
+
+def test_warunek_zalaczenia_i_opoznienie():
+    rule = AlarmRule("LO", "T", "lo", 10.0, "zimno", delay_on=3.0, enable_tag="V", enable_above=0.1)
+    eng = AlarmEngine([rule])
+    eng.update(0.0, {"T": 0.0, "V": 0.0})   # pusty mieszalnik – brak alarmu
+    eng.update(1.0, {"V": 5.0})             # start opóźnienia
+    eng.update(2.0, {})
+    assert eng.active() == []
+    eng.update(4.5, {})                     # opóźnienie minęło w t=4.0
+    assert kinds(eng) == [RAISE] and eng.journal.entry(0)[0] == 4.0
+
+    eng.acknowledge(5.0)
+    assert eng.active()[0][2] is True
+    eng.update(6.0, {"V": 0.0})
+    assert kinds(eng) == [RAISE, ACK, CLEAR]
+
+def test_szybkosc_zmian_gasnie_bez_kolejnych_zmian():
+    eng = AlarmEngine([AlarmRule("ROC", "x", "roc", 5.0, "skok", window=1.0)])
+    eng.update(0.0, {"x": 0.0})
+    eng.update(0.5, {"x": 10.0})            # 20/s
+    assert kinds(eng) == [RAISE]
+    eng.update(1.0, {})
+    eng.update(1.6, {})                     # okno minęło bez zmian
+    assert kinds(eng) == [RAISE, CLEAR]
+
+def test_reguly_liczone_tylko_dla_zmienionych_tagow():
+    rules = [AlarmRule(f"R{i}", f"tag{i}", "hi", 1.0, "") for i in range(500)]
+    eng = AlarmEngine(rules)
+    calls = []
+    eng._on_change = lambda i, t: calls.append(i)
+    eng.feed_sample(0.0, ["tag7", "tag8"], [0.0, 0.0])
+    eng.feed_sample(1.0, ["tag7", "tag8"], [0.0, 2.0])
+
+    assert calls == [7, 8, 8]
+
+def test_konfiguracja_z_pliku():
+    rules = load_rules(Path(__file__).with_name("alarms.json"))
+    assert {"MIX_ZIMNO", "MIX_GORACO"} <= {r.id for r in rules}
+    with pytest.raises(ValueError):
+        AlarmRule("X", "x", "between", 1.0, "")
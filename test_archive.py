@@ -0,0 +1,89 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from archive import Archive, ArchiveWriter, DATA_EXT, INDEX_EXT
+from engine import MixingEngine, Inputs
+from historian import ENGINE_TAGS, sample_engine
+
+T0 = 1.7e9   # czas ścienny [s]
+
+
+def write_session(root, n, partition_s=60.0, block_rows=256):
+    eng = MixingEngine()
+    eng.inputs = Inputs(1.0, 0.2, 0.3)
+    w = ArchiveWriter(root, ENGINE_TAGS, partition_s=partition_s, block_rows=block_rows)
+    ts, rows = [], []
+    for _ in range(n):
+        eng.step()
+        ts.append(T0 + eng.t_sim)
+        rows.append(sample_engine(eng))
+        w.append(ts[-1], rows[-1])
+    w.close()
+    return np.array(ts), np.array(rows, np.float32)
+
+def test_zapis_i_odczyt_bezstratny_i_kompresja(tmp_path):
+    ts, rows = write_session(tmp_path, 6000)
+    arch = Archive(tmp_path)
+    assert arch.tags == ENGINE_TAGS and len(arch) == 6000
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(DATA_EXT)]) == 4   # 180 s / 60 s
+
+    t, v = arch.query(None, -np.inf, np.inf)
+    assert t.tolist() == ts.tolist()
+    assert np.array_equal(v, rows)
+    assert arch.nbytes() < ts.nbytes / 4 + rows.nbytes / 4
+    arch.close()
+
+def test_zakres_czyta_tylko_potrzebne_bloki(tmp_path):
+    ts, rows = write_session(tmp_path, 6000)
+    arch = Archive(tmp_path)
+    t0, t1 = ts[2000], ts[2300]
+    t, v = arch.query("mix.temp_c", t0, t1)
+    col = ENGINE_TAGS.index("mix.temp_c")
+    assert t.tolist() == ts[2000:2301].tolist()
+    assert v.tolist() == rows[2000:2301, col].tolist()
+    assert arch.blocks_read <= 3   # z 24 bloków
+
+    out = io.StringIO()
+    n = arch.export_csv(out, t0, t1, tags=["mix.volume_l", "mix.temp_c"])
+    lines = out.getvalue().splitlines()
+    assert n == 301 and len(lines) == 302
+    assert lines[0] == "t,mix.volume_l,mix.temp_c"
+    assert float(lines[1].split(",")[2]) == pytest.approx(rows[2000, col], rel=1e-6)
+    arch.close()
+
+def test_przerwany_zapis(tmp_path):
+    write_session(tmp_path, 1000, partition_s=3600.0)
+    base = os.path.join(tmp_path, sorted(os.listdir(tmp_path))[0][:-len(DATA_EXT)])
+    # brak ostatniego rekordu indeksu – blok odzyskany z pliku danych
+    with open(base + INDEX_EXT, "r+b") as f:
+        f.truncate(os.path.getsize(base + INDEX_EXT) - 32)
+    arch = Archive(tmp_path)
+    assert len(arch) == 1000
+    arch.close()
+    # blok urwany w połowie – pomijany, reszta czytelna
+    with open(base + DATA_EXT, "r+b") as f:
+        f.truncate(os.path.getsize(base + DATA_EXT) - 10)
+    arch = Archive(tmp_path)
+    assert len(arch) == 1000 - 1000 % 256
+    assert arch.query("big.volume_l", -np.inf, np.inf)[0].size == len(arch)
+    arch.close()
+
+def test_odczyt_w_trakcie_zapisu(tmp_path):
+    w = ArchiveWriter(tmp_path, ["a", "b"], block_rows=100)
+    for k in range(250):
+        w.append(T0 + k, [k, -k])
+    w.flush()
+    arch = Archive(tmp_path)
+    assert len(arch) == 250
+    for k in range(250, 400):
+        w.append(T0 + k, [k, -k])
+    w.flush()
+    arch.refresh()
+    t, v = arch.query("b", T0 + 390, np.inf)
+    assert v.tolist() == [-k for k in range(390, 400)]
+    with pytest.raises(ValueError, match="rosnąć"):
+        w.append(T0, [0, 0])
+    w.close()
+    arch.close()
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+import bench
+
+
+def test_porownanie_z_progiem():
+    rows = bench.compare({"a": 1.2, "b": 1.4, "c": 1.0}, {"a": 1.0, "b": 1.0}, threshold_pct=25.0)
+    assert [(name, bad) for name, _, _, _, bad in rows] == [("a", False), ("b", True), ("c", False)]
+    assert rows[1][3] == pytest.approx(40.0)
+    assert rows[2][2] is None  # brak odniesienia to nie regresja
+
+def test_zapis_i_bramka_regresji(tmp_path, monkeypatch):
+    monkeypatch.setitem(bench.CASES, "test.noop", (lambda n: lambda: None, 10, False))
+    path = tmp_path / "baseline.json"
+    args = ["test.noop", "--baseline", str(path), "--rounds", "2", "--min-time", "0"]
+
+    assert bench.main(args + ["--save"]) == 0
+    saved = json.loads(path.read_text(encoding="utf-8"))["cases"]
+    assert saved["test.noop"] > 0.0
+
+    # odniesienie nierealnie szybkie – każdy pomiar to regresja
+    path.write_text(json.dumps({"cases": {"test.noop": 1e-15}}), encoding="utf-8")
+    assert bench.main(args) == 1
+    assert bench.main(args + ["--threshold", "1e20"]) == 0
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+import checkpoint
+from engine import MixingEngine, Inputs
+from replay import replay
+from sim_worker import SimWorker
+
+
+def mid_batch() -> MixingEngine:
+    eng = MixingEngine()
+    eng.run_until(condition=lambda e: e.mix.volume_l > 20.0, inputs=Inputs(1.0, 0.3, 0.2), max_steps=100_000)
+    return eng
+
+def test_zapis_i_odczyt_w_trakcie_partii():
+    eng = mid_batch()
+    data = checkpoint.save(eng)
+    copy = checkpoint.restore(data)
+    assert len(data) < 200
+    assert checkpoint.engine_state(copy) == checkpoint.engine_state(eng)
+    assert copy.inputs == eng.inputs
+
+    for _ in range(2000):
+        eng.step()
+        copy.step()
+    assert checkpoint.engine_state(copy) == checkpoint.engine_state(eng)
+    assert copy.mix_full_msg == eng.mix_full_msg != ""
+    assert checkpoint.save(checkpoint.restore(checkpoint.save(eng))) == checkpoint.save(eng)
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        checkpoint.restore(data, copy)
+    assert (time.perf_counter() - t0) / 1000 < 1e-3
+
+def test_kopie_niezalezne():
+    data = checkpoint.save(mid_batch())
+    copies = checkpoint.fork(data, 3)
+    for k, eng in enumerate(copies):
+        eng.inputs = Inputs(1.0, 0.1 * k, 0.1)
+        eng.run_until(max_steps=500)
+    temps = [eng.mix.temp_c for eng in copies]
+    assert len(set(temps)) == 3
+    assert checkpoint.restore(data).mix.volume_l == pytest.approx(checkpoint.restore(data).mix.volume_l)
+    assert copies[0].big is not copies[1].big
+
+def test_zly_format():
+    data = checkpoint.save(MixingEngine())
+    with pytest.raises(ValueError, match="to nie jest"):
+        checkpoint.restore(b"XXXX" + data[4:])
+    with pytest.raises(ValueError, match="wersja"):
+        checkpoint.restore(data[:4] + b"\x09\x00" + data[6:])
+    with pytest.raises(ValueError, match="długość"):
+        checkpoint.restore(data + b"!")
+
+def test_worker_reset_do_stanu_i_odtwarzanie(tmp_path):
+    data = checkpoint.save(mid_batch())
+    worker = SimWorker()
+    worker.initial_state = data
+    worker.record(tmp_path / "sesja.mslog")
+    worker.step_now(100)
+    t = worker.latest().t
+    worker.reset()                     # RESET = powrót do punktu kontrolnego
+    worker.step_now(1)
+    snap = worker.latest()
+    assert snap.t == pytest.approx(t + 0.03)   # czas instalacji ciągły
+    assert snap.value("phase") == "MIX"
+    worker.step_now(300)
+    worker.stop()
+
+    res = replay(tmp_path / "sesja.mslog")
+    assert res.ok and res.complete and res.ticks == 401
+
+def test_odczyt_wersji_1():
+    # wersja 1: zbiorniki jako objętość i temperatura
+    eng = mid_batch()
+    state = checkpoint.engine_state(eng)
+    tanks = [x for k in range(4) for x in (state[7 + 3 * k], state[9 + 3 * k])]
+    inp = eng.inputs
+    data = checkpoint._RECORD_V1.pack(checkpoint.MAGIC, 1, *state[:7], *tanks,
+                                      inp.pump_rate, inp.cold_rate, inp.hot_rate, inp.running, 0)
+    copy = checkpoint.restore(data)
+    for name in ("big", "cold", "hot", "mix"):
+        assert getattr(copy, name).volume_l == getattr(eng, name).volume_l
+        assert getattr(copy, name).temp_c == pytest.approx(getattr(eng, name).temp_c, abs=1e-12)
+    assert copy.inputs == eng.inputs and copy.phase == eng.phase
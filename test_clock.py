@@ -0,0 +1,56 @@
+import pytest
+from clock import SimClock, SPEED_PAUSE, SPEED_MAX
+
+
+class FakeTime:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_clock(**kw):
+    now = FakeTime()
+    steps = []
+    clock = SimClock(lambda: steps.append(1), dt=0.03, now=now, **kw)
+    clock.tick()  # pierwszy tick tylko zapamiętuje czas
+    return clock, now, steps
+
+def test_spozniony_timer_nie_spowalnia_czasu_symulacji():
+    clock, now, steps = make_clock()
+    for dt in (0.03, 0.05, 0.01, 0.11, 0.03):  # nierówne odstępy, razem 0.23 s
+        now.t += dt
+        clock.tick()
+
+    assert len(steps) == 7
+    assert clock.acc == pytest.approx(0.02)
+
+def test_nadrabianie_ograniczone_na_klatke():
+    clock, now, steps = make_clock(max_steps=5)
+    now.t += 3.0  # GUI zawieszone na 3 s
+    n = clock.tick()
+
+    assert n == 5
+    assert clock.dropped_s == pytest.approx(3.0 - 5 * 0.03 - clock.acc)
+    assert clock.acc < 0.03
+
+def test_mnoznik_i_pauza():
+    clock, now, steps = make_clock(speed=10.0)
+    now.t += 0.03
+    assert clock.tick() == 10
+
+    clock.set_speed(SPEED_PAUSE)
+    clock.tick()
+    now.t += 1.0
+    assert clock.tick() == 0
+
+def test_tryb_max_w_budzecie_klatki():
+    now = FakeTime()
+    def step():
+        now.t += 0.001
+    clock = SimClock(step, dt=0.03, speed=SPEED_MAX, max_budget_s=0.01, now=now)
+    clock.tick()
+    now.t += 0.03
+
+    assert clock.tick() == 10
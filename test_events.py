@@ -0,0 +1,49 @@
+import pytest
+from engine import MixingEngine, Inputs, relax
+from events import next_event, run_events
+from sweep import Scenario, run_scenario
+
+
+def test_relax_dokladny_dla_duzego_kroku():
+    # jeden krok 30 s == 1000 kroków po 0.03 s
+    T = 20.0
+    for _ in range(1000):
+        T = relax(T, 100.0, 0.03)
+
+    assert relax(20.0, 100.0, 30.0) == pytest.approx(T, abs=1e-9)
+
+@pytest.mark.parametrize("rates", [(1.0, 0.3, 0.2), (0.3, 0.5, 0.1), (1.0, 0.0, 0.2)])
+def test_zdarzenia_zgodne_z_drobnym_krokiem(rates):
+    inp = Inputs(*rates)
+    fast = MixingEngine()
+    n = run_events(fast, until=lambda e: e.mix_full_msg != "", inputs=inp)
+
+    ref = MixingEngine()
+    ref.run_until(condition=lambda e: e.mix_full_msg != "", dt=0.001, inputs=inp, max_steps=10**6)
+
+    assert n < 20
+    assert fast.t_sim == pytest.approx(ref.t_sim, abs=0.01)
+    for a, b in ((fast.cold, ref.cold), (fast.hot, ref.hot), (fast.mix, ref.mix)):
+        assert a.volume_l == pytest.approx(b.volume_l, abs=0.05)
+        assert a.temp_c == pytest.approx(b.temp_c, abs=0.01)
+
+def test_kondycjonowanie_jest_zdarzeniem():
+    eng = MixingEngine()
+    run_events(eng, until=lambda e: e.phase == "MIX", inputs=Inputs(pump_rate=1.0))
+
+    assert next_event(eng) == pytest.approx(10.0)
+    run_events(eng, max_events=1)
+    assert eng.cold_ready and eng.hot_ready
+
+def test_bez_przeplywow_skok_od_razu_do_konca():
+    eng = MixingEngine()
+    n = run_events(eng, t=7200.0, inputs=Inputs(running=False))
+
+    assert n == 1 and eng.t_sim == 7200.0
+    assert eng.big.volume_l == 200.0
+
+def test_sweep_w_trybie_zdarzeniowym():
+    tick = run_scenario(Scenario(1.0, 0.3, 0.2))
+    ev = run_scenario(Scenario(1.0, 0.3, 0.2, events=True))
+
+    assert ev["mix_temp_c"] == pytest.approx(tick["mix_temp_c"], abs=0.1)
@@ -0,0 +1,272 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QImage, QPixmap, QStaticText
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+
+
+@pytest.fixture
+def window(app):
+    from Projekt_mini_Scada import SymulacjaMieszania
+    w = SymulacjaMieszania()
+    w.worker.stop()   # kroki wykonujemy sami
+    w.show()
+    yield w
+    w.timer.stop()
+    w.close()
+
+
+def test_instalacja_odswieza_tylko_zmienione_elementy(window, monkeypatch):
+    page = window.page_install
+    page.sync()   # zapamiętane stany wszystkich elementów
+    rects = []
+    monkeypatch.setattr(page, "update", lambda *a: rects.append(a[0] if a else None))
+    page.sync()
+    assert rects == []                                 # nic się nie zmieniło – nic do przerysowania
+
+    pump = next(iter(window.pump_views.values()))
+    pump.set_active(not pump.active)
+    page.sync()
+    assert rects == [pump.bounds()]                    # tylko prostokąt pompy, nie cała strona
+
+def test_tlo_instalacji_tylko_po_zmianie_rozmiaru(window):
+    page = window.page_install
+    bg = page._background()
+    page.render(QPixmap(page.size()))
+    next(iter(window.pump_views.values())).set_active(False)
+    page.sync()
+    page.render(QPixmap(page.size()))
+    assert page._background() is bg
+
+    page.resize(page.width(), page.height() - 20)
+    assert page._bg is None and page._background() is not bg
+
+def test_podpis_zbiornika_bez_ponownego_ukladu(window):
+    class CountingText(QStaticText):
+        count = 0
+
+        def setText(self, text):
+            self.count += 1
+            super().setText(text)
+
+    page = window.page_install
+    view = next(iter(window.tank_views.values()))
+    view.label, view.label_text = CountingText(), None
+    page.render(QPixmap(page.size()))
+    page.render(QPixmap(page.size()))
+    assert view.label.count == 1                       # te same wartości – bez setText
+    view.model.volume_l += 10.0
+    page.render(QPixmap(page.size()))
+    assert view.label.count == 2
+
+
+def test_wiele_zadan_w_klatce_jedno_odswiezenie(app, window, monkeypatch):
+    syncs = []
+    monkeypatch.setattr(window.page_install, "sync", lambda: syncs.append(time.monotonic()))
+    window.render_hz = 20
+    window.last_flush = time.monotonic()               # klatka właśnie narysowana
+    for _ in range(5):
+        window.request_ui()
+    assert syncs == [] and window.ui_timer.isActive()
+    deadline = time.monotonic() + 2.0
+    while window.ui_timer.isActive() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    assert len(syncs) == 1
+
+def test_ukryta_strona_raportow_bez_odswiezania(window):
+    page = window.page(1)                              # zbudowana, ale niewidoczna
+    window.worker.step_now(10)
+    window.apply_snapshot(window.worker.latest())
+    window.flush_ui()
+    assert page.dirty and page.rep_lines == []
+    window.switch_page(1)                              # zaległe odświeżenie przy pokazaniu
+    assert not page.dirty and page.rep_lines
+
+def test_update_lines_podmienia_tylko_zmienione_linie(app):
+    from Projekt_mini_Scada import update_lines
+    edit = QtWidgets.QTextEdit()
+    lines = update_lines(edit, [], ["a: 1", "b: 2", "c: 3"])
+    changes = []
+    edit.document().contentsChange.connect(lambda pos, removed, added: changes.append((pos, removed, added)))
+
+    assert update_lines(edit, lines, list(lines)) == lines and changes == []
+    lines = update_lines(edit, lines, ["a: 1", "b: 20", "c: 3"])
+    assert edit.toPlainText() == "a: 1\nb: 20\nc: 3"
+    assert len(changes) == 1 and changes[0][0] == len("a: 1\n")   # tylko druga linia
+
+
+class CountingLock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def __enter__(self):
+        self.count += 1
+        return self.lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self.lock.__exit__(*exc)
+
+
+def test_trendy_jedna_blokada_na_klatke(window):
+    window.worker.step_now(300)
+    window.switch_page(2)
+    page = window.page_trends
+    window.worker.lock = lock = CountingLock()
+    page.render(QPixmap(page.size()))
+    assert lock.count == 1
+    assert page._cache_t1 is not None and "mix.temp_c" in page._cols
+
+
+
+class Wheel:
+    def __init__(self, dy):
+        self.dy = dy
+
+    def angleDelta(self):
+        return QPoint(0, self.dy)
+
+class Mouse:
+    def __init__(self, x):
+        self._x = x
+
+    def x(self):
+        return self._x
+
+def test_trendy_zoom_i_przesuwanie(window):
+    window.worker.step_now(3000)                       # 90 s historii
+    window.switch_page(2)
+    page = window.page_trends
+    t0, t1, px_s = page.view()
+    assert t1 - t0 == pytest.approx(60.0) and -1e-9 <= t1 - 90.0 <= px_s + 1e-9
+
+    page.wheelEvent(Wheel(120))                        # przybliżenie o krok 1.25
+    t0, t1, px_s = page.view()
+    assert t1 - t0 == pytest.approx(48.0) and -1e-9 <= t1 - 90.0 <= px_s + 1e-9
+    page.wheelEvent(Wheel(-240))
+    assert page.view()[1] - page.view()[0] == pytest.approx(75.0)
+
+    t0, t1, px_s = page.view()
+    page.mousePressEvent(Mouse(500))
+    page.mouseMoveEvent(Mouse(700))                    # w prawo = wstecz w czasie o 200 kolumn
+    assert page.t_end == pytest.approx(t1 - 200 * px_s)
+    h0, h1, _ = page.view()
+    assert h1 - h0 == pytest.approx(75.0) and -1e-9 <= h1 - page.t_end <= px_s + 1e-9
+    page.mouseMoveEvent(Mouse(100))                    # za ostatnią próbkę – z powrotem na żywo
+    assert page.t_end is None
+    page.mouseReleaseEvent(Mouse(100))
+    page.mousePressEvent(Mouse(500))
+    page.mouseMoveEvent(Mouse(600))
+    page.mouseDoubleClickEvent(Mouse(600))
+    assert page.t_end is None and page.view()[1] == pytest.approx(t1)
+
+def image_array(pm):
+    img = pm.toImage().convertToFormat(QImage.Format_ARGB32)
+    ptr = img.bits()
+    ptr.setsize(img.byteCount())
+    return np.frombuffer(ptr, np.uint8).reshape(img.height(), img.width(), 4).astype(int)
+
+def test_trendy_przyrostowo_jak_pelne_rysowanie(window):
+    window.worker.step_now(3000)
+    window.switch_page(2)
+    page = window.page_trends
+    page.render(QPixmap(page.size()))
+    window.worker.step_now(100)                        # 3 s – przewinięcie o kilkadziesiąt kolumn
+    page.render(QPixmap(page.size()))
+    inc_img = image_array(page._cache)
+    inc_cols = {tag: (lo.copy(), hi.copy()) for tag, (lo, hi) in page._cols.items()}
+
+    page._cache_t1 = None                              # wymuś pełne przerysowanie tego samego widoku
+    page.render(QPixmap(page.size()))
+    for tag, (lo, hi) in page._cols.items():
+        assert np.array_equal(lo, inc_cols[tag][0], equal_nan=True)
+        assert np.array_equal(hi, inc_cols[tag][1], equal_nan=True)
+    # piksele różnią się tylko wygładzaniem na lewej krawędzi i na szwie dorysowanych kolumn
+    diff = np.abs(image_array(page._cache) - inc_img).max(axis=2)
+    assert len(set(np.nonzero(diff)[1].tolist())) <= 4 and diff.max() <= 64
+
+
+def test_dziennik_alarmow_liczba_wierszy_pod_blokada(window):
+    from alarms import RAISE
+    model = window.page(1).journal_model
+    journal = window.alarms.journal
+    n = len(journal)
+    mid_append, finish = threading.Event(), threading.Event()
+
+    def writer():   # wątek symulacji: kolumny dopisywane po kolei pod blokadą porcji kroków
+        with window.worker.lock:
+            journal.t.append(1.0)
+            mid_append.set()
+            finish.wait(5.0)
+            journal.rule.append(0)
+            journal.kind.append(RAISE)
+            journal.value.append(80.0)
+
+    seen = []
+    threads = [threading.Thread(target=writer), threading.Thread(target=lambda: seen.append(model.journal_len()))]
+    threads[0].start()
+    mid_append.wait(5.0)
+    threads[1].start()
+    threads[1].join(0.1)
+    assert seen == []                                  # liczba wierszy czeka na koniec dopisywania
+    finish.set()
+    for th in threads:
+        th.join(5.0)
+    assert seen == [n + 1]
+    model.sync()
+    assert model.rows == n + 1 and "ALARM" in model.data(model.index(0))
+
+
+def plant_json(tmp_path, edit):
+    import json
+    from Projekt_mini_Scada import PLANT_PATH
+    with open(PLANT_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    edit(data)
+    path = tmp_path / "plant.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+def test_inna_konfiguracja_zgodna_z_silnikiem(app, tmp_path):
+    from Projekt_mini_Scada import SymulacjaMieszania
+
+    def edit(data):
+        data["tanks"].reverse()                       # inna kolejność i nazwy – ten sam silnik
+        data["tanks"][0]["name"] = "Mieszalnik B"
+    w = SymulacjaMieszania(plant_json(tmp_path, edit))
+    w.worker.stop()
+    w.worker.step_now(100)
+    assert w.apply_snapshot(w.worker.latest())
+    assert w.display_tanks["mix"].name == "Mieszalnik B"
+    assert w.display_tanks["cold"].volume_l == w.engine.cold.volume_l
+    w.timer.stop()
+    w.close()
+
+def test_konfiguracja_z_piatym_zbiornikiem_odrzucona(app, tmp_path):
+    from Projekt_mini_Scada import SymulacjaMieszania
+
+    def edit(data):
+        data["tanks"].append({"id": "buf", "name": "Bufor", "capacity_l": 50.0})
+        data["pumps"].append({"id": "buf", "from": "mix", "to": ["buf"], "rate": "hot_rate"})
+    with pytest.raises(ValueError, match="buf"):
+        SymulacjaMieszania(plant_json(tmp_path, edit))
+
+
+def test_blad_watku_symulacji_w_tytule(window):
+    window.worker.error = RuntimeError("zapis archiwum")
+    window.on_timer()
+    assert not window.timer.isActive()
+    assert window.page_install.title_str().startswith("SYMULACJA ZATRZYMANA: RuntimeError")
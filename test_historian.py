@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from engine import MixingEngine, Inputs
+from historian import Historian, ENGINE_TAGS
+
+
+def test_bufor_cykliczny_trzyma_ostatnie_probki_i_szuka_zakresu():
+    h = Historian(["a", "b"], capacity=100, tiers=())
+    for k in range(250):
+        h.record(k * 0.5, [k, -k])
+
+    assert len(h) == 100
+    assert h.time_span() == (75.0, 124.5)
+    t, v = h.query("b", 100.0, 101.0)
+    assert t.tolist() == [100.0, 100.5, 101.0]
+    assert v.tolist() == [-200.0, -201.0, -202.0]
+    assert h.query("a", 0.0, 10.0)[0].size == 0
+    assert h.latest("a") == 249.0
+
+def test_agregaty_zgodne_z_liczeniem_wprost():
+    h = Historian(["x"], capacity=10, tiers=((1.0, 100), (60.0, 10)))
+    rng = np.random.default_rng(0)
+    ts = np.cumsum(rng.uniform(0.01, 0.05, size=3000))
+    xs = rng.normal(size=3000)
+    for t, x in zip(ts, xs):
+        h.record(t, [x])
+
+    r = h.query_rollup("x", 10.0, 20.0, 1.0)
+    assert r["t"].tolist() == [float(s) for s in range(10, 21)]
+    for start, mn, mx, avg in zip(r["t"], r["min"], r["max"], r["avg"]):
+        sel = xs[(ts >= start) & (ts < start + 1.0)]
+        assert mn == pytest.approx(sel.min(), abs=1e-6)
+        assert mx == pytest.approx(sel.max(), abs=1e-6)
+        assert avg == pytest.approx(sel.mean(), abs=1e-6)
+
+    # bieżący minutowy kubełek jest niedomknięty, ale widoczny
+    r = h.query_rollup("x", 0.0, 1e9, 60.0)
+    assert r["avg"][-1] == pytest.approx(xs[ts >= r["t"][-1]].mean(), abs=1e-6)
+
+def test_budzet_pamieci_i_zmiana_z_silnika():
+    tags = [f"t{i}" for i in range(36)]
+    h = Historian.for_budget(tags, 200 * 1024 * 1024)
+    assert h.nbytes() <= 200 * 1024 * 1024
+    assert h.raw.cap >= 8 * 3600 * 33  # pełna zmiana przy 33 Hz
+
+    eng = MixingEngine()
+    hist = Historian.for_shift(shift_s=60.0)
+    for _ in range(100):
+        eng.step(inputs=Inputs(pump_rate=1.0))
+        hist.record_engine(eng)
+    t, v = hist.query("big.volume_l", 0.0, 10.0)
+    assert len(t) == 100 and np.all(np.diff(v) < 0)
+    assert set(ENGINE_TAGS) == set(hist.index)
+
+def test_obwiednia_dlugiego_okna_z_agregatow():
+    h = Historian(["x"], capacity=1000, tiers=((1.0, 100_000), (60.0, 10_000)))
+    for k in range(100_000):  # ~28 h co 1 s, surowy bufor trzyma tylko ostatnie 1000
+        h.record(float(k), [k % 100])
+
+    lo, hi = h.envelope("x", 0.0, 86400.0, 720)  # 120 s na piksel -> agregaty minutowe
+    assert lo.shape == (720,) and not np.isnan(lo).any()
+    assert lo.min() == 0.0 and hi.max() == 99.0
+
+    lo, hi = h.envelope("x", 99_900.0, 99_960.0, 60)  # 1 s na piksel -> surowe dane
+    assert lo.tolist() == [float((99_900 + i) % 100) for i in range(60)]
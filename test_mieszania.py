@@ -1,40 +1,49 @@
 import pytest
-from Projekt_mini_Scada import TankModel
+from engine import TankModel
+from tank_bank import TankBank
 
-def test_mieszanie_temperatury_50_50():
+
+#te same przypadki dla TankModel i dla pojedynczego zbiornika z TankBank
+@pytest.fixture(params=["TankModel", "TankBank"])
+def make_tank(request):
+    if request.param == "TankModel":
+        return TankModel
+    return lambda name, cap, vol, temp: TankBank([cap], [vol], [temp], names=[name]).view(0)
+
+def test_mieszanie_temperatury_50_50(make_tank):
     # 50 L o 20°C + 50 L o 80°C = 100 L o 50°C
-    tank = TankModel("mix", 200.0, 50.0, 20.0)
+    tank = make_tank("mix", 200.0, 50.0, 20.0)
     tank.add(50.0, 80.0)
 
     assert tank.volume_l == 100.0
     assert tank.temp_c == pytest.approx(50.0, abs=1e-6)
 
-def test_mieszanie_dolewka_mniejsza():
+def test_mieszanie_dolewka_mniejsza(make_tank):
     # 90 L o 20°C + 10 L o 100°C = 100 L o 28°C
     # T = (90*20 + 10*100)/100 = (1800 + 1000)/100 = 28
-    tank = TankModel("mix", 200.0, 90.0, 20.0)
+    tank = make_tank("mix", 200.0, 90.0, 20.0)
     tank.add(10.0, 100.0)
 
     assert tank.volume_l == 100.0
     assert tank.temp_c == pytest.approx(28.0, abs=1e-6)
 
-def test_mieszanie_przy_pustym_zbiorniku_ustawia_temperature():
+def test_mieszanie_przy_pustym_zbiorniku_ustawia_temperature(make_tank):
     # jeśli zbiornik był pusty -> temp = Tin
-    tank = TankModel("mix", 100.0, 0.0, 0.0)
+    tank = make_tank("mix", 100.0, 0.0, 0.0)
     tank.add(10.0, 37.0)
 
     assert tank.volume_l == 10.0
     assert tank.temp_c == pytest.approx(37.0, abs=1e-6)
 
-def test_dolewka_ponad_pojemnosc_nie_przekracza_capacity():
-    tank = TankModel("mix", 100.0, 95.0, 20.0)
+def test_dolewka_ponad_pojemnosc_nie_przekracza_capacity(make_tank):
+    tank = make_tank("mix", 100.0, 95.0, 20.0)
     added = tank.add(20.0, 80.0)
 
     assert added == pytest.approx(5.0, abs=1e-6)
     assert tank.volume_l == pytest.approx(100.0, abs=1e-6)
 
-def test_ujemne_i_zero_nie_zmieniaja_stanu():
-    tank = TankModel("mix", 100.0, 10.0, 20.0)
+def test_ujemne_i_zero_nie_zmieniaja_stanu(make_tank):
+    tank = make_tank("mix", 100.0, 10.0, 20.0)
 
     a1 = tank.add(0.0, 80.0)
     a2 = tank.add(-5.0, 80.0)
@@ -45,9 +54,9 @@ def test_ujemne_i_zero_nie_zmieniaja_stanu():
     assert tank.volume_l == 10.0
     assert tank.temp_c == 20.0
 
-def test_is_empty_i_is_full():
-    empty = TankModel("empty", 100.0, 0.0, 20.0)
-    full = TankModel("full", 100.0, 100.0, 20.0)
+def test_is_empty_i_is_full(make_tank):
+    empty = make_tank("empty", 100.0, 0.0, 20.0)
+    full = make_tank("full", 100.0, 100.0, 20.0)
 
     assert empty.is_empty() is True
     assert empty.is_full() is False
@@ -57,3 +66,38 @@ def test_is_empty_i_is_full():
 
 
 
+
+def test_zbiornik_trzyma_energie_i_temperature_po_oproznieniu():
+    tank = TankModel("mix", 100.0, 40.0, 30.0)
+    assert not hasattr(tank, "__dict__")
+    tank.add(10.0, 80.0)
+    assert tank.energy_lc == pytest.approx(40.0 * 30.0 + 10.0 * 80.0)
+
+    tank.remove(25.0)
+    assert tank.temp_c == pytest.approx(40.0)
+    tank.remove(100.0)                # opróżniony – temperatura ostatniej wody zostaje
+    assert tank.volume_l == 0.0 and tank.temp_c == pytest.approx(40.0)
+
+    tank.volume_l, tank.temp_c = 60.0, 15.0   # objętość, potem temperatura
+    assert tank.energy_lc == pytest.approx(900.0)
+
+    copy = TankModel("kopia", 100.0, 0.0, 0.0)
+    copy.set_state(*tank.state())
+    assert copy.state() == tank.state()
+
+def test_przypisanie_objetosci_zachowuje_temperature(make_tank):
+    tank = make_tank("cold", 100.0, 50.0, 20.0)
+    tank.volume_l = 100.0             # jak dawny @dataclass: temperatura bez zmian
+    assert tank.temp_c == pytest.approx(20.0)
+    empty = make_tank("mix", 100.0, 0.0, 35.0)
+    empty.volume_l = 50.0             # pusty zbiornik zachowuje ostatnią temperaturę
+    assert empty.temp_c == pytest.approx(35.0)
+
+def test_porownanie_zbiornikow():
+    tank = TankModel("cold", 100.0, 50.0, 20.0)
+    tank.volume_l = 100.0
+    assert tank.energy_lc == pytest.approx(2000.0)
+    assert tank == TankModel("cold", 100.0, 100.0, 20.0)
+    assert tank != TankModel("cold", 100.0, 100.0, 21.0)
+    with pytest.raises(TypeError):
+        hash(tank)
@@ -0,0 +1,84 @@
+import asyncio
+import struct
+import time
+
+import pytest
+from engine import MixingEngine
+from tags import TagDB, register_engine, write_engine
+from modbus_server import (ModbusServer, ModbusClient, FC_READ_INPUT, FC_WRITE_SINGLE, FC_WRITE_MULTIPLE,
+                           ILLEGAL_ADDRESS, ILLEGAL_VALUE, GATEWAY_TARGET_FAILED, INPUT_REGISTERS,
+                           HOLDING_REGISTERS)
+
+
+@pytest.fixture
+def server():
+    eng = MixingEngine()
+    db = register_engine(TagDB(), eng)
+    srv = ModbusServer(db, port=0).start()
+    yield srv, eng, db
+    srv.stop()
+
+def test_odczyt_wielu_rejestrow_i_zapis_nastaw(server):
+    srv, eng, db = server
+    eng.run_until(t=3.0)
+    write_engine(db, eng, eng.t_sim)
+    db.publish(eng.t_sim)
+
+    async def session():
+        c = await ModbusClient(port=srv.port).connect()
+        values = await c.read_floats(0, len(INPUT_REGISTERS))
+        await c.write_floats(2, [0.4, 0.2])   # sp.cold_rate, sp.hot_rate (adresy 2-5)
+        hold = await c.read_floats(0, len(HOLDING_REGISTERS), holding=True)
+        await c.close()
+        return values, hold
+
+    values, hold = asyncio.run(session())
+    i = INPUT_REGISTERS.index("cold.volume_l")
+    assert values[i] == pytest.approx(eng.cold.volume_l, rel=1e-6)
+    assert hold[1:3] == pytest.approx([0.4, 0.2])
+    assert srv.drain_writes() == pytest.approx({HOLDING_REGISTERS[1]: 0.4, HOLDING_REGISTERS[2]: 0.2})
+    assert srv.drain_writes() == {}
+
+def test_bledy_protokolu(server):
+    srv, _, _ = server
+    n = len(INPUT_REGISTERS) * 2
+    assert srv.handle_pdu(struct.pack(">BHH", FC_READ_INPUT, n - 1, 2)) == bytes((FC_READ_INPUT | 0x80, ILLEGAL_ADDRESS))
+    assert srv.handle_pdu(struct.pack(">BHH", FC_WRITE_SINGLE, 0, 1))[0] == FC_WRITE_SINGLE | 0x80
+    assert srv.handle_pdu(b"\x2b")[1] == 0x01
+
+def test_zapis_nan_odrzucony_a_poza_zakresem_przyciety(server):
+    srv, _, _ = server
+
+    def fc16(*values):
+        raw = struct.pack(f">{len(values)}f", *values)
+        return srv.handle_pdu(struct.pack(">BHHB", FC_WRITE_MULTIPLE, 0, 2 * len(values), len(raw)) + raw)
+
+    for bad in (float("nan"), float("inf"), float("-inf")):
+        assert fc16(0.5, bad) == bytes((FC_WRITE_MULTIPLE | 0x80, ILLEGAL_VALUE))
+    assert srv.drain_writes() == {}
+    assert fc16(1e30, -3.0)[0] == FC_WRITE_MULTIPLE
+    assert srv.drain_writes() == {"sp.pump_rate": 1.0, "sp.cold_rate": 0.0}
+    assert srv.holding.get("sp.pump_rate") == 1.0
+
+def test_zla_ramka_zamyka_polaczenie_a_obcy_unit_dostaje_wyjatek(server):
+    srv, _, _ = server
+
+    async def session():
+        out = []
+        for length in (0, 1, 300):
+            r, w = await asyncio.open_connection("127.0.0.1", srv.port)
+            w.write(struct.pack(">HHHB", 1, 0, length, 1) + b"\x04")
+            out.append(await r.read())   # serwer zamyka bez odpowiedzi
+            w.close()
+        c = ModbusClient(port=srv.port, unit_id=7)
+        await c.connect()
+        with pytest.raises(IOError, match=f"wyjątek Modbus {GATEWAY_TARGET_FAILED}"):
+            await c.read_floats(0, 1)
+        await c.close()
+        return out
+
+    assert asyncio.run(session()) == [b"", b"", b""]
+    deadline = time.monotonic() + 2.0   # rozłączenie ostatniego klienta obsługuje wątek serwera
+    while srv.clients and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert srv.clients == 0
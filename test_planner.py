@@ -0,0 +1,80 @@
+import pytest
+from engine import MixingEngine, Inputs
+from planner import MixPlanner, MixState, AutoMix, simulate_final, RATE_MAX
+from replay import replay
+from sim_worker import SimWorker
+
+
+def filled() -> MixingEngine:
+    eng = MixingEngine()
+    eng.run_until(condition=lambda e: e.phase == "MIX", inputs=Inputs(1.0, 0.0, 0.0), max_steps=100_000)
+    return eng
+
+def test_symulacja_wektorowa_jak_silnik():
+    state = MixState.from_engine(filled())
+    pairs = [(0.3, 0.2), (0.5, 0.1), (0.05, 0.5), (0.0, 0.0)]
+    temp, ticks, full = simulate_final(state, [c for c, _ in pairs], [h for _, h in pairs])
+    for k, (c, h) in enumerate(pairs[:3]):
+        eng = filled()
+        eng.inputs = Inputs(1.0, c, h)
+        n = eng.run_until(condition=lambda e: e.mix.is_full(), max_steps=100_000)
+        assert temp[k] == eng.mix.temp_c and ticks[k] == n and full[k]
+    assert not full[3]  # zerowe szybkości – mieszalnik nigdy pełny
+
+@pytest.mark.parametrize("target", [10.0, 35.0, 60.0, 80.0])
+def test_plan_trafia_w_cel_najszybciej(target):
+    planner = MixPlanner()
+    plan = planner.plan(target, filled())
+    assert plan.reachable
+    assert max(plan.cold_rate, plan.hot_rate) == pytest.approx(RATE_MAX)
+
+    eng = filled()
+    eng.inputs = Inputs(1.0, plan.cold_rate, plan.hot_rate)
+    eng.run_until(condition=lambda e: e.mix.is_full(), max_steps=100_000)
+    assert eng.mix.temp_c == pytest.approx(target, abs=0.2)
+
+def test_cel_poza_zasiegiem_i_pamiec_podreczna():
+    planner = MixPlanner()
+    state = MixState.from_engine(filled())
+    plan = planner.plan(99.0, state)
+    assert not plan.reachable
+    assert (plan.cold_rate, plan.hot_rate) == (0.0, RATE_MAX)
+    assert plan.final_temp_c < 99.0
+
+    planner.plan(40.0, state)
+    planner.plan(40.0, MixState(*state.key()))
+    assert (planner.misses, planner.hits) == (1, 2)
+
+def test_automatyka_w_watku_symulacji(tmp_path):
+    worker = SimWorker()
+    worker.record(tmp_path / "auto.mslog")
+    worker.set_inputs(Inputs(1.0, 0.0, 0.0))
+    worker.set_controller(AutoMix(MixPlanner(), 47.0))
+    worker.step_now(2500)
+    worker.stop()
+    snap = worker.latest()
+    assert snap.value("mix.volume_l") >= 99.9
+    assert snap.value("mix.temp_c") == pytest.approx(47.0, abs=0.1)
+    # nastawy regulatora są w zapisie – odtwarzanie bez regulatora daje ten sam przebieg
+    assert replay(tmp_path / "auto.mslog").ok
+
+def test_automatyka_w_tle_nie_blokuje_kroku():
+    eng = filled()
+    auto = AutoMix(MixPlanner(), 47.0, background=True)
+    before = eng.inputs
+    assert auto(eng) is None and auto.pending is not None   # tablica liczona w wątku planera
+    eng.step()
+    assert eng.inputs == before                              # do czasu wyniku – poprzednie nastawy
+    auto.pending.result(timeout=30)
+    inp = auto(eng)
+    assert inp is not None and (inp.cold_rate, inp.hot_rate) == (auto.plan.cold_rate, auto.plan.hot_rate)
+
+    # dalej: plan z pamięci od razu, nowy stan w tle; napełnienie do celu jak bez tła
+    while not eng.mix.is_full():
+        inp = auto(eng)
+        if inp is not None:
+            eng.inputs = inp
+        if auto.pending is not None:
+            auto.pending.result(timeout=30)
+        eng.step()
+    assert eng.mix.temp_c == pytest.approx(47.0, abs=0.2)
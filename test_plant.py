@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+from engine import MixingEngine, Inputs
+from plant import Plant, load_plant, parse_plant, layout
+
+PLANT_JSON = Path(__file__).with_name("plant.json")
+
+
+def tank(tid, cap=100.0, vol=0.0, temp=20.0):
+    return {"id": tid, "name": tid, "capacity_l": cap, "volume_l": vol, "temp_c": temp}
+
+def test_domyslna_instalacja_jak_silnik():
+    plant = Plant(load_plant(PLANT_JSON))
+    plant.set_rates(pump_rate=1.0, cold_rate=0.3, hot_rate=0.2)
+    eng = MixingEngine()
+    eng.inputs = Inputs(1.0, 0.3, 0.2)
+    for _ in range(4000):
+        plant.step()
+        eng.step()
+        assert plant.phase == eng.phase
+        assert plant.pump_on.tolist() == [eng.pump_split_on, eng.pump_cold_on, eng.pump_hot_on]
+
+    for tid in ("big", "cold", "hot", "mix"):
+        ref = getattr(eng, tid)
+        assert plant.tank(tid).volume_l == pytest.approx(ref.volume_l, abs=1e-9)
+        assert plant.tank(tid).temp_c == pytest.approx(ref.temp_c, abs=1e-9)
+    assert plant.done and eng.mix_full_msg
+
+    # rozdzielacz pracuje przez całą fazę FILL, także bez przepływu (jak pump_split_on)
+    plant.reset()
+    plant.set_rates(pump_rate=0.0)
+    plant.step()
+    assert plant.pump_on.tolist() == [True, False, False] and not plant.pipe_flow.any()
+
+def test_rozdzielacz_i_wspolne_zrodlo():
+    cfg = parse_plant({
+        "tanks": [tank("a", vol=1.0), tank("b", cap=0.3), tank("c"), tank("d")],
+        "pumps": [
+            {"id": "p", "from": "a", "to": ["b", "c"], "rate": "r"},
+            {"id": "q", "from": "a", "to": ["d"], "rate": "r"},
+        ],
+    })
+    plant = Plant(cfg)
+    plant.set_rates(r=0.4)
+    plant.step()
+    vol = {t: plant.tank(t).volume_l for t in "abcd"}
+    assert vol == pytest.approx({"a": 0.2, "b": 0.2, "c": 0.2, "d": 0.4})
+    plant.step()
+    # b pełny (0.3 - 0.1) – całość rozdzielacza do c; dwie pompy dzielą resztę z a po równo
+    vol = {t: plant.tank(t).volume_l for t in "abcd"}
+    assert vol == pytest.approx({"a": 0.0, "b": 0.2, "c": 0.3, "d": 0.5})
+    assert [bool(f) for f in plant.pipe_flow] == [True, False, True, True]
+
+def test_cykl_i_nieznany_zbiornik():
+    with pytest.raises(ValueError, match="cykl"):
+        parse_plant({"tanks": [tank("a"), tank("b")],
+                     "pumps": [{"id": "p", "from": "a", "to": ["b"], "rate": "r"},
+                               {"id": "q", "from": "b", "to": ["a"], "rate": "r"}]})
+    with pytest.raises(ValueError, match="nieznany zbiornik"):
+        parse_plant({"tanks": [tank("a")], "pumps": [{"id": "p", "from": "a", "to": ["x"], "rate": "r"}]})
+
+def test_uklad_kolumnami_wg_poziomow():
+    cfg = load_plant(PLANT_JSON)
+    lay = layout(cfg)
+    x = {tid: r[0] for tid, r in lay.tanks.items()}
+    assert x["big"] < x["cold"] == x["hot"] < x["mix"]
+    assert set(lay.pipes) == set(cfg.pipe_ids())
+    # rura kończy się na lewej krawędzi odbiornika
+    assert lay.pipes["cold_to_mix"][-1][0] == x["mix"]
+
+def test_dlugi_lancuch_w_jednym_przebiegu():
+    n = 300
+    cfg = parse_plant({
+        "tanks": [tank(f"t{i}", vol=100.0 if i == 0 else 0.0) for i in range(n)],
+        "pumps": [{"id": f"p{i}", "from": f"t{i}", "to": [f"t{i + 1}"], "rate": "r"} for i in range(n - 1)],
+    })
+    plant = Plant(cfg)
+    plant.set_rates(r=1.0)
+    plant.run_until(max_steps=50)
+    # poziomy liczone po kolei w jednym ticku – dopływ z góry odpływa dalej w tym samym ticku
+    assert plant.tank("t0").volume_l == pytest.approx(50.0)
+    assert plant.tank(f"t{n - 1}").volume_l == pytest.approx(50.0)
+    assert plant.bank.volume_l.sum() == pytest.approx(100.0)
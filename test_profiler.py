@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from engine import MixingEngine
+from profiler import Histogram, Profiler
+
+
+def test_percentyle_i_spoznienia():
+    h = Histogram(deadline_s=0.03)
+    for _ in range(98):
+        h.add(0.001)
+    h.add(0.02)
+    h.add(0.05)
+    s = h.stats()
+    assert s["count"] == 100 and s["missed"] == 1
+    assert s["p50_s"] == pytest.approx(0.001, rel=0.05)
+    assert s["p99_s"] == pytest.approx(0.02, rel=0.05)
+    assert s["max_s"] == 0.05
+
+def test_wylaczony_nie_zostawia_sladu():
+    eng = MixingEngine()
+    prof = Profiler()
+    prof.hook(eng, "step", "physics", deadline_s=1.0)
+    assert "step" not in vars(eng)
+
+    prof.enable()
+    for _ in range(10):
+        eng.step()
+    prof.disable()
+    eng.step()
+
+    assert "step" not in vars(eng)  # znów metoda klasy, bez opakowania
+    assert prof.stats()["physics"]["count"] == 10
+    assert eng.t_sim == pytest.approx(11 * 0.03)
+
+def test_atrybut_instancji_przywracany(tmp_path):
+    calls = []
+
+    class Holder:
+        pass
+
+    obj = Holder()
+    obj.fn = calls.append
+    original = obj.fn
+    prof = Profiler()
+    prof.enable()
+    prof.hook(obj, "fn", "fn")
+    obj.fn(1)
+    prof.disable()
+    assert obj.fn == original and calls == [1]
+
+    assert prof.dump_trace(tmp_path / "trace.json") == 1
+    data = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    ev = data["traceEvents"][0]
+    assert ev["name"] == "fn" and ev["ph"] == "X" and ev["dur"] >= 0
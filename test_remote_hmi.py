@@ -0,0 +1,110 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+from engine import MixingEngine, Inputs
+from tags import TagDB, register_engine, write_engine
+from remote_hmi import RemoteHMI, HMIClient, ws_accept
+
+
+@pytest.fixture
+def hmi():
+    eng = MixingEngine()
+    eng.inputs = Inputs(1.0, 0.2, 0.3)
+    db = register_engine(TagDB(), eng)
+    srv = RemoteHMI(db, port=0, frame_hz=50.0, extras=lambda: {"report": eng.report_lines()}).start()
+    yield srv, eng, db
+    srv.stop()
+
+def test_klucz_websocket():
+    # przykład z RFC 6455
+    assert ws_accept("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+def test_migawka_potem_tylko_zmiany(hmi):
+    srv, eng, db = hmi
+
+    async def session():
+        c = await HMIClient(port=srv.port).connect()
+        first = await c.recv()
+        eng.step()
+        write_engine(db, eng, eng.t_sim)
+        db.publish(eng.t_sim)
+        delta = await asyncio.wait_for(c.recv(), 5.0)
+        await c.close()
+        return first, delta, c.state
+
+    first, delta, state = asyncio.run(session())
+    assert first["type"] == "snapshot" and "mix.temp_c" in first["state"]
+    assert delta["type"] == "delta" and delta["seq"] > first["seq"]
+    assert "big.volume_l" in delta["tags"]
+    assert "cold_heat_t" not in delta["tags"]   # niezmienione tagi nie są wysyłane
+    assert state["big.volume_l"] == pytest.approx(eng.big.volume_l, abs=1e-3)
+    assert state["report"] == eng.report_lines()
+
+def test_strona_i_migawka_http(hmi):
+    srv, eng, _ = hmi
+    base = f"http://127.0.0.1:{srv.port}"
+    page = urllib.request.urlopen(base + "/", timeout=5).read().decode("utf-8")
+    assert "new WebSocket" in page
+    snap = json.loads(urllib.request.urlopen(base + "/snapshot", timeout=5).read())
+    assert snap["state"]["big.volume_l"] == pytest.approx(eng.big.volume_l)
+
+
+class FakeTransport:
+    def __init__(self):
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+
+class FakeWriter:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.sent = []
+
+    def write(self, data):
+        self.sent.append(data)
+
+
+def test_wolny_widz_nie_dostaje_kolejki_tylko_migawke():
+    from remote_hmi import _Viewer
+    db = register_engine(TagDB(), MixingEngine())
+    srv = RemoteHMI(db, port=0, high_water=1000, low_water=100)
+    fast, slow = _Viewer(FakeWriter()), _Viewer(FakeWriter())
+    fast.stale = slow.stale = False
+    srv.viewers = {fast, slow}
+
+    slow.writer.transport.buffered = 5000
+    for k in range(5):
+        db.write("big.volume_l", 100.0 + k, k)
+        db.publish(k)
+        srv.broadcast(b"delta")
+    assert len(fast.writer.sent) == 5
+    assert slow.writer.sent == [] and slow.stale and slow.skipped == 5
+
+    slow.writer.transport.buffered = 0   # bufor opróżniony – świeża migawka zamiast zaległych delt
+    srv.take_delta()
+    srv.broadcast(None)
+    assert slow.writer.sent == [srv.snapshot_frame()] and not slow.stale
+    assert b"104" in slow.writer.sent[0]
+
+def test_wielu_widzow(hmi):
+    srv, eng, db = hmi
+
+    async def session():
+        clients = [await HMIClient(port=srv.port).connect() for _ in range(200)]
+        for c in clients:
+            await c.recv()
+        eng.step()
+        write_engine(db, eng, eng.t_sim)
+        db.publish(eng.t_sim)
+        msgs = await asyncio.wait_for(asyncio.gather(*(c.recv() for c in clients)), 10.0)
+        for c in clients:
+            await c.close()
+        return msgs
+
+    msgs = asyncio.run(session())
+    assert len(msgs) == 200 and all(m["type"] == "delta" for m in msgs)
+    assert len({m["seq"] for m in msgs}) == 1   # ta sama zakodowana klatka dla wszystkich
@@ -0,0 +1,54 @@
+import engine
+from engine import Inputs
+from sim_worker import SimWorker
+from replay import read_log, replay, K_INPUTS, K_RESET
+
+
+def record_session(path):
+    worker = SimWorker()
+    worker.record(path)
+    worker.set_inputs(Inputs(1.0, 0.0, 0.0))
+    worker.step_now(700)                      # napełnianie, przejście do MIX
+    worker.set_inputs(Inputs(1.0, 0.3, 0.1))
+    worker.step_now(800)
+    worker.set_inputs(Inputs(1.0, 0.3, 0.1, running=False))
+    worker.step_now(37)
+    worker.reset()
+    worker.set_inputs(Inputs(0.7, 0.2, 0.4))
+    worker.step_now(250)
+    worker.stop()
+    return worker
+
+def test_odtworzenie_zgodne_co_do_bitu(tmp_path):
+    path = tmp_path / "sesja.mslog"
+    record_session(path)
+
+    log = read_log(path)
+    kinds = [(tick, kind) for tick, kind, _ in log.events if kind in (K_INPUTS, K_RESET)]
+    assert kinds == [(0, K_INPUTS), (0, K_INPUTS), (700, K_INPUTS), (1500, K_INPUTS),
+                     (1537, K_RESET), (1537, K_INPUTS)]
+    assert log.end_tick == 1787
+    assert path.stat().st_size < 600          # nagłówek ze stanem, nastawy, skróty co 100 ticków
+
+    res = replay(path)
+    assert res.ok and res.complete
+    assert res.ticks == 1787 and res.checkpoints == 18
+
+def test_zmiana_fizyki_wskazuje_pierwszy_rozjazd(tmp_path, monkeypatch):
+    path = tmp_path / "sesja.mslog"
+    record_session(path)
+    monkeypatch.setattr(engine, "HOT_TARGET_C", 95.0)
+    res = replay(path)
+    assert not res.ok
+    # grzanie zaczyna się w pierwszym ticku z wodą w zbiorniku – rozjazd na pierwszym punkcie
+    assert res.mismatch_tick == 100
+
+def test_nagranie_przerwane(tmp_path):
+    path = tmp_path / "sesja.mslog"
+    worker = SimWorker()
+    worker.record(path)
+    worker.step_now(250)
+    worker.recorder._f.close()                # awaria: brak rekordu END
+    res = replay(path)
+    assert res.ok and not res.complete
+    assert res.ticks == 200 and res.checkpoints == 2
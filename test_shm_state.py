@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import struct
+
+import pytest
+from engine import MixingEngine, Inputs
+import shm_state
+from shm_state import ShmPublisher, ShmReader, FIELDS, SEQ_OFFSET
+
+
+@pytest.fixture
+def name():
+    return f"test_shm_{os.getpid()}"
+
+def test_odczyt_stanu_silnika(name):
+    eng = MixingEngine()
+    eng.inputs = Inputs(1.0, 0.2, 0.3)
+    pub = ShmPublisher(name)
+    reader = ShmReader(name)
+    assert reader.read().step == 0
+
+    eng.run_until(t=5.0)
+    pub.publish(eng, 5.0)
+    s = reader.read()
+    assert s.step == 1 and s.seq == 2 and s.t == 5.0
+    assert s.tank("hot") == (eng.hot.volume_l, eng.hot.temp_c)   # co do bitu
+    assert s.value("sp.cold_rate") == 0.2 and s.value("sp.running") is True
+    assert s.value("pump_split") == eng.pump_split_on
+    assert len(s.values) == len(FIELDS)
+    assert reader.wait(s.seq, timeout=0.01) is None
+    reader.close()
+    pub.close()
+
+def test_zapis_w_toku_i_ponowne_przejecie(name):
+    pub = ShmPublisher(name)
+    reader = ShmReader(name)
+    struct.pack_into("<Q", pub.buf, SEQ_OFFSET, 7)   # pisarz przerwany w połowie zapisu
+    with pytest.raises(IOError):
+        reader.read(retries=200)
+    assert reader.retries == 200
+    pub.close(unlink=False)
+
+    pub = ShmPublisher(name)   # nowa sesja przejmuje blok, licznik dalej rośnie
+    assert reader.read().seq == 8
+    reader.close()
+    pub.close()
+
+def test_licznik_wyrownany_i_tylko_x86(name, monkeypatch):
+    pub = ShmPublisher(name)
+    assert pub._seqv.format == "Q" and pub._seqv.nbytes == 8 and SEQ_OFFSET % 8 == 0
+    pub.publish(MixingEngine(), 0.03)
+    assert struct.unpack_from("<Q", pub.buf, SEQ_OFFSET)[0] == pub.seq == 2
+    pub.close()
+
+    monkeypatch.setattr(shm_state, "X86", False)   # np. ARM – bez barier migawka nie byłaby spójna
+    with pytest.raises(RuntimeError, match="x86"):
+        ShmPublisher(name)
+
+
+def _hammer(name, n):
+    # wszystkie zbiorniki z tą samą wartością – rozdarty odczyt miałby różne
+    eng = MixingEngine()
+    pub = ShmPublisher(name)
+    for k in range(1, n + 1):
+        for tank in (eng.big, eng.cold, eng.hot, eng.mix):
+            tank.volume_l = float(k)
+            tank.temp_c = float(k)
+        pub.publish(eng, float(k))
+    pub.close(unlink=False)
+
+def test_spojne_migawki_z_innego_procesu(name):
+    pub = ShmPublisher(name)
+    proc = multiprocessing.get_context("fork").Process(target=_hammer, args=(name, 100_000))
+    proc.start()
+    reader = ShmReader(name)
+    last = reads = 0
+    while proc.is_alive():
+        s = reader.read()
+        assert s.step == 0 or len(set(s.values[:8]) | {s.t}) == 1
+        assert s.step >= last
+        last = s.step
+        reads += 1
+    proc.join()
+    assert reader.read().step == 100_000 and reads > 100
+    reader.close()
+    pub.close()
@@ -0,0 +1,46 @@
+import pytest
+from engine import MixingEngine, Inputs, TICK_S, main
+
+
+def test_faza_fill_przechodzi_w_mix():
+    eng = MixingEngine()
+    eng.run_until(condition=lambda e: e.phase == "MIX", inputs=Inputs(pump_rate=1.0), max_steps=10_000)
+
+    assert eng.phase == "MIX"
+    assert eng.cold.is_full() and eng.hot.is_full()
+    assert eng.big.volume_l == pytest.approx(0.0, abs=1e-6)
+
+def test_run_until_trafia_dokladnie_w_czas():
+    eng = MixingEngine()
+    eng.run_until(t=1.0, dt=0.07)
+
+    assert eng.t_sim == pytest.approx(1.0, abs=1e-9)
+
+def test_mieszalnik_napelnia_sie_bez_gui():
+    eng = MixingEngine()
+    eng.run_until(t=3600.0, condition=lambda e: e.mix.is_full(),
+                  inputs=Inputs(pump_rate=1.0, cold_rate=0.2, hot_rate=0.2))
+
+    assert eng.mix.is_full()
+    assert eng.mix_full_msg == ""  # komunikat pojawia się w kolejnym kroku
+    eng.step()
+    assert "mieszalnik pełny" in eng.mix_full_msg
+    assert 40.0 < eng.mix.temp_c < 60.0
+
+def test_stop_zatrzymuje_przeplyw():
+    eng = MixingEngine()
+    eng.step(TICK_S, Inputs(running=False))
+
+    assert eng.big.volume_l == 200.0
+    assert not eng.pump_split_on and not eng.flow_big_to_pump
+
+def test_run_until_bez_warunku_rzuca_blad():
+    with pytest.raises(ValueError):
+        MixingEngine().run_until()
+
+def test_cli_wypisuje_stan_koncowy(capsys):
+    assert main(["--pump", "1.0", "--until", "60"]) == 0
+    out = capsys.readouterr().out
+
+    assert "Faza: MIX" in out
+    assert "Mieszalnik:" in out
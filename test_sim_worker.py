@@ -0,0 +1,66 @@
+import dataclasses
+import time
+
+import pytest
+from engine import Inputs
+from sim_worker import SimWorker
+from clock import SPEED_MAX
+
+
+def test_migawka_niezmienna_i_numerowana():
+    worker = SimWorker()
+    first = worker.latest()
+    worker.step_now(10)
+    snap = worker.latest()
+
+    assert snap.seq == first.seq + 1 and snap.steps == 10
+    assert snap.t == pytest.approx(0.3)
+    assert first.value("big.volume_l") == 200.0  # stara migawka bez zmian
+    assert snap.value("big.volume_l") < 200.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snap.t = 0.0
+
+def test_polecenia_wykonywane_w_watku_przed_krokiem():
+    ticks = []
+    worker = SimWorker(on_tick=ticks.append)
+    worker.set_inputs(Inputs(1.0, 0.2, 0.2, running=False))
+    worker.step_now(5)
+    assert worker.latest().value("sp.running") is False
+    assert worker.latest().value("big.volume_l") == 200.0
+
+    worker.set_inputs(Inputs(1.0, 0.2, 0.2))
+    worker.step_now(5)
+    worker.reset()
+    worker.step_now(1)
+    snap = worker.latest()
+    # czas instalacji ciągły po RESET, silnik od zera
+    assert snap.t == pytest.approx(11 * 0.03)
+    assert snap.value("big.volume_l") == pytest.approx(200.0 - 1.0)  # nastawy zostają po RESET
+    assert ticks == pytest.approx([i * 0.03 for i in range(1, 12)])
+
+def test_watek_liczy_gdy_glowny_zajety():
+    worker = SimWorker(speed=SPEED_MAX).start()
+    try:
+        time.sleep(0.2)  # "GUI" zajęte – nie odbiera migawek
+        snap = worker.latest()
+    finally:
+        worker.stop()
+    assert not worker.running
+    assert snap.steps > 100
+    assert snap.value("big.volume_l") < 200.0
+
+def test_wyjatek_w_on_tick_zatrzymuje_watek_z_bledem(tmp_path, capsys):
+    def on_tick(t):
+        if t > 0.3:
+            raise OSError("dysk pełny")
+
+    worker = SimWorker(on_tick=on_tick, speed=SPEED_MAX)
+    worker.record(tmp_path / "sesja.mslog")
+    worker.start()
+    deadline = time.monotonic() + 5.0
+    while worker.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not worker.running
+    assert isinstance(worker.error, OSError) and worker.recorder is None
+    assert "dysk pełny" in capsys.readouterr().err
+    worker.stop()
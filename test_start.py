@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+HERE = Path(__file__).parent
+
+#rdzeń bez Qt i bez NumPy – to importuje każdy proces roboczy (odtwarzanie, symulacja w wątku)
+CORE = ["engine", "clock", "tags", "alarms", "checkpoint", "replay", "sim_worker", "events"]
+#narzędzia bez GUI (NumPy dozwolony)
+HEADLESS = ["tank_bank", "plant", "historian", "archive", "planner", "thermal", "sweep", "profiler", "modbus_server",
+            "remote_hmi", "shm_state"]
+IMPORT_BUDGET_S = 0.15
+
+
+def import_in_fresh_process(modules):
+    code = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        f"for m in {modules!r}: __import__(m)\n"
+        "dt = time.perf_counter() - t\n"
+        "import json\n"
+        "print(json.dumps({'dt': dt, 'modules': sorted(sys.modules)}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+def test_rdzen_bez_qt_i_numpy_w_budzecie():
+    #najlepszy z trzech pomiarów – pojedynczy start procesu bywa zaszumiony
+    runs = [import_in_fresh_process(CORE) for _ in range(3)]
+    loaded = runs[0]["modules"]
+    assert not [m for m in loaded if m.startswith("PyQt5")]
+    assert "numpy" not in loaded
+    assert "concurrent.futures.process" not in loaded
+    assert min(r["dt"] for r in runs) < IMPORT_BUDGET_S
+
+@pytest.mark.parametrize("module", HEADLESS)
+def test_narzedzia_bez_qt(module):
+    loaded = import_in_fresh_process([module])["modules"]
+    assert not [m for m in loaded if m.startswith("PyQt5")]
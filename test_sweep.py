@@ -0,0 +1,54 @@
+import pytest
+from sweep import Scenario, grid, random_scenarios, run_scenario, run_sweep
+
+
+def test_przeglad_rownolegly_daje_te_same_wyniki_co_szeregowy():
+    scen = list(grid([1.0], [0.1, 0.3], [0.2, 0.4]))
+    serial = sorted(run_sweep(scen, workers=1), key=lambda r: r["idx"])
+    parallel = sorted(run_sweep(scen, workers=2, chunk_size=1), key=lambda r: r["idx"])
+
+    assert parallel == serial
+    assert [r["idx"] for r in serial] == [0, 1, 2, 3]
+
+def test_wiecej_goracej_daje_cieplejszy_mieszalnik():
+    zimno = run_scenario(Scenario(1.0, 0.4, 0.1))
+    cieplo = run_scenario(Scenario(1.0, 0.1, 0.4))
+
+    assert zimno["time_to_full_s"] is not None and cieplo["time_to_full_s"] is not None
+    assert cieplo["mix_temp_c"] > zimno["mix_temp_c"]
+
+def test_zerowe_szybkosci_koncza_sie_bez_czekania_do_t_max():
+    r = run_scenario(Scenario(1.0, 0.0, 0.0, t_max=3600.0))
+
+    assert r["time_to_full_s"] is None
+    assert r["mix_volume_l"] == 0.0
+    assert r["t_end_s"] < 60.0
+
+def test_krok_dt_dodatni_lub_domyslny():
+    from sweep import main
+    with pytest.raises(ValueError, match="dodatni"):
+        Scenario(1.0, 0.3, 0.2, dt=0.0)
+    with pytest.raises(SystemExit):
+        main(["--dt", "0"])
+    assert Scenario(1.0, 0.3, 0.2, dt=None, events=True).step_dt() is None
+
+def test_stan_poczatkowy_i_losowanie():
+    r = run_scenario(Scenario(1.0, 0.5, 0.5, cold=(100.0, 20.0), hot=(100.0, 20.0), big=(0.0, 20.0)))
+    assert r["mix_volume_l"] == pytest.approx(100.0, abs=0.2)
+
+    a = list(random_scenarios(5, seed=3))
+    b = list(random_scenarios(5, seed=3))
+    assert a == b and all(0.0 <= s.cold_rate <= 0.5 for s in a)
+
+def test_czas_napelnienia_od_punktu_kontrolnego():
+    import checkpoint
+    from engine import MixingEngine, Inputs
+    eng = MixingEngine()
+    eng.run_until(t=5.0, inputs=Inputs(1.0, 0.3, 0.3))   # w trakcie napełniania
+    state = checkpoint.save(eng)
+    r = run_scenario(Scenario(1.0, 0.3, 0.3, state=state))
+    fresh = run_scenario(Scenario(1.0, 0.3, 0.3))
+    assert r["time_to_full_s"] is not None
+    assert r["t_start_s"] == pytest.approx(5.0)
+    assert r["time_to_full_s"] == r["t_end_s"]         # obie kolumny od startu scenariusza
+    assert r["time_to_full_s"] < fresh["time_to_full_s"]
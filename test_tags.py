@@ -0,0 +1,69 @@
+import pytest
+from engine import MixingEngine
+from tags import TagDB, GOOD, BAD, register_engine, write_engine
+
+
+def make_db():
+    db = TagDB()
+    db.register("T", float, 20.0, "°C")
+    db.register("pompa", bool, False)
+    return db
+
+def test_paczka_na_tick_tylko_ze_zmianami():
+    db = make_db()
+    got = []
+    db.subscribe(None, lambda t, ch: got.append((t, ch)))
+
+    db.write("T", 20.0, 0.0)
+    db.write("pompa", False, 0.0)
+    db.publish(0.0)               # pierwszy zapis: jakość BAD -> GOOD
+    db.write("T", 21.0, 1.0)
+    db.write("T", 22.0, 1.0)      # kilka zapisów w ticku = jedna zmiana
+    db.write("pompa", False, 1.0)
+    db.publish(1.0)
+    db.publish(2.0)               # brak zmian – brak wywołania
+
+    assert got == [(0.0, {"T": 20.0, "pompa": False}), (1.0, {"T": 22.0})]
+    assert db["T"].timestamp == 1.0 and db["T"].quality == GOOD
+
+def test_deadband_liczony_od_ostatnio_dostarczonej_wartosci():
+    db = make_db()
+    got = []
+    db.subscribe(["T"], lambda t, ch: got.append(ch["T"]), deadband=1.0)
+    for i, x in enumerate([20.0, 20.4, 20.8, 21.1, 21.5, 19.9]):
+        db.write("T", x, float(i))
+        db.publish(float(i))
+    assert got == [20.0, 21.1, 19.9]
+
+def test_zmiana_jakosci_jest_zmiana():
+    db = make_db()
+    got = []
+    db.subscribe(["T"], lambda t, ch: got.append(db["T"].quality))
+    db.write("T", 20.0, 0.0)
+    db.publish(0.0)
+    db.write("T", 20.0, 1.0, quality=BAD)
+    db.publish(1.0)
+    assert got == [GOOD, BAD]
+
+def test_every_tick_i_rezygnacja():
+    db = make_db()
+    calls = []
+    sub = db.subscribe(["T"], lambda t, ch: calls.append(t), every_tick=True)
+    db.publish(0.0)
+    db.unsubscribe(sub)
+    db.write("T", 5.0, 1.0)
+    db.publish(1.0)
+    assert calls == [0.0]
+    with pytest.raises(ValueError):
+        db.register("T")
+
+def test_tagi_silnika():
+    eng = MixingEngine()
+    db = register_engine(TagDB(), eng)
+    changed = []
+    db.subscribe(["phase", "mix.volume_l"], lambda t, ch: changed.append(ch))
+    eng.run_until(condition=lambda e: e.phase == "MIX", max_steps=100_000)
+    write_engine(db, eng, eng.t_sim)
+    db.publish(eng.t_sim)
+    assert changed == [{"phase": "MIX", "mix.volume_l": 0.0}]
+    assert db.value("cold.volume_l") == eng.cold.volume_l
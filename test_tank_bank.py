@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+import pytest
+from engine import TankModel
+from tank_bank import TankBank
+
+
+def test_bank_zgodny_z_tankmodel_dla_losowych_operacji():
+    rnd = random.Random(1)
+    models = [TankModel(f"t{i}", rnd.choice([0.0, 50.0, 100.0]), 0.0, 20.0) for i in range(200)]
+    bank = TankBank.from_models(models)
+
+    for _ in range(50):
+        idx = np.array(rnd.sample(range(200), 60))
+        dV = np.array([rnd.uniform(-5.0, 30.0) for _ in idx])
+        Tin = np.array([rnd.uniform(0.0, 100.0) for _ in idx])
+        added = bank.add(idx, dV, Tin)
+        for k, i in enumerate(idx):
+            assert added[k] == models[i].add(dV[k], Tin[k])
+
+        idx = np.array(rnd.sample(range(200), 40))
+        dV = np.array([rnd.uniform(-5.0, 20.0) for _ in idx])
+        removed = bank.remove(idx, dV)
+        for k, i in enumerate(idx):
+            assert removed[k] == models[i].remove(dV[k])
+
+    assert bank.volume_l.tolist() == [m.volume_l for m in models]
+    #TankModel liczy przez energię, bank przez średnią ważoną – zgodność do zaokrągleń
+    assert bank.temp_c.tolist() == pytest.approx([m.temp_c for m in models], rel=1e-12, abs=1e-12)
+    assert bank.level().tolist() == [m.level() for m in models]
+    assert bank.is_full().tolist() == [m.is_full() for m in models]
+    assert bank.is_empty().tolist() == [m.is_empty() for m in models]
+
+def test_bank_add_ze_skalarami_i_wycinkiem():
+    bank = TankBank.full_of(4, 100.0, volume_l=50.0, temp_c=20.0)
+    added = bank.add(slice(None), 60.0, 80.0)
+
+    assert added.tolist() == [50.0] * 4
+    assert bank.is_full().all()
+    assert bank.temp_c == pytest.approx([50.0] * 4)
+
+def test_bank_niezgodne_rozmiary():
+    with pytest.raises(ValueError):
+        TankBank([100.0, 100.0], [0.0], [20.0, 20.0])
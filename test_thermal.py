@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pytest
+from engine import MixingEngine, Inputs, TICK_S
+from sweep import Scenario, run_scenario, THERMAL_DT
+from thermal import ThermalModel, TankThermal, SolveStats, integrate, WATER_J_PER_LK
+
+
+def test_solwer_dokladny_i_duze_kroki_w_rownowadze():
+    stats = SolveStats()
+    y = integrate(lambda t, y: -y / 10.0, [1.0, 2.0], 0.0, 100.0, rtol=1e-8, atol=1e-12, stats=stats)
+    assert y == pytest.approx(np.exp(-10.0) * np.array([1.0, 2.0]), rel=1e-6)
+
+    # blisko równowagi krok rośnie – 10 minut w kilkudziesięciu krokach zamiast 20 000 ticków
+    stats = SolveStats()
+    integrate(lambda t, y: (20.0 - y) / 10.0, [20.001], 0.0, 600.0, stats=stats)
+    assert stats.steps < 50
+
+def test_grzalka_ograniczona_moca_i_straty():
+    model = ThermalModel({"hot": TankThermal(100.0, heater_w=1e5, gain_w_per_k=1e6, ua_w_per_k=0.0,
+                                             vessel_j_per_k=0.0)})
+    cap = WATER_J_PER_LK * 100.0
+    temp = model.integrate([20.0, 20.0, 20.0, 20.0], [0.0, 0.0, 100.0, 0.0], 60.0)
+    # grzałka nasycona: liniowo 1e5 W / C; puste zbiorniki bez zmian
+    assert temp[2] == pytest.approx(20.0 + 1e5 * 60.0 / cap, rel=1e-9)
+    assert temp[[0, 1, 3]].tolist() == [20.0, 20.0, 20.0]
+
+    # bez regulatora: stygnięcie do otoczenia ze stałą C/UA
+    model = ThermalModel({"mix": TankThermal(ua_w_per_k=500.0, vessel_j_per_k=0.0)}, rtol=1e-9, atol=1e-9)
+    temp = model.integrate([0.0, 0.0, 0.0, 80.0], [0.0, 0.0, 0.0, 50.0], 300.0)
+    tau = WATER_J_PER_LK * 50.0 / 500.0
+    assert temp[3] == pytest.approx(20.0 + 60.0 * math.exp(-300.0 / tau), rel=1e-7)
+
+def test_partia_scenariuszy_jak_pojedynczo():
+    model = ThermalModel()
+    temps = np.array([[20.0, 15.0, 40.0, 30.0], [20.0, 5.0, 90.0, 50.0], [25.0, 20.0, 20.0, 0.0]])
+    vols = np.array([[200.0, 100.0, 100.0, 0.0], [50.0, 30.0, 100.0, 60.0], [10.0, 100.0, 5.0, 0.0]])
+    batch = model.integrate(temps, vols, 5.0)
+    for row in range(3):
+        assert batch[row] == pytest.approx(model.integrate(temps[row], vols[row], 5.0), abs=1e-4)
+
+def test_silnik_z_modelem_cieplnym_duzy_krok():
+    def filled():
+        eng = MixingEngine()
+        eng.thermal = ThermalModel()
+        eng.run_until(condition=lambda e: e.phase == "MIX", inputs=Inputs(1.0, 0.0, 0.0), max_steps=100_000)
+        return eng
+
+    fine, coarse = filled(), filled()
+    fine.run_until(t=fine.t_sim + 30.0)
+    coarse.run_until(t=coarse.t_sim + 30.0, dt=3.0)
+    for name in ("cold", "hot"):
+        assert getattr(coarse, name).temp_c == pytest.approx(getattr(fine, name).temp_c, abs=1e-3)
+    assert 0.0 < fine.heater_power < 1.0
+    assert fine.hot.temp_c < 100.0 and fine.cold.temp_c > 0.0   # straty do otoczenia 20°C
+
+    sc = Scenario(1.0, 0.3, 0.2, thermal=True)
+    assert sc.step_dt() == THERMAL_DT and Scenario(1.0, 0.3, 0.2).step_dt() == TICK_S
+    res = run_scenario(sc)
+    assert res["mix_volume_l"] >= 99.9
+
+def test_krok_silnika_dokladny_jak_solwer():
+    exact, solver = ThermalModel(), ThermalModel(rtol=1e-10, atol=1e-10, exact=False)
+    assert exact.exact and not solver.exact
+    # przejścia przez nasycenie grzałki/chłodnicy w obie strony, różne objętości
+    for temp in (0.0, 9.0, 50.0, 79.5, 95.0, 130.0):
+        for vol in (1.0, 40.0, 100.0):
+            engines = []
+            for model in (exact, solver):
+                eng = MixingEngine()
+                for tank in (eng.big, eng.cold, eng.hot, eng.mix):
+                    tank.volume_l, tank.temp_c = vol, temp
+                eng.thermal = model
+                power = model.advance(eng, 40.0)
+                engines.append((power, [t.temp_c for t in (eng.big, eng.cold, eng.hot, eng.mix)]))
+            (p1, t1), (p2, t2) = engines
+            assert t1 == pytest.approx(t2, abs=1e-6) and p1 == pytest.approx(p2, abs=1e-6)
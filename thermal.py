@@ -0,0 +1,223 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from engine import MixingEngine, TAU_S, COLD_TARGET_C, HOT_TARGET_C
+
+
+#MODEL CIEPLNY Z MOCĄ GRZAŁEK/CHŁODNIC, STRATAMI DO OTOCZENIA I POJEMNOŚCIĄ CIEPLNĄ
+#Dla każdego zbiornika:  C(V) dT/dt = P(T) + UA (T_otoczenia - T),  C(V) = c_wody V + C_naczynia,
+#P(T) = regulator P z nasyceniem: grzanie do heater_w, chłodzenie do cooler_w.
+#Wszystkie zbiorniki (i wszystkie scenariusze w partii) liczymy naraz jednym adaptacyjnym
+#solwerem Dormanda–Prince'a 5(4): błąd lokalny szacowany z różnicy rzędów 5 i 4, krok
+#rośnie, gdy instalacja stoi w równowadze (jeden krok na tick albo na całe długie dt), i maleje
+#przy przejściach (nasycenie grzałki, dolewka). Krok początkowy to zawsze dt – wynik zależy
+#tylko od stanu, więc przebieg jest deterministyczny (zapis/odtwarzanie, punkty kontrolne).
+#
+#Silnik używa modelu, gdy eng.thermal jest ustawione; bez niego zostaje dokładna relaksacja.
+#Krok pojedynczego silnika (domyślne exact=True) nie woła solwera: przy stałej objętości prawa strona jest liniowa
+#w T na każdym z trzech odcinków regulatora (grzanie nasycone / P / chłodzenie nasycone), więc
+#rozwiązanie to kawałki wykładnicze zszyte na granicach nasycenia – dokładne, na floatach,
+#kilka µs na tick zamiast setek µs na tablicach NumPy.
+
+WATER_J_PER_LK = 4186.0   #1 L wody ≈ 1 kg
+AMBIENT_C = 20.0
+WET_L = 0.1               #jak TankModel.is_empty – pusty zbiornik nie ma dynamiki
+
+
+@dataclass
+class TankThermal:
+    setpoint_c: float | None = None  #None = bez regulatora (tylko straty)
+    heater_w: float = 0.0            #moc maksymalna grzania [W]
+    cooler_w: float = 0.0            #moc maksymalna chłodzenia [W]
+    gain_w_per_k: float = 0.0        #wzmocnienie regulatora P [W/K]
+    ua_w_per_k: float = 50.0         #straty do otoczenia [W/K]
+    vessel_j_per_k: float = 50e3     #pojemność cieplna naczynia [J/K]
+
+
+def default_tanks() -> dict[str, TankThermal]:
+    #skala czasu jak w modelu relax: przy pełnym zbiorniku (100 L) i małym uchybie τ ≈ TAU_S,
+    #daleko od celu moc ograniczona (moce umowne – instalacja pokazowa z szybkim czasem)
+    gain = WATER_J_PER_LK * 100.0 / TAU_S
+    return {
+        "big": TankThermal(),
+        "cold": TankThermal(COLD_TARGET_C, heater_w=0.0, cooler_w=1.5e6, gain_w_per_k=gain),
+        "hot": TankThermal(HOT_TARGET_C, heater_w=1.5e6, cooler_w=0.0, gain_w_per_k=gain),
+        "mix": TankThermal(),
+    }
+
+
+#DORMAND–PRINCE 5(4)
+
+_C = np.array([0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0])
+_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_B = np.array([35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0])
+_E = _B - np.array([5179 / 57600, 0.0, 7571 / 16695, 393 / 640, -92097 / 339200, 187 / 2100, 1 / 40])
+
+SAFETY = 0.9
+MIN_FACTOR, MAX_FACTOR = 0.2, 5.0
+
+
+@dataclass
+class SolveStats:
+    steps: int = 0
+    rejected: int = 0
+    evals: int = 0
+
+
+def integrate(f, y, t0: float, t1: float, rtol: float = 1e-6, atol: float = 1e-6,
+              h0: float | None = None, stats: SolveStats | None = None) -> np.ndarray:
+    #y' = f(t, y) od t0 do t1; y dowolnego kształtu (partia), jeden wspólny krok dla całej partii
+    y = np.array(y, dtype=np.float64)
+    stats = stats if stats is not None else SolveStats()
+    t = t0
+    span = t1 - t0
+    if span <= 0.0:
+        return y
+    h = min(h0 or span, span)
+    k = [None] * 7
+    k[0] = f(t, y)
+    stats.evals += 1
+    while t < t1:
+        last = t + h >= t1 - 1e-12 * span
+        if last:
+            h = t1 - t
+        for i in range(1, 7):
+            yi = y + h * sum(a * k[j] for j, a in enumerate(_A[i]) if a)
+            k[i] = f(t + _C[i] * h, yi)
+        stats.evals += 6
+        y_new = yi   #wiersz 7 tablicy to wagi B (FSAL)
+        err = h * sum(e * k[j] for j, e in enumerate(_E) if e)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        #norma maksimum: każdy scenariusz w partii spełnia tolerancję (średnia rozmyłaby najgorszy)
+        err_norm = float(np.max(np.abs(err) / scale)) if y.size else 0.0
+
+        if err_norm <= 1.0:
+            t = t1 if last else t + h
+            y = y_new
+            k[0] = k[6]
+            stats.steps += 1
+            factor = MAX_FACTOR if err_norm == 0.0 else min(MAX_FACTOR, SAFETY * err_norm ** -0.2)
+        else:
+            stats.rejected += 1
+            factor = max(MIN_FACTOR, SAFETY * err_norm ** -0.2)
+        h *= factor
+    return y
+
+
+#MODEL DLA WIELU ZBIORNIKÓW
+
+class ThermalModel:
+    TANKS = ("big", "cold", "hot", "mix")
+
+    def __init__(self, tanks: dict[str, TankThermal] | None = None, ambient_c: float = AMBIENT_C,
+                 rtol: float = 1e-6, atol: float = 1e-4, exact: bool = True):
+        tanks = tanks if tanks is not None else default_tanks()
+        cfg = [tanks.get(name, TankThermal()) for name in self.TANKS]
+        self.tanks = dict(zip(self.TANKS, cfg))
+        self.ambient_c = ambient_c
+        self.rtol = rtol
+        self.atol = atol
+        regulated = np.array([c.setpoint_c is not None for c in cfg])
+        self.setpoint = np.array([c.setpoint_c if c.setpoint_c is not None else 0.0 for c in cfg])
+        self.gain = np.where(regulated, [c.gain_w_per_k for c in cfg], 0.0)
+        self.heater_w = np.array([c.heater_w for c in cfg])
+        self.cooler_w = np.array([c.cooler_w for c in cfg])
+        self.ua = np.array([c.ua_w_per_k for c in cfg])
+        self.vessel = np.array([c.vessel_j_per_k for c in cfg])
+        self.stats = SolveStats()
+        #krok silnika: rozwiązanie dokładne (tylko dla tego prawa mocy) albo solwer –
+        #podklasa z własnym power/rhs musi podać exact=False
+        self.exact = exact
+        self._scalar = [(c.setpoint_c if c.setpoint_c is not None else 0.0,
+                         c.gain_w_per_k if c.setpoint_c is not None else 0.0,
+                         c.heater_w, c.cooler_w, c.ua_w_per_k, c.vessel_j_per_k) for c in cfg]
+
+    def power(self, temp) -> np.ndarray:
+        #moc regulatorów [W] (> 0 grzanie, < 0 chłodzenie)
+        return np.clip(self.gain * (self.setpoint - temp), -self.cooler_w, self.heater_w)
+
+    def rhs(self, temp, vol) -> np.ndarray:
+        #dT/dt [K/s] dla tablic (..., zbiorniki); puste zbiorniki stoją
+        wet = vol > WET_L
+        cap = WATER_J_PER_LK * vol + self.vessel
+        dT = (self.power(temp) + self.ua * (self.ambient_c - temp)) / cap
+        return np.where(wet, dT, 0.0)
+
+    def integrate(self, temp, vol, dt: float) -> np.ndarray:
+        #temperatury po dt przy stałych objętościach; temp, vol: (..., 4) – partia scenariuszy naraz
+        vol = np.asarray(vol, dtype=np.float64)
+        return integrate(lambda t, y: self.rhs(y, vol), temp, 0.0, dt, self.rtol, self.atol,
+                         stats=self.stats)
+
+    def exact_temp(self, temp: float, vol: float, dt: float, tank: int) -> float:
+        #temperatura po dt przy stałej objętości – rozwiązanie analityczne, bez kroków solwera
+        sp, gain, heater, cooler, ua, vessel = self._scalar[tank]
+        cap = WATER_J_PER_LK * vol + vessel
+        amb = self.ambient_c
+        #odcinki rosnącej T: 0 = grzanie nasycone, 1 = regulator P, 2 = chłodzenie nasycone;
+        #na każdym dT/dt = a - b T; trajektoria monotoniczna, więc co najwyżej dwa przejścia
+        if gain > 0.0:
+            t_heat, t_cool = sp - heater / gain, sp + cooler / gain
+            region = 0 if temp < t_heat else 2 if temp > t_cool else 1
+        else:
+            t_heat, t_cool = -math.inf, math.inf
+            region = 1
+        for _ in range(3):
+            if region == 0:
+                a, b, lo, hi = (heater + ua * amb) / cap, ua / cap, -math.inf, t_heat
+            elif region == 1:
+                a, b, lo, hi = (gain * sp + ua * amb) / cap, (gain + ua) / cap, t_heat, t_cool
+            else:
+                a, b, lo, hi = (ua * amb - cooler) / cap, ua / cap, t_cool, math.inf
+            slope = a - b * temp
+            if slope == 0.0:
+                return temp
+            edge = hi if slope > 0.0 else lo
+            if b > 0.0:
+                eq = a / b
+                if (eq - edge) * slope <= 0.0:   #równowaga odcinka przed granicą
+                    return eq + (temp - eq) * math.exp(-b * dt)
+                t_edge = math.log((temp - eq) / (edge - eq)) / b
+                if t_edge >= dt:
+                    return eq + (temp - eq) * math.exp(-b * dt)
+            else:
+                t_edge = (edge - temp) / slope
+                if t_edge >= dt:
+                    return temp + slope * dt
+            temp, dt = edge, dt - t_edge
+            region += 1 if slope > 0.0 else -1
+        return temp
+
+    def advance(self, eng: MixingEngine, dt: float) -> float:
+        #krok cieplny silnika (zamiast relaksacji); zwraca jasność grzałki (ułamek mocy maks.)
+        tanks = (eng.big, eng.cold, eng.hot, eng.mix)
+        if not self.exact:
+            return self._advance_solver(tanks, dt)
+        for i, tank in enumerate(tanks):
+            if tank.volume_l > WET_L:
+                tank.temp_c = self.exact_temp(tank.temp_c, tank.volume_l, dt, i)
+        sp, gain, heater, cooler, _, _ = self._scalar[self.TANKS.index("hot")]
+        if eng.hot.volume_l <= WET_L or heater <= 0.0:
+            return 0.0
+        return min(heater, max(0.0, gain * (sp - eng.hot.temp_c))) / heater
+
+    def _advance_solver(self, tanks, dt: float) -> float:
+        vol = np.array([t.volume_l for t in tanks])
+        temp = self.integrate([t.temp_c for t in tanks], vol, dt)
+        for tank, v, t in zip(tanks, vol.tolist(), temp.tolist()):
+            if v > WET_L:
+                tank.temp_c = t
+        hot = self.TANKS.index("hot")
+        if vol[hot] <= WET_L or self.heater_w[hot] <= 0.0:
+            return 0.0
+        return float(max(0.0, self.power(temp)[hot]) / self.heater_w[hot])